@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_alter_aicost_service'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicost',
+            name='cached_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:54
+
+from django.conf import settings
+from django.db import migrations, models
+import uuid
+
+
+def mark_existing_costs_rolled_up(apps, schema_editor):
+    # Costs recorded so far were already subtracted from Profile.credit when they were applied
+    AiCost = apps.get_model('ai', 'AiCost')
+    AiCost.objects.filter(rollup_id__isnull=True).update(rollup_id=uuid.UUID(int=0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_aicost_cached_tokens'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicost',
+            name='rollup_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_costs_rolled_up, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='aicost',
+            name='cost',
+            field=models.DecimalField(decimal_places=6, max_digits=16),
+        ),
+        migrations.AddIndex(
+            model_name='aicost',
+            index=models.Index(condition=models.Q(('rollup_id__isnull', True)), fields=['user'], name='aicost_pending_user_idx'),
+        ),
+    ]
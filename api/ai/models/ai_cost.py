@@ -19,9 +19,16 @@ SERVICE_CHOICES = (
 )
 
 class AiCost(TimeStampedModel):
+    """
+    Append-only ledger of AI spend. Rows are only inserted; the roll-up (CreditLedger.roll_up) folds the
+    rows of each user into Profile.credit and stamps them with its rollup_id, so a user's balance is always
+    Profile.credit minus the cost of their rows without a rollup_id.
+    """
     user = models.ForeignKey(UserModel, blank=True, null=True, on_delete=models.SET_NULL, related_name="ai_costs")
-    cost = models.DecimalField(max_digits=10, decimal_places=2)
+    cost = models.DecimalField(max_digits=16, decimal_places=6)
     service = models.CharField(max_length=255, choices=SERVICE_CHOICES)
+    cached_tokens = models.PositiveIntegerField(default=0)
+    rollup_id = models.UUIDField(blank=True, null=True)
 
     def __str__(self):
         return f"AI Cost for {self.user.email}: {self.cost}"
@@ -29,4 +36,8 @@ class AiCost(TimeStampedModel):
     class Meta:
         verbose_name_plural = "AI Costs"
         ordering = ('id',)
+        indexes = [
+            # Rows not rolled up yet, read by every balance computation and by the roll-up
+            models.Index(fields=["user"], condition=models.Q(rollup_id__isnull=True), name="aicost_pending_user_idx"),
+        ]
 
@@ -0,0 +1 @@
+from ai.signals.cost import flush_ai_costs_after_request, flush_ai_costs_after_task
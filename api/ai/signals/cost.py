@@ -0,0 +1,13 @@
+from celery.signals import task_postrun
+from django.core.signals import request_finished
+from django.dispatch import receiver
+
+from ai.utils.cost_accumulator import CostAccumulator
+
+@receiver(request_finished)
+def flush_ai_costs_after_request(sender, **kwargs):
+    CostAccumulator.flush_current()
+
+@task_postrun.connect
+def flush_ai_costs_after_task(sender=None, **kwargs):
+    CostAccumulator.flush_current()
@@ -1,24 +1,20 @@
 from celery import shared_task
 
-from core.models import UserModel, ProfileModel
-from ai.models import AiCostModel
+from ai.tasks.cost import apply_costs, roll_up_ai_costs
 
 @shared_task
-def apply_cost_task(user_ids, cost, service):
-    if cost > 0:
-        if user_ids:
-            for user_id in user_ids:
-                cur_profile = ProfileModel.objects.filter(user_id=user_id).first()
-                cur_profile.credit = cur_profile.credit - (cost / len(user_ids))
-                cur_profile.save()
-                
-                cur_cost = AiCostModel()
-                cur_cost.user_id = user_id
-                cur_cost.cost = cost / len(user_ids)
-                cur_cost.service = service
-                cur_cost.save()
-        else:
-            cur_cost = AiCostModel()
-            cur_cost.cost = cost
-            cur_cost.service = service
-            cur_cost.save()
\ No newline at end of file
+def apply_costs_task(entries):
+    apply_costs(entries)
+
+@shared_task
+def roll_up_ai_costs_task():
+    roll_up_ai_costs()
+
+@shared_task
+def apply_cost_task(user_ids, cost, service, cached_tokens=0):
+    # Kept for messages queued before costs were batched, new costs go through CostAccumulator
+    user_ids = user_ids or [None]
+    apply_costs([
+        {"user_id": user_id, "service": service, "cost": cost / len(user_ids), "cached_tokens": cached_tokens // len(user_ids)}
+        for user_id in user_ids
+    ])
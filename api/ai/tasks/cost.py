@@ -0,0 +1,51 @@
+from django.db import transaction
+
+from core.models import UserModel
+from ai.models import AiCostModel
+from ai.utils.credit_ledger import CreditLedger
+
+
+def apply_costs(entries):
+    """
+    Appends aggregated AI cost entries to the credit ledger.
+
+    All AiCost rows are written with one bulk insert and nothing else: profiles are only touched by
+    roll_up_ai_costs, so any number of workers can record costs concurrently. The charged users' cached
+    balances are dropped once the rows are committed. Entries of users that no longer exist are recorded
+    without a user.
+
+    Args:
+        entries (list): Dicts of {"user_id": int or None, "service": str, "cost": float, "cached_tokens": int},
+            as sent by CostAccumulator.flush.
+
+    Example:
+        apply_costs([{"user_id": 1, "service": "OPEN_AI_EMBEDDING", "cost": 0.013, "cached_tokens": 0}])
+    """
+    entries = [entry for entry in entries if entry.get("cost", 0) > 0]
+    if not entries:
+        return
+    user_ids = {entry["user_id"] for entry in entries if entry.get("user_id")}
+    existing_user_ids = set(UserModel.objects.filter(id__in=user_ids).values_list("id", flat=True))
+
+    costs = []
+    for entry in entries:
+        user_id = entry.get("user_id") if entry.get("user_id") in existing_user_ids else None
+        costs.append(AiCostModel(
+            user_id=user_id,
+            cost=entry["cost"],
+            service=entry["service"],
+            cached_tokens=entry.get("cached_tokens", 0),
+        ))
+
+    with transaction.atomic():
+        AiCostModel.objects.bulk_create(costs)
+        if existing_user_ids:
+            transaction.on_commit(lambda: CreditLedger.invalidate(existing_user_ids))
+
+def roll_up_ai_costs():
+    """
+    Folds the pending AiCost rows into Profile.credit (see CreditLedger.roll_up).
+    """
+    result = CreditLedger.roll_up()
+    if result["entries"]:
+        print(f"✅ Rolled up {result['entries']} AI cost entries into {result['profiles']} profile balances")
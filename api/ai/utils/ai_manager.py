@@ -2,7 +2,7 @@ import re
 import random
 
 from ai.utils.chunk_manager import ChunkPipeline
-from ai.tasks import apply_cost_task
+from ai.utils.cost_accumulator import CostAccumulator
 
 class BaseAIManager:
     """
@@ -13,15 +13,17 @@ class BaseAIManager:
         self.messages = []
         self.prompt = ""
         self.cost = 0
+        self.cached_tokens = 0
         self.ai_type = ai_type
         self.cur_users = cur_users
 
-    def _apply_cost(self, cost, service):
+    def _apply_cost(self, cost, service, cached_tokens=0):
         self.cost += cost
+        self.cached_tokens += cached_tokens
         user_ids = []
         if self.cur_users:
             user_ids = [user.id for user in self.cur_users]
-        apply_cost_task.delay(user_ids, cost, service)
+        CostAccumulator.get().add(user_ids, cost, service, cached_tokens)
 
     def _clean_code_block(self, response_text):
         pattern = r"^```(?:json|html)?\n?(.*)```$"
@@ -114,6 +116,8 @@ class BaseAIManager:
         chunk_pipeline = ChunkPipeline(max_text_chars=max_chunk_size, backtrack=300)
         chunks = chunk_pipeline.process(text, "get_chunks", chunk_mode)
         for i in range(len(chunks) - 1):
+            if chunks[i]["section_end"]:
+                continue
             head, tail = chunk_pipeline.chunker.get_incomplete_end_html_aware(chunks[i]["html"])
             if tail:
                 chunks[i]["html"] = head
@@ -15,6 +15,7 @@ class HTMLChunker:
             "h1", "h2", "h3", "h4", "h5", "h6",
             "table", "tr", "th", "td", "thead", "tbody", "tfoot", "pre", "code"
         }
+        self.SECTION_TAGS = {"h1", "h2", "h3"}
         self._SENT_END_CHARS = ".!?;؟؛…。！？；．।॥։።፧"
         self._CLOSERS = "’”\"'»›）)]】》〗〙〛〉］｝』」"
         self._OPTIONAL_CLOSERS_RE = f"[{re.escape(self._CLOSERS)}]*"
@@ -115,12 +116,14 @@ class HTMLChunker:
         text = soup.get_text(separator=" ")
         return text
     
-    def chunk_html_streaming(self, html_src, max_text_chars = 1000):
+    def chunk_html_streaming(self, html_src, max_text_chars = 1000, split_on_headings=False):
         """
         Chunk HTML into segments of up to max_text_chars, preserving tag structure.
         Args:
             html_src (str): HTML source string.
             max_text_chars (int): Maximum number of text characters per chunk (default: 1000).
+            split_on_headings (bool): Also start a new chunk at every <h1>-<h3>, so sections are not merged
+                into one chunk (default: False). Chunks closed this way have 'section_end' set.
         Returns:
             List[Dict[str, str]]: List of chunks, each with 'html' and 'text' keys.
         """
@@ -129,12 +132,13 @@ class HTMLChunker:
         text_buf = []
         cur_len = 0
 
-        def flush():
+        def flush(section_end=False):
             nonlocal html_buf, text_buf, cur_len
             if html_buf or text_buf:
                 chunks.append({
                     "html": "".join(html_buf),
-                    "text": "".join(text_buf).strip()
+                    "text": "".join(text_buf).strip(),
+                    "section_end": section_end,
                 })
             html_buf = []
             text_buf = []
@@ -142,8 +146,13 @@ class HTMLChunker:
 
         for kind, token in self._iter_html_tokens(html_src):
             if kind == "tag":
-                html_buf.append(token)
                 name = self._tag_name(token)
+                if (
+                    split_on_headings and name in self.SECTION_TAGS and not token.startswith("</")
+                    and "".join(text_buf).strip()
+                ):
+                    flush(section_end=True)
+                html_buf.append(token)
                 if name == "br" or token.startswith("</"):
                     if name in self.BLOCK_BREAK_TAGS or name == "br":
                         text_buf.append("\n")
@@ -222,17 +231,19 @@ class ChunkPipeline:
     """
     High-level pipeline for chunking HTML using HTMLChunker.
     """
-    def __init__(self, max_text_chars=1000, backtrack=300):
+    def __init__(self, max_text_chars=1000, backtrack=300, split_on_headings=True):
         """
         Initialize ChunkPipeline.
         Args:
             max_text_chars (int): Maximum number of text characters per chunk (default: 1000).
             backtrack (int): Number of characters to look back for incomplete segments (default: 300).
+            split_on_headings (bool): Start a new chunk at every <h1>-<h3> (default: True).
             method (str): Method to use for incomplete sentence detection ('custom' or 'advanced', default: 'advanced').
         """
         self.chunker = HTMLChunker()
         self.max_text_chars = max_text_chars
         self.backtrack = backtrack
+        self.split_on_headings = split_on_headings
 
     def process(self, html_src, mode="get_chunks", chunk_method="html_aware"):
         """
@@ -251,15 +262,19 @@ class ChunkPipeline:
         html_src = self.chunker.join_paragraphs(html_src)
         if mode == "get_text":
             return self.chunker.get_simple_text_from_html(html_src)
-        chunks = self.chunker.chunk_html_streaming(html_src, self.max_text_chars)
+        chunks = self.chunker.chunk_html_streaming(html_src, self.max_text_chars, self.split_on_headings)
         results = []
         for chunk in chunks:
-            if chunk_method == "html_aware":
+            if chunk["section_end"]:
+                # The chunk ends where a new section starts, there is no sentence to carry over
+                head, tail = chunk["html"], ""
+            elif chunk_method == "html_aware":
                 head, tail = self.chunker.get_incomplete_end_html_aware(chunk["html"], self.backtrack)
             results.append({
                 "html": chunk["html"],
                 "text": chunk["text"],
                 "head": head,
                 "tail": tail,
+                "section_end": chunk["section_end"],
             })
         return results
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import threading
+import openai
+from google.cloud import speech, texttospeech, vision
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of API clients.
+
+    OpenAI (httpx) and Google (gRPC) clients are expensive to build and safe to share between threads,
+    so each one is created once per process and reused by every manager instance. The registry is
+    reset after a fork so Celery children never inherit a parent's channels.
+    """
+
+    _lock = threading.Lock()
+    _clients = {}
+    _pid = None
+
+    @classmethod
+    def get(cls, key, factory):
+        """
+        Returns the client registered under key, creating it with factory on first use.
+
+        Args:
+            key (tuple): Unique key of the client.
+            factory (callable): Builds the client when it does not exist yet.
+
+        Returns:
+            object: The shared client.
+
+        Example:
+            client = ClientRegistry.get(("openai", api_key), lambda: openai.OpenAI(api_key=api_key))
+        """
+        pid = os.getpid()
+        if cls._pid != pid:
+            with cls._lock:
+                if cls._pid != pid:
+                    cls._clients = {}
+                    cls._pid = pid
+        client = cls._clients.get(key)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(key)
+                if client is None:
+                    client = factory()
+                    cls._clients[key] = client
+        return client
+
+    @classmethod
+    def openai_client(cls, api_key):
+        return cls.get(("openai", api_key), lambda: openai.OpenAI(api_key=api_key))
+
+    @classmethod
+    def google_speech_client(cls):
+        return cls.get(("google_speech",), speech.SpeechClient)
+
+    @classmethod
+    def google_tts_client(cls):
+        return cls.get(("google_tts",), texttospeech.TextToSpeechClient)
+
+    @classmethod
+    def google_vision_client(cls):
+        return cls.get(("google_vision",), vision.ImageAnnotatorClient)
@@ -0,0 +1,142 @@
+from django.conf import settings
+import atexit
+import os
+import threading
+import time
+
+from ai.tasks import apply_costs_task
+
+
+class CostAccumulator:
+    """
+    Process-wide buffer of AI cost events, flushed as one aggregated apply_costs_task.
+
+    AI managers report every completion, embedding, TTS, STT and OCR call here instead of sending one Celery task
+    each. Events are summed per (user, service) and flushed:
+
+    - when AI_COST_FLUSH_MAX_EVENTS events are pending, or AI_COST_FLUSH_INTERVAL seconds passed since the last
+      flush, on the next add();
+    - every AI_COST_FLUSH_INTERVAL seconds from a background thread, so idle processes don't hold costs back;
+    - at the end of every HTTP request and Celery task, and when the process exits (see ai.signals).
+
+    So translating a book sends a handful of messages instead of one per API call. The task then appends all the
+    AiCost rows to the credit ledger in a single bulk insert (see CreditLedger).
+
+    The accumulator is thread-safe and is rebuilt after a fork, so Celery children never flush their parent's
+    events.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, flush_interval=None, max_events=None):
+        """
+        Args:
+            flush_interval (float, optional): Max seconds an event waits before being flushed.
+                Defaults to settings.AI_COST_FLUSH_INTERVAL. 0 flushes on every event.
+            max_events (int, optional): Pending events that trigger a flush. Defaults to settings.AI_COST_FLUSH_MAX_EVENTS.
+        """
+        self.flush_interval = flush_interval if flush_interval is not None else settings.AI_COST_FLUSH_INTERVAL
+        self.max_events = max_events or settings.AI_COST_FLUSH_MAX_EVENTS
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._events = 0
+        self._last_flush = time.monotonic()
+        self._flusher = None
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the accumulator of the current process, creating it on first use.
+
+        Example:
+            CostAccumulator.get().add([user.id], 0.002, "OPEN_AI_COMPLETION")
+        """
+        pid = os.getpid()
+        if cls._instance is None or cls._instance.pid != pid:
+            with cls._instance_lock:
+                if cls._instance is None or cls._instance.pid != pid:
+                    cls._instance = cls()
+                    atexit.register(cls._instance.flush)
+        return cls._instance
+
+    @classmethod
+    def flush_current(cls):
+        """
+        Flushes the accumulator of the current process, if it has one.
+        """
+        instance = cls._instance
+        if instance is not None and instance.pid == os.getpid():
+            instance.flush()
+
+    def _merge(self, user_id, service, cost, cached_tokens, events):
+        entry = self._pending.setdefault((user_id, service), [0.0, 0, 0])
+        entry[0] += cost
+        entry[1] += cached_tokens
+        entry[2] += events
+
+    def add(self, user_ids, cost, service, cached_tokens=0):
+        """
+        Records the cost of an AI call, split evenly between the users it was made for.
+
+        Args:
+            user_ids (list): Ids of the users to charge. Empty for calls not made on behalf of a user.
+            cost (float): Cost of the call.
+            service (str): One of ai.models.ai_cost.SERVICE_CHOICES.
+            cached_tokens (int): Prompt tokens served from the provider's cache. Default 0.
+        """
+        if cost <= 0:
+            return
+        user_ids = list(user_ids) or [None]
+        with self._lock:
+            for user_id in user_ids:
+                self._merge(user_id, service, cost / len(user_ids), cached_tokens // len(user_ids), 1)
+            self._events += 1
+            due = self._events >= self.max_events or time.monotonic() - self._last_flush >= self.flush_interval
+        self._ensure_flusher()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Sends the pending costs as one apply_costs_task. Costs that could not be queued are kept for the next flush.
+
+        Returns:
+            int: Number of aggregated entries sent.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._events = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        entries = [
+            {"user_id": user_id, "service": service, "cost": cost, "cached_tokens": cached_tokens, "events": events}
+            for (user_id, service), (cost, cached_tokens, events) in pending.items()
+        ]
+        try:
+            apply_costs_task.delay(entries)
+        except Exception as e:
+            print(f"❌ Failed to queue {len(entries)} AI cost entries, keeping them for the next flush: {e}")
+            with self._lock:
+                for entry in entries:
+                    self._merge(entry["user_id"], entry["service"], entry["cost"], entry["cached_tokens"], entry["events"])
+            return 0
+        return len(entries)
+
+    def _ensure_flusher(self):
+        if not self.flush_interval or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._run_flusher, name="ai-cost-flusher", daemon=True)
+                self._flusher.start()
+
+    def _run_flusher(self):
+        while self.pid == os.getpid():
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ AI cost flush failed: {e}")
@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from decimal import Decimal
+import uuid
+
+from core.models import ProfileModel
+from ai.models import AiCostModel
+
+
+class CreditLedger:
+    """
+    Ledger-style AI credit accounting.
+
+    - Spending only ever inserts AiCost rows (see ai.tasks.cost.apply_costs), so Celery workers never contend on
+      a profile row, however many of them run.
+    - roll_up() periodically folds the pending rows into the materialized Profile.credit with one F() UPDATE per
+      batch. Each batch claims its rows with a conditional UPDATE before applying them, so concurrent roll-ups
+      never apply a row twice and no row is ever locked with select_for_update.
+    - A user's balance is Profile.credit minus their pending rows. It is read in one statement and cached for
+      AI_CREDIT_BALANCE_CACHE_TTL seconds, and dropped from the cache whenever the user is charged or credited.
+      Rolling up doesn't change a balance, so it never invalidates the cache.
+    """
+
+    @staticmethod
+    def _balance_key(user_id):
+        return f"ai_credit_balance:{user_id}"
+
+    @classmethod
+    def invalidate(cls, user_ids):
+        """
+        Drops the cached balances of users, e.g. after they were charged.
+        """
+        cache.delete_many([cls._balance_key(user_id) for user_id in user_ids])
+
+    @staticmethod
+    def compute_balance(user_id):
+        """
+        Reads a user's balance from the database, bypassing the cache.
+
+        Returns:
+            float or None: Profile.credit minus the pending costs, or None if the user has no profile.
+        """
+        pending = (
+            AiCostModel.objects.filter(user_id=OuterRef("user_id"), rollup_id__isnull=True)
+            .values("user_id")
+            .annotate(total=Sum("cost"))
+            .values("total")
+        )
+        row = (
+            ProfileModel.objects.filter(user_id=user_id)
+            .annotate(pending=Coalesce(Subquery(pending), Value(Decimal(0)), output_field=DecimalField()))
+            .values_list("credit", "pending")
+            .first()
+        )
+        if row is None:
+            return None
+        credit, pending_cost = row
+        return credit - float(pending_cost)
+
+    @classmethod
+    def balance(cls, user_id):
+        """
+        Returns a user's credit balance for pre-flight checks, from the cache when possible.
+
+        Args:
+            user_id (int): The user's id.
+
+        Returns:
+            float: The balance; 0 for users without a profile.
+
+        Example:
+            if CreditLedger.balance(request.user.id) <= 0:
+                return response.Response(status=status.HTTP_402_PAYMENT_REQUIRED)
+        """
+        key = cls._balance_key(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        value = cls.compute_balance(user_id)
+        value = 0.0 if value is None else value
+        cache.set(key, value, settings.AI_CREDIT_BALANCE_CACHE_TTL)
+        return value
+
+    @classmethod
+    def has_credit(cls, user_id, amount=0.0):
+        """
+        Returns True if the user's cached balance covers amount.
+        """
+        return cls.balance(user_id) > amount
+
+    @classmethod
+    def grant(cls, user_id, amount):
+        """
+        Adds credit to a user atomically, e.g. after a purchase.
+
+        Returns:
+            bool: False if the user has no profile.
+        """
+        with transaction.atomic():
+            updated = ProfileModel.objects.filter(user_id=user_id).update(credit=F("credit") + amount)
+            transaction.on_commit(lambda: cls.invalidate([user_id]))
+        return bool(updated)
+
+    @staticmethod
+    def _roll_up_batch(batch_size):
+        rollup_id = uuid.uuid4()
+        with transaction.atomic():
+            ids = list(
+                AiCostModel.objects.filter(rollup_id__isnull=True).order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0, 0
+            # Rows claimed meanwhile by a concurrent roll-up no longer match rollup_id IS NULL and are skipped
+            claimed = AiCostModel.objects.filter(id__in=ids, rollup_id__isnull=True).update(rollup_id=rollup_id)
+            totals = {
+                row["user_id"]: row["total"]
+                for row in AiCostModel.objects.filter(rollup_id=rollup_id, user__isnull=False)
+                .values("user_id")
+                .annotate(total=Sum("cost"))
+            }
+            if totals:
+                charge = Case(
+                    *[When(user_id=user_id, then=Value(float(total))) for user_id, total in totals.items()],
+                    output_field=FloatField(),
+                )
+                ProfileModel.objects.filter(user_id__in=totals).update(credit=F("credit") - charge)
+        return claimed, len(totals)
+
+    @classmethod
+    def roll_up(cls, batch_size=None):
+        """
+        Folds every pending AiCost row into Profile.credit, batch_size rows per transaction.
+
+        Args:
+            batch_size (int, optional): Rows per batch. Defaults to settings.AI_CREDIT_ROLLUP_BATCH_SIZE.
+
+        Returns:
+            dict: {"entries": int, "profiles": int} rolled up (profiles are counted once per batch).
+        """
+        batch_size = batch_size or settings.AI_CREDIT_ROLLUP_BATCH_SIZE
+        entries = profiles = 0
+        while True:
+            claimed, charged = cls._roll_up_batch(batch_size)
+            if not claimed:
+                return {"entries": entries, "profiles": profiles}
+            entries += claimed
+            profiles += charged
@@ -12,6 +12,7 @@ import copy
 
 from ai.utils.ai_manager import BaseAIManager
 from ai.utils.audio_manager import AudioManager
+from ai.utils.client_registry import ClientRegistry
 
 class GoogleAIManager(BaseAIManager):
     def __init__(self, api_key=None, cur_users=[]):
@@ -28,9 +29,6 @@ class GoogleAIManager(BaseAIManager):
         super().__init__(ai_type="google", cur_users=cur_users)
         if api_key:
             configure(api_key=api_key)
-        self.speech_client = speech.SpeechClient()
-        self.tts_client = texttospeech.TextToSpeechClient()
-        self.vision_client = vision.ImageAnnotatorClient()
         self.model = GenerativeModel("models/gemini-1.5-pro-latest") if api_key else None
         self.GOOGLE_AI_PRICING = {
             "gemini-pro": {
@@ -54,6 +52,18 @@ class GoogleAIManager(BaseAIManager):
             },
         }
 
+    @property
+    def speech_client(self):
+        return ClientRegistry.google_speech_client()
+
+    @property
+    def tts_client(self):
+        return ClientRegistry.google_tts_client()
+
+    @property
+    def vision_client(self):
+        return ClientRegistry.google_vision_client()
+
     def add_message(self, role, text=None, max_history=5):
         """
         Add a message to the conversation history. For Google Gemini, concatenates the last max_history turns in order,
@@ -155,7 +165,7 @@ class GoogleAIManager(BaseAIManager):
         if encoding is None:
             encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
 
-        client = speech.SpeechClient()
+        client = self.speech_client
         audio = speech.RecognitionAudio(content=audio_bytes)
         config = speech.RecognitionConfig(
             encoding=encoding,
@@ -217,7 +227,7 @@ class GoogleAIManager(BaseAIManager):
         Returns:
             bytes: The audio content in the specified format.
         """
-        client = texttospeech.TextToSpeechClient()
+        client = self.tts_client
         if isinstance(text, str) and text.strip().startswith("<speak>"):
             input_text = texttospeech.SynthesisInput(ssml=text)
         else:
@@ -316,7 +326,7 @@ class GoogleAIManager(BaseAIManager):
         Returns:
             str: The generated description of the image.
         """
-        client = vision.ImageAnnotatorClient()
+        client = self.vision_client
         image = vision.Image(content=image_bytes)
         response = client.label_detection(image=image)
         labels = response.label_annotations
@@ -10,7 +10,7 @@ from PyPDF2 import PdfReader
 
 from ai.utils.doc_ai_managr import DocAIManager
 from ai.utils.chunk_manager import ChunkPipeline
-from ai.tasks import apply_cost_task
+from ai.utils.cost_accumulator import CostAccumulator
 
 class OCRManager:
     def __init__(self, google_cloud_project_id=settings.GOOGLE_CLOUD_DOCUMENT_AI_PROJECT_ID, google_cloud_location=settings.GOOGLE_CLOUD_DOCUMENT_AI_LOCATION, google_cloud_processor_id=settings.GOOGLE_CLOUD_DOCUMENT_AI_PROCESSOR_ID, cur_users=[]):
@@ -33,9 +33,10 @@ class OCRManager:
 
     def _apply_cost(self, cost, service):
         self.cost += cost
+        user_ids = []
         if self.cur_users:
             user_ids = [user.id for user in self.cur_users]
-        apply_cost_task.delay(user_ids, cost, service)
+        CostAccumulator.get().add(user_ids, cost, service)
 
     def _png_bytes_to_pdf_bytes(self, png_bytes):
         """
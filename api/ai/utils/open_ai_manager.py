@@ -1,12 +1,15 @@
 from django.conf import settings
-import openai
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import wave
 import contextlib
 import io
+import json
 import requests
+import tiktoken
 
 from core.models import UserModel, ProfileModel
 from ai.utils.ai_manager import BaseAIManager
+from ai.utils.client_registry import ClientRegistry
 
 class OpenAIManager(BaseAIManager):
     def __init__(self, model="gpt-4o", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=[]):
@@ -36,6 +39,7 @@ class OpenAIManager(BaseAIManager):
             },
             "gpt-4o": {
                 "input_per_1k_token": 0.0005,
+                "cached_input_per_1k_token": 0.00025,
                 "output_per_1k_token": 0.0015,
                 "audio_stt_per_1_minute": 0.006,
                 "image_per_1_image": 0.00765,
@@ -56,7 +60,7 @@ class OpenAIManager(BaseAIManager):
                 "audio_stt_per_1_minute": 0.006,
             },
         }
-        self.OPEN_AI_CLIENT = openai.OpenAI(api_key=api_key)
+        self.OPEN_AI_CLIENT = ClientRegistry.openai_client(api_key)
         self.model = model
     
     def add_message(self, role, text=None, img_url=None, max_history=5):
@@ -109,13 +113,40 @@ class OpenAIManager(BaseAIManager):
                     else:
                         self.messages = [{"role": "system", "content": summarized}] + self.messages[-max_history:]
 
-    def generate_response(self, max_token=2000, messages=None):
+    def _apply_completion_cost(self, usage):
+        """
+        Applies the cost of a chat completion from its reported usage.
+
+        Prompt tokens served from OpenAI's prompt cache are billed at the cached-input price and recorded
+        separately, so the cache hit rate of long, stable prompts shows up in AiCost.
+
+        Args:
+            usage (CompletionUsage): The usage object of the completion.
+        """
+        if not usage:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        pricing = self.OPENAI_PRICING.get(self.model, {})
+        input_price = pricing.get("input_per_1k_token", 0)
+        cached_input_price = pricing.get("cached_input_per_1k_token", input_price)
+        output_price = pricing.get("output_per_1k_token", 0)
+        cost = (
+            ((usage.prompt_tokens - cached_tokens) / 1000) * input_price
+            + (cached_tokens / 1000) * cached_input_price
+            + (usage.completion_tokens / 1000) * output_price
+        )
+        self._apply_cost(cost=cost, service="OPEN_AI_COMPLETION", cached_tokens=cached_tokens)
+
+    def generate_response(self, max_token=2000, messages=None, prompt_cache_key=None):
         """
         Generate a response from the OpenAI chat model.
         
         Args:
             max_token (int): Maximum number of tokens in the response. Default is 2000.
             messages (list): List of message dicts. If None, uses internal history.
+            prompt_cache_key (str): Optional key that routes requests sharing a long prompt prefix to the same
+                prompt cache.
         
         Returns:
             str: The assistant's response text.
@@ -125,26 +156,188 @@ class OpenAIManager(BaseAIManager):
         """
         if messages is None:
             messages = self.messages
+        params = {}
+        if prompt_cache_key:
+            params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
         response = self.OPEN_AI_CLIENT.chat.completions.create(
             model=self.model,
             messages=messages if messages else self.messages,
-            max_tokens=max_token
+            max_tokens=max_token,
+            **params
         )
-        tokens_used = response.usage
-        prompt_tokens = tokens_used.prompt_tokens
-        completion_tokens = tokens_used.completion_tokens
-        pricing = self.OPENAI_PRICING.get(self.model, {})
-        input_price = pricing.get("input_per_1k_token", 0)
-        output_price = pricing.get("output_per_1k_token", 0)
-        
-        cost = (prompt_tokens / 1000) * input_price + (completion_tokens / 1000) * output_price
-        self._apply_cost(cost=cost, service="OPEN_AI_COMPLETION")
+        self._apply_completion_cost(response.usage)
 
         raw_response = response.choices[0].message.content.strip() if response.choices and response.choices[0].message else ""
         self.clear_messages()
         return self._clean_code_block(raw_response)
 
+    def generate_response_stream(self, max_token=2000, messages=None, prompt_cache_key=None):
+        """
+        Stream a response from the OpenAI chat model, yielding text deltas as they arrive.
+        Cost is applied once the stream has finished, using the usage reported in the final chunk.
+
+        Args:
+            max_token (int): Maximum number of tokens in the response. Default is 2000.
+            messages (list): List of message dicts. If None, uses internal history.
+            prompt_cache_key (str): Optional key that routes requests sharing a long prompt prefix to the same
+                prompt cache.
+
+        Yields:
+            str: Consecutive pieces of the assistant's response text.
+
+        Example:
+            for delta in manager.generate_response_stream(max_token=500):
+                print(delta, end="")
+        """
+        if messages is None:
+            messages = self.messages
+        params = {}
+        if prompt_cache_key:
+            params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+        stream = self.OPEN_AI_CLIENT.chat.completions.create(
+            model=self.model,
+            messages=messages if messages else self.messages,
+            max_tokens=max_token,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        usage = None
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta and delta.content:
+                    yield delta.content
+        finally:
+            self._apply_completion_cost(usage)
+            self.clear_messages()
     
+    def _parse_tool_arguments(self, arguments):
+        try:
+            parsed = json.loads(arguments or "{}")
+        except Exception:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def generate_tool_response(self, tools, max_token=2000, messages=None, prompt_cache_key=None):
+        """
+        Generate a response from the OpenAI chat model with native tool calling enabled.
+
+        Args:
+            tools (list): Tool definitions in the chat completions "tools" format.
+            max_token (int): Maximum number of tokens in the response. Default is 2000.
+            messages (list): List of message dicts. If None, uses internal history.
+            prompt_cache_key (str): Optional key that routes requests sharing a long prompt prefix to the same
+                prompt cache.
+
+        Returns:
+            dict: {"content": str, "tool_calls": [{"id": str, "name": str, "arguments": dict}, ...]}
+
+        Example:
+            result = manager.generate_tool_response(tools, max_token=500)
+            for call in result["tool_calls"]:
+                print(call["name"], call["arguments"])
+        """
+        if messages is None:
+            messages = self.messages
+        params = {}
+        if prompt_cache_key:
+            params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+        response = self.OPEN_AI_CLIENT.chat.completions.create(
+            model=self.model,
+            messages=messages if messages else self.messages,
+            max_tokens=max_token,
+            tools=tools,
+            **params
+        )
+        self._apply_completion_cost(response.usage)
+        self.clear_messages()
+
+        message = response.choices[0].message if response.choices else None
+        if not message:
+            return {"content": "", "tool_calls": []}
+        tool_calls = [
+            {
+                "id": call.id,
+                "name": call.function.name,
+                "arguments": self._parse_tool_arguments(call.function.arguments),
+            }
+            for call in (message.tool_calls or [])
+        ]
+        return {"content": self._clean_code_block(message.content or ""), "tool_calls": tool_calls}
+
+    def generate_tool_response_stream(self, tools, max_token=2000, messages=None, prompt_cache_key=None):
+        """
+        Stream a response from the OpenAI chat model with native tool calling enabled.
+        Text is yielded as it arrives; tool calls are assembled from their deltas and yielded once at the end.
+
+        Args:
+            tools (list): Tool definitions in the chat completions "tools" format.
+            max_token (int): Maximum number of tokens in the response. Default is 2000.
+            messages (list): List of message dicts. If None, uses internal history.
+            prompt_cache_key (str): Optional key that routes requests sharing a long prompt prefix to the same
+                prompt cache.
+
+        Yields:
+            dict: {"type": "text", "delta": str} events, then {"type": "tool_calls", "tool_calls": [...]} if the
+                model called any tool.
+
+        Example:
+            for event in manager.generate_tool_response_stream(tools, max_token=500):
+                if event["type"] == "text":
+                    print(event["delta"], end="")
+        """
+        if messages is None:
+            messages = self.messages
+        params = {}
+        if prompt_cache_key:
+            params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+        stream = self.OPEN_AI_CLIENT.chat.completions.create(
+            model=self.model,
+            messages=messages if messages else self.messages,
+            max_tokens=max_token,
+            tools=tools,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        usage = None
+        calls = {}
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if not delta:
+                    continue
+                if delta.content:
+                    yield {"type": "text", "delta": delta.content}
+                for call in delta.tool_calls or []:
+                    entry = calls.setdefault(call.index, {"id": None, "name": "", "arguments": ""})
+                    if call.id:
+                        entry["id"] = call.id
+                    if call.function and call.function.name:
+                        entry["name"] += call.function.name
+                    if call.function and call.function.arguments:
+                        entry["arguments"] += call.function.arguments
+        finally:
+            self._apply_completion_cost(usage)
+            self.clear_messages()
+        if calls:
+            yield {
+                "type": "tool_calls",
+                "tool_calls": [
+                    {"id": entry["id"], "name": entry["name"], "arguments": self._parse_tool_arguments(entry["arguments"])}
+                    for _, entry in sorted(calls.items())
+                ],
+            }
+
     def stt(self, audio_input, response_format="text", language=None, input_type="url"):
         """
         Transcribe speech to text using OpenAI Whisper.
@@ -284,10 +477,143 @@ class OpenAIManager(BaseAIManager):
         image_bytes = requests.get(image_url).content
         pricing = self.OPENAI_PRICING.get("gpt-4o", {})
         image_price = pricing.get("image_per_1_image", 0)
-        self._apply_cost(cost=image_price)
+        self._apply_cost(cost=image_price, service="OPEN_AI_IMAGE")
         return image_bytes
     
-    def build_materials_for_rag(self, text, max_chunk_size=1000, embedding_model="text-embedding-3-large", progress_callback=None):
+    def build_embedding(self, text, embedding_model="text-embedding-3-large", dimensions=None):
+        """
+        Generate a single embedding for a short text, such as a search query, without chunking it.
+
+        Args:
+            text (str): The text to embed.
+            embedding_model (str): OpenAI embedding model name. Default "text-embedding-3-large".
+            dimensions (int): Optional number of output dimensions (text-embedding-3 models only).
+
+        Returns:
+            list: The embedding vector, or an empty list if none was returned.
+
+        Example:
+            vector = manager.build_embedding("How much is the Super Pass?")
+        """
+        params = {"model": embedding_model, "input": text}
+        if dimensions:
+            params["dimensions"] = dimensions
+        response = self.OPEN_AI_CLIENT.embeddings.create(**params)
+        vector = response.data[0].embedding if response and response.data and response.data[0].embedding else []
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "prompt_tokens", 0) if usage else max(1, len(text) // 4)
+        pricing = self.OPENAI_PRICING.get(embedding_model, {})
+        cost = (input_tokens / 1000) * pricing.get("input_per_1k_token", 0)
+        self._apply_cost(cost=cost, service="OPEN_AI_EMBEDDING")
+        return vector
+
+    def _embedding_batches(self, texts, max_tokens=None, max_inputs=None):
+        """
+        Packs texts into consecutive batches of at most max_tokens tokens and max_inputs inputs.
+
+        Returns:
+            list: Lists of text indexes, in order.
+        """
+        max_tokens = max_tokens or settings.OPEN_AI_EMBEDDING_BATCH_MAX_TOKENS
+        max_inputs = max_inputs or settings.OPEN_AI_EMBEDDING_BATCH_MAX_INPUTS
+        try:
+            enc = tiktoken.get_encoding("cl100k_base")
+            count_tokens = lambda text: len(enc.encode(text, disallowed_special=()))
+        except Exception:
+            # Encoding files unavailable (e.g. no network on first use): fall back to a conservative estimate
+            count_tokens = lambda text: len(text) // 3 + 1
+        batches, current, current_tokens = [], [], 0
+        for index, text in enumerate(texts):
+            tokens = count_tokens(text)
+            if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts, embedding_model, dimensions=None):
+        """
+        Embeds a batch of texts in one request. If the request fails, every text is retried on its own so one bad
+        input only fails itself.
+
+        Returns:
+            dict: {"vectors": [list, ...], "errors": [str or None, ...], "input_tokens": int}
+        """
+        params = {"model": embedding_model, "input": texts}
+        if dimensions:
+            params["dimensions"] = dimensions
+        try:
+            response = self.OPEN_AI_CLIENT.embeddings.create(**params)
+        except Exception as e:
+            if len(texts) == 1:
+                return {"vectors": [[]], "errors": [str(e)], "input_tokens": 0}
+            results = [self._embed_batch([text], embedding_model, dimensions) for text in texts]
+            return {
+                "vectors": [result["vectors"][0] for result in results],
+                "errors": [result["errors"][0] for result in results],
+                "input_tokens": sum(result["input_tokens"] for result in results),
+            }
+        vectors = [[] for _ in texts]
+        for item in response.data or []:
+            vectors[item.index] = item.embedding or []
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "prompt_tokens", 0) if usage else max(1, sum(len(text) for text in texts) // 4)
+        return {
+            "vectors": vectors,
+            "errors": [None if vector else "No embedding returned" for vector in vectors],
+            "input_tokens": input_tokens,
+        }
+
+    def _iter_embedding_batches(self, texts, embedding_model, dimensions=None):
+        """
+        Embeds texts in token-bounded batches, up to OPEN_AI_EMBEDDING_BATCH_WORKERS requests at a time, and yields
+        (indexes, result) per batch as it completes. The cost of each batch is applied once, on the calling thread.
+        """
+        batches = self._embedding_batches(texts)
+        pricing = self.OPENAI_PRICING.get(embedding_model, {})
+        if not batches:
+            return
+        workers = min(settings.OPEN_AI_EMBEDDING_BATCH_WORKERS, len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openai-embeddings") as executor:
+            futures = {
+                executor.submit(self._embed_batch, [texts[i] for i in batch], embedding_model, dimensions): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result["input_tokens"]:
+                    cost = (result["input_tokens"] / 1000) * pricing.get("input_per_1k_token", 0)
+                    self._apply_cost(cost=cost, service="OPEN_AI_EMBEDDING")
+                yield futures[future], result
+
+    def build_embeddings(self, texts, embedding_model="text-embedding-3-large", dimensions=None):
+        """
+        Generate embeddings for many texts with as few requests as possible.
+
+        Texts are packed into batches bounded by OPEN_AI_EMBEDDING_BATCH_MAX_TOKENS and
+        OPEN_AI_EMBEDDING_BATCH_MAX_INPUTS, and up to OPEN_AI_EMBEDDING_BATCH_WORKERS batches run in parallel.
+
+        Args:
+            texts (list): The texts to embed.
+            embedding_model (str): OpenAI embedding model name. Default "text-embedding-3-large".
+            dimensions (int): Optional number of output dimensions (text-embedding-3 models only).
+
+        Returns:
+            list: One vector per text, in order. Texts that failed get an empty list.
+
+        Example:
+            vectors = manager.build_embeddings(["first chunk", "second chunk"])
+        """
+        vectors = [[] for _ in texts]
+        for batch, result in self._iter_embedding_batches(texts, embedding_model, dimensions):
+            for index, vector in zip(batch, result["vectors"]):
+                vectors[index] = vector
+        return vectors
+
+    def build_materials_for_rag(self, text, max_chunk_size=1000, embedding_model="text-embedding-3-large", progress_callback=None, batch=True):
         """
         Build materials for RAG (Retrieval-Augmented Generation):
         For each chunk, generate:
@@ -300,10 +626,61 @@ class OpenAIManager(BaseAIManager):
             text (str): The input text (can be HTML)
             max_chunk_size (int): Max size of each chunk. Default 1000.
             embedding_model (str): OpenAI embedding model name. Default "text-embedding-3-large".
+            progress_callback (callable): Optional, called with chunk, index and total (plus err_msg on failure)
+                as each chunk's embedding is done.
+            batch (bool): Embed the chunks in batched requests (see build_embeddings) instead of one request per
+                chunk. Default True.
         Returns:
-            list: List of dicts for all chunks
+            list: List of dicts for all chunks. Chunks whose embedding failed get an empty "vector".
         """
         chunks = self.build_chunks(text, max_chunk_size=max_chunk_size)
+        if not batch:
+            return self._build_materials_for_rag_serial(chunks, embedding_model, progress_callback)
+        return self.embed_chunks(chunks, embedding_model=embedding_model, progress_callback=progress_callback)
+
+    def embed_chunks(self, chunks, embedding_model="text-embedding-3-large", progress_callback=None):
+        """
+        Embed chunks from build_chunks in batched requests (see build_embeddings).
+
+        Args:
+            chunks (list): Chunk dicts with 'html' and 'text' keys.
+            embedding_model (str): OpenAI embedding model name. Default "text-embedding-3-large".
+            progress_callback (callable): Optional, called with chunk, index and total (plus err_msg on failure)
+                as each chunk's embedding is done.
+
+        Returns:
+            list: build_materials_for_rag dicts, in the order of chunks. Chunks whose embedding failed get an
+                empty "vector".
+
+        Example:
+            materials = manager.embed_chunks(manager.build_chunks(text))
+        """
+        materials = [
+            {
+                "chunk_number": i + 1,
+                "html": chunk["html"],
+                "text": chunk["text"],
+                "vector": [],
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+        texts = [chunk["text"] for chunk in chunks]
+        for indexes, result in self._iter_embedding_batches(texts, embedding_model):
+            for i, vector, error in zip(indexes, result["vectors"], result["errors"]):
+                materials[i]["vector"] = vector
+                if error:
+                    err_msg = f"Error generating embedding: {error}"
+                    if progress_callback:
+                        progress_callback(chunk=chunks[i], index=i+1, total=len(chunks), err_msg=err_msg)
+                    else:
+                        print(err_msg)
+                elif progress_callback:
+                    progress_callback(chunk=chunks[i], index=i+1, total=len(chunks))
+            if not progress_callback:
+                print(f"Embedded {len(indexes)} of {len(chunks)} chunks in one request...")
+        return materials
+
+    def _build_materials_for_rag_serial(self, chunks, embedding_model, progress_callback=None):
         materials = []
         for i, chunk in enumerate(chunks):
             msg = f"Processing chunk {i+1}/{len(chunks)} for embeddings..."
@@ -332,7 +709,7 @@ class OpenAIManager(BaseAIManager):
             except Exception as e:
                 err_msg = f"Error generating embedding: {e}"
                 if progress_callback:
-                    progress_callback(err_msg, chunk=chunk, index=i+1, total=len(chunks))
+                    progress_callback(chunk=chunk, index=i+1, total=len(chunks), err_msg=err_msg)
                 else:
                     print(err_msg)
                 vector_output = []
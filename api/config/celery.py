@@ -1,8 +1,14 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 celery = Celery('config')
 celery.config_from_object('django.conf:settings', namespace='CELERY')
-celery.autodiscover_tasks()
\ No newline at end of file
+celery.autodiscover_tasks()
+
+@worker_process_init.connect
+def warm_up_agent_runtime(**kwargs):
+    from customer_support.utils.agent_runtime import AgentRuntime
+    AgentRuntime.get().warm_up()
\ No newline at end of file
@@ -9,4 +9,17 @@ CELERY_BROKER_URL = f"redis://:{REDIS_USER_PASS}@redis:6379/1"
 
 CELERY_TIMEZONE = os.environ.get('API_TIME_ZONE', 'America/Toronto')
 
-CELERY_BEAT_SCHEDULE = {}
\ No newline at end of file
+CELERY_BEAT_SCHEDULE = {
+    "refresh-zoho-access-token": {
+        "task": "customer_support.tasks.refresh_zoho_access_token_task",
+        "schedule": crontab(minute="*/5"),
+    },
+    "sync-zoho-desk-tickets": {
+        "task": "customer_support.tasks.sync_zoho_desk_tickets_task",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "roll-up-ai-costs": {
+        "task": "ai.tasks.roll_up_ai_costs_task",
+        "schedule": crontab(minute="*"),
+    },
+}
\ No newline at end of file
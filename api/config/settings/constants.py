@@ -73,6 +73,14 @@ GOOGLE_CLOUD_DOCUMENT_AI_LOCATION = "us"
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "GOOGLE_API_KEY")
 
 OPEN_AI_SECRET_KEY = os.environ.get("OPEN_AI_SECRET_KEY", "OPEN_AI_SECRET_KEY")
+OPEN_AI_EMBEDDING_BATCH_MAX_TOKENS = int(os.environ.get("OPEN_AI_EMBEDDING_BATCH_MAX_TOKENS", 100000))
+OPEN_AI_EMBEDDING_BATCH_MAX_INPUTS = int(os.environ.get("OPEN_AI_EMBEDDING_BATCH_MAX_INPUTS", 256))
+OPEN_AI_EMBEDDING_BATCH_WORKERS = int(os.environ.get("OPEN_AI_EMBEDDING_BATCH_WORKERS", 4))
+
+AI_COST_FLUSH_INTERVAL = float(os.environ.get("AI_COST_FLUSH_INTERVAL", 5))
+AI_COST_FLUSH_MAX_EVENTS = int(os.environ.get("AI_COST_FLUSH_MAX_EVENTS", 200))
+AI_CREDIT_BALANCE_CACHE_TTL = int(os.environ.get("AI_CREDIT_BALANCE_CACHE_TTL", 60))
+AI_CREDIT_ROLLUP_BATCH_SIZE = int(os.environ.get("AI_CREDIT_ROLLUP_BATCH_SIZE", 5000))
 
 AWS_ACCESS_KEY_ID=os.environ.get("AWS_ACCESS_KEY_ID", "AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY=os.environ.get("AWS_SECRET_ACCESS_KEY", "AWS_SECRET_ACCESS_KEY")
@@ -86,17 +94,70 @@ PROD_APP_DB_HOST = os.environ.get("PROD_APP_DB_HOST", "PROD_APP_DB_HOST")
 PROD_APP_DB_USER = os.environ.get("PROD_APP_DB_USER", "PROD_APP_DB_USER")
 PROD_APP_DB_PASSWORD = os.environ.get("PROD_APP_DB_PASSWORD", "PROD_APP_DB_PASSWORD")
 PROD_APP_DB_DATABASE = os.environ.get("PROD_APP_DB_DATABASE", "PROD_APP_DB_DATABASE")
+PROD_APP_DB_POOL_MIN_SIZE = int(os.environ.get("PROD_APP_DB_POOL_MIN_SIZE", 1))
+PROD_APP_DB_POOL_MAX_SIZE = int(os.environ.get("PROD_APP_DB_POOL_MAX_SIZE", 10))
+PROD_APP_DB_POOL_TIMEOUT = float(os.environ.get("PROD_APP_DB_POOL_TIMEOUT", 5))
+PROD_APP_DB_CONNECT_TIMEOUT = int(os.environ.get("PROD_APP_DB_CONNECT_TIMEOUT", 5))
+PROD_APP_DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("PROD_APP_DB_STATEMENT_TIMEOUT_MS", 5000))
+PROD_APP_DB_HEALTH_CHECK_INTERVAL = float(os.environ.get("PROD_APP_DB_HEALTH_CHECK_INTERVAL", 30))
 
 ZOHO_CLIENT_ID = os.environ.get("ZOHO_CLIENT_ID", "ZOHO_CLIENT_ID")
 ZOHO_CLIENT_SECRET = os.environ.get("ZOHO_CLIENT_SECRET", "ZOHO_CLIENT_SECRET")
 ZOHO_REFRESH_TOKEN = os.environ.get("ZOHO_REFRESH_TOKEN", "ZOHO_REFRESH_TOKEN")
+ZOHO_TOKEN_REFRESH_AHEAD_SECONDS = int(os.environ.get("ZOHO_TOKEN_REFRESH_AHEAD_SECONDS", 15 * 60))
+ZOHO_TOKEN_REFRESH_LOCK_TIMEOUT = int(os.environ.get("ZOHO_TOKEN_REFRESH_LOCK_TIMEOUT", 15))
+ZOHO_DESK_SYNC_CONCURRENCY = int(os.environ.get("ZOHO_DESK_SYNC_CONCURRENCY", 8))
+ZOHO_DESK_REQUESTS_PER_MINUTE = int(os.environ.get("ZOHO_DESK_REQUESTS_PER_MINUTE", 300))
+ZOHO_DESK_SUMMARY_CONCURRENCY = int(os.environ.get("ZOHO_DESK_SUMMARY_CONCURRENCY", 4))
+ZOHO_DESK_SUMMARY_TICKETS_PER_MINUTE = int(os.environ.get("ZOHO_DESK_SUMMARY_TICKETS_PER_MINUTE", 120))
 
 REVENUE_CAT_SECRET_KEY = os.environ.get("REVENUE_CAT_SECRET_KEY", "REVENUE_CAT_SECRET_KEY")
 REVENUE_CAT_PROJECT_ID = os.environ.get("REVENUE_CAT_PROJECT_ID", "REVENUE_CAT_PROJECT_ID")
 
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 30))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 10))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 20))
+
 TWILIO_ACCOUNT_SID=os.environ.get("TWILIO_ACCOUNT_SID", "TWILIO_ACCOUNT_SID")
 TWILIO_ACCOUNT_AUTH_TOKEN=os.environ.get("TWILIO_ACCOUNT_AUTH_TOKEN", "TWILIO_ACCOUNT_AUTH_TOKEN")
 TWILIO_ACCOUNT_PHONE_NUMBER=os.environ.get("TWILIO_ACCOUNT_PHONE_NUMBER", "TWILIO_ACCOUNT_PHONE_NUMBER")
 TWILIO_ACCOUNT_API_KEY_SID=os.environ.get("TWILIO_ACCOUNT_API_KEY_SID", "TWILIO_ACCOUNT_API_KEY_SID")
 TWILIO_ACCOUNT_API_KEY_SECRET=os.environ.get("TWILIO_ACCOUNT_API_KEY_SECRET", "TWILIO_ACCOUNT_API_KEY_SECRET")
-# ---------------- END OF CONSTANT VARS ----------------
\ No newline at end of file
+# ---------------- END OF CONSTANT VARS ----------------
+
+# ---------------- BEGINNING OF CUSTOMER SUPPORT VARS ----------------
+
+TWILIO_STREAMING_RESPONSES = bool(int(os.environ.get("TWILIO_STREAMING_RESPONSES", 1)))
+TWILIO_SEGMENT_WAIT_SECONDS = float(os.environ.get("TWILIO_SEGMENT_WAIT_SECONDS", 4))
+
+CUSTOMER_SUPPORT_AGENT_TRANSPORT = os.environ.get("CUSTOMER_SUPPORT_AGENT_TRANSPORT", "in_process")
+CUSTOMER_SUPPORT_AGENT_MODEL = os.environ.get("CUSTOMER_SUPPORT_AGENT_MODEL", "gpt-4")
+CUSTOMER_SUPPORT_AGENT_NATIVE_TOOLS = bool(int(os.environ.get("CUSTOMER_SUPPORT_AGENT_NATIVE_TOOLS", 1)))
+CUSTOMER_SUPPORT_AGENT_WORKERS = int(os.environ.get("CUSTOMER_SUPPORT_AGENT_WORKERS", 8))
+CUSTOMER_SUPPORT_SPECULATIVE_KB = bool(int(os.environ.get("CUSTOMER_SUPPORT_SPECULATIVE_KB", 1)))
+CUSTOMER_SUPPORT_SPECULATIVE_KB_WAIT_SECONDS = float(os.environ.get("CUSTOMER_SUPPORT_SPECULATIVE_KB_WAIT_SECONDS", 0.5))
+CUSTOMER_SUPPORT_BILLING_USER_EMAIL = os.environ.get("CUSTOMER_SUPPORT_BILLING_USER_EMAIL", "mohammad@teetimegolfpass.com")
+CUSTOMER_SUPPORT_CHAT_HISTORY_TTL = int(os.environ.get("CUSTOMER_SUPPORT_CHAT_HISTORY_TTL", 60 * 60 * 24))
+CUSTOMER_SUPPORT_CHAT_HISTORY_MAX_MESSAGES = int(os.environ.get("CUSTOMER_SUPPORT_CHAT_HISTORY_MAX_MESSAGES", 500))
+CUSTOMER_SUPPORT_USER_LOOKUP_DB_TIMEOUT = float(os.environ.get("CUSTOMER_SUPPORT_USER_LOOKUP_DB_TIMEOUT", 3))
+CUSTOMER_SUPPORT_USER_LOOKUP_ZOHO_TIMEOUT = float(os.environ.get("CUSTOMER_SUPPORT_USER_LOOKUP_ZOHO_TIMEOUT", 4))
+CUSTOMER_SUPPORT_USER_LOOKUP_CACHE_TTL = int(os.environ.get("CUSTOMER_SUPPORT_USER_LOOKUP_CACHE_TTL", 120))
+
+KB_RETRIEVAL_MODE = os.environ.get("KB_RETRIEVAL_MODE", "ann")
+KB_HNSW_EF_SEARCH = int(os.environ.get("KB_HNSW_EF_SEARCH", 40))
+KB_ANN_CANDIDATE_MULTIPLIER = int(os.environ.get("KB_ANN_CANDIDATE_MULTIPLIER", 4))
+KB_QUERY_EMBEDDING_CACHE_TTL = int(os.environ.get("KB_QUERY_EMBEDDING_CACHE_TTL", 60 * 60 * 24 * 7))
+KB_QUERY_EMBEDDING_LOCAL_CACHE_SIZE = int(os.environ.get("KB_QUERY_EMBEDDING_LOCAL_CACHE_SIZE", 256))
+KB_SEMANTIC_CACHE_MAX_DISTANCE = float(os.environ.get("KB_SEMANTIC_CACHE_MAX_DISTANCE", 0.08))
+KB_SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("KB_SEMANTIC_CACHE_MAX_ENTRIES", 200))
+KB_SEMANTIC_CACHE_TTL = int(os.environ.get("KB_SEMANTIC_CACHE_TTL", 60 * 60 * 6))
+KB_INGESTION_BATCH_SIZE = int(os.environ.get("KB_INGESTION_BATCH_SIZE", 500))
+KB_INGESTION_COPY_THRESHOLD = int(os.environ.get("KB_INGESTION_COPY_THRESHOLD", 2000))
+KB_INGESTION_ASYNC = bool(int(os.environ.get("KB_INGESTION_ASYNC", 1)))
+KB_INGESTION_PROGRESS_INTERVAL = float(os.environ.get("KB_INGESTION_PROGRESS_INTERVAL", 1))
+KB_INGESTION_LOCK_TIMEOUT = int(os.environ.get("KB_INGESTION_LOCK_TIMEOUT", 600))
+
+# ---------------- END OF CUSTOMER SUPPORT VARS ----------------
@@ -0,0 +1,180 @@
+from django.conf import settings
+from django.core.cache import cache
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for third-party APIs (Zoho, RevenueCat, ...).
+
+    - One keep-alive requests.Session per upstream host and process, so repeated calls reuse TCP/TLS connections.
+    - Connect/read timeouts on every request (HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT by default).
+    - Retries on 429/5xx and connection errors with jittered exponential backoff, honouring Retry-After.
+      Non-idempotent methods (POST, PATCH) are only retried on 429 and on failures to connect.
+    - Per-upstream request, error, retry and latency counters in a Redis hash, see stats().
+    """
+
+    STATS_KEY = "http_upstream_stats"
+
+    _lock = threading.Lock()
+    _sessions = {}
+    _pid = None
+
+    @classmethod
+    def session(cls, host):
+        """
+        Returns the keep-alive session of an upstream host, creating it on first use.
+
+        Args:
+            host (str): The upstream host, e.g. 'desk.zoho.com'.
+
+        Returns:
+            requests.Session: The shared session.
+        """
+        pid = os.getpid()
+        if cls._pid != pid:
+            with cls._lock:
+                if cls._pid != pid:
+                    cls._sessions = {}
+                    cls._pid = pid
+        session = cls._sessions.get(host)
+        if session is None:
+            with cls._lock:
+                session = cls._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.HTTP_POOL_MAXSIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._sessions[host] = session
+        return session
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, settings.HTTP_BACKOFF_MAX)
+        return random.uniform(0, min(settings.HTTP_BACKOFF_MAX, settings.HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+    @classmethod
+    def _record(cls, upstream, latency, error=False, retries=0):
+        try:
+            pipe = cache.client.get_client(write=True).pipeline()
+            pipe.hincrby(cls.STATS_KEY, f"{upstream}:requests", 1)
+            pipe.hincrby(cls.STATS_KEY, f"{upstream}:latency_ms", int(latency * 1000))
+            if error:
+                pipe.hincrby(cls.STATS_KEY, f"{upstream}:errors", 1)
+            if retries:
+                pipe.hincrby(cls.STATS_KEY, f"{upstream}:retries", retries)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @classmethod
+    def request(cls, method, url, timeout=None, max_retries=None, **kwargs):
+        """
+        Sends an HTTP request through the shared session of the url's host.
+
+        Args:
+            method (str): HTTP method ('GET', 'POST', 'PUT', ...).
+            url (str): Full URL.
+            timeout (tuple, optional): (connect, read) timeout in seconds.
+                Defaults to (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT).
+            max_retries (int, optional): Retries after the first attempt. Defaults to settings.HTTP_MAX_RETRIES.
+            **kwargs: Passed on to requests (headers, json, data, params, ...).
+
+        Returns:
+            requests.Response or None: The final response (possibly an error status), or None if no response
+                could be obtained.
+
+        Example:
+            response = HttpClient.request("GET", "https://desk.zoho.com/api/v1/tickets", headers=headers)
+        """
+        method = method.upper()
+        upstream = urlsplit(url).netloc
+        session = cls.session(upstream)
+        timeout = timeout or (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+        max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        idempotent = method in IDEMPOTENT_METHODS
+
+        started_at = time.perf_counter()
+        response = None
+        attempt = 0
+        while True:
+            error = None
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                error = e
+                response = None
+
+            if error is not None:
+                retryable = idempotent or isinstance(error, requests.exceptions.ConnectionError)
+            else:
+                retryable = response.status_code in RETRY_STATUSES and (idempotent or response.status_code == 429)
+
+            if not retryable or attempt >= max_retries:
+                break
+            time.sleep(cls._backoff(attempt, cls._retry_after(response)))
+            attempt += 1
+
+        failed = response is None or response.status_code >= 500 or response.status_code == 429
+        if response is None:
+            print(f"❌ {method} {url} failed: {error}")
+        cls._record(upstream, time.perf_counter() - started_at, error=failed, retries=attempt)
+        return response
+
+    @classmethod
+    def get(cls, url, **kwargs):
+        return cls.request("GET", url, **kwargs)
+
+    @classmethod
+    def post(cls, url, **kwargs):
+        return cls.request("POST", url, **kwargs)
+
+    @classmethod
+    def put(cls, url, **kwargs):
+        return cls.request("PUT", url, **kwargs)
+
+    @classmethod
+    def stats(cls):
+        """
+        Returns request, error and retry counts and the average latency per upstream host.
+
+        Returns:
+            dict: {host: {"requests": int, "errors": int, "retries": int, "avg_latency_ms": float}}
+        """
+        raw = cache.client.get_client(write=True).hgetall(cls.STATS_KEY) or {}
+        stats = {}
+        for key, value in raw.items():
+            key = key.decode() if isinstance(key, bytes) else key
+            upstream, _, field = key.rpartition(":")
+            stats.setdefault(upstream, {"requests": 0, "errors": 0, "retries": 0, "latency_ms": 0})[field] = int(value)
+        for counters in stats.values():
+            latency_ms = counters.pop("latency_ms", 0)
+            counters["avg_latency_ms"] = latency_ms / counters["requests"] if counters["requests"] else 0.0
+        return stats
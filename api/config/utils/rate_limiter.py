@@ -0,0 +1,39 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly so a pool of workers stays under an upstream's request rate.
+
+    Each acquire() reserves the next free slot (one every 60 / requests_per_minute seconds) and sleeps until it,
+    so bursts from many threads are smoothed out instead of being rejected upstream with 429s.
+    """
+
+    def __init__(self, requests_per_minute):
+        """
+        Args:
+            requests_per_minute (float): Max calls per minute across every thread sharing the limiter.
+                0 or None disables limiting.
+        """
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until the caller may send its next request.
+
+        Example:
+            limiter = RateLimiter(requests_per_minute=300)
+            limiter.acquire()
+            response = HttpClient.get(url)
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -31,6 +31,11 @@ class RedisQueue:
         raw = self.client.lpop(self.key)
         return json.loads(raw) if raw else None
 
+    def wait_for_task(self, timeout=1):
+        """Block up to `timeout` seconds for a task at the front, then remove and return it."""
+        item = self.client.blpop(self.key, timeout=timeout)
+        return json.loads(item[1]) if item else None
+
     def peek_all(self):
         """View all tasks without removing them."""
         raw_list = self.client.lrange(self.key, 0, -1)
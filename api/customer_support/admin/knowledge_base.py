@@ -18,7 +18,13 @@ class CustomerSupportKnowledgeBaseChunkModelAdmin(admin.ModelAdmin):
     def kb_url(self, obj):
         return obj.kb.url
 
+class KnowledgeBaseIngestionJobModelAdmin(admin.ModelAdmin):
+    list_display = ['uuid', 'url', 'status', 'processed_chunks', 'total_chunks']
+    list_per_page = 10
+    search_fields = ['url']
+    list_filter = ['status']
+
 class ZohoDeskTicketModelAdmin(admin.ModelAdmin):
-    list_display = ['ticket_id']
+    list_display = ['ticket_id', 'modified_time']
     list_per_page = 10
     search_fields = ['ticket_id']
\ No newline at end of file
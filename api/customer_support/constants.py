@@ -287,4 +287,39 @@ LIST_OF_GREETING_MESSAGES = [
     "TeeTime GolfPass support—how can I help you?",
     "Hi! How can I assist you with your TeeTime GolfPass?",
     "Welcome to TeeTime support. What can I do for you today?"
-]
\ No newline at end of file
+]
+
+KB_EMBEDDING_MODEL = "text-embedding-3-large"
+KB_ANN_EMBEDDING_DIMENSIONS = 1536
+
+# Turns sent to the model per call; older turns fall out of the window instead of being summarized
+AGENT_MAX_HISTORY_MESSAGES = 40
+
+# Account lookup on the production app database; $1 is the email and $2 the row cap.
+# User columns are projected explicitly so credentials never reach the prompt.
+USER_LOOKUP_QUERY = """
+    SELECT u.id AS user_id, u.email, to_jsonb(up) AS subscription, to_jsonb(p) AS product
+    FROM public."user" u
+    JOIN public."user_product" up ON up.user_id = u.id
+    JOIN product p ON up.product_id = p.id
+    WHERE u.email = $1
+    LIMIT $2
+"""
+USER_LOOKUP_MAX_ROWS = 10
+
+# Zoho Desk ticket sync: page size of the ticket listings, and how far back each incremental sync re-reads
+# before its stored cursor so tickets modified while the previous sync was running are not missed
+ZOHO_DESK_SYNC_PAGE_SIZE = 100
+ZOHO_DESK_SYNC_CURSOR_OVERLAP_SECONDS = 300
+# Ticket summaries for the knowledge base: tickets loaded and written per batch, and the cap on the transcript
+# sent to the model so a runaway thread cannot blow up the prompt
+ZOHO_TICKET_SUMMARY_BATCH_SIZE = 50
+ZOHO_TICKET_SUMMARY_MAX_INPUT_CHARS = 60000
+
+# User utterances shorter than this are not worth a speculative knowledge base lookup (e.g. "yes", "that's right")
+AGENT_SPECULATIVE_MIN_WORDS = 3
+
+AGENT_ERROR_MESSAGE = (
+    "I’m sorry, I couldn’t process that just now. "
+    "Would you like me to try a different phrasing, or connect you with a human agent (Mon–Fri, 9am–5pm ET)?"
+)
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-16 10:12
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_support', '0004_alter_customersupportknowledgebase_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customersupportknowledgebasechunk',
+            name='embedding_ann',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customersupportknowledgebasechunk',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding_ann'], m=16, name='kb_chunk_embedding_ann_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
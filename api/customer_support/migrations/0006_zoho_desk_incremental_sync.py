@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_support', '0005_customersupportknowledgebasechunk_embedding_ann'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZohoDeskSyncState',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('cursor', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Zoho Desk Sync States',
+            },
+        ),
+        migrations.AddField(
+            model_name='zohodeskticket',
+            name='modified_time',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_support', '0006_zoho_desk_incremental_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zohodeskticket',
+            name='details_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='zohodeskticket',
+            name='summarized_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
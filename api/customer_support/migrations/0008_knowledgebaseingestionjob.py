@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_support', '0007_zohodeskticket_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KnowledgeBaseIngestionJob',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('url', models.TextField(max_length=2048)),
+                ('description', models.TextField()),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('total_chunks', models.PositiveIntegerField(default=0)),
+                ('processed_chunks', models.PositiveIntegerField(default=0)),
+                ('failed_chunks', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('kb', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingestion_jobs', to='customer_support.customersupportknowledgebase')),
+            ],
+            options={
+                'verbose_name_plural': 'Knowledge Base Ingestion Jobs',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
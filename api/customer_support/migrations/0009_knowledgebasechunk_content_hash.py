@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_support', '0008_knowledgebaseingestionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customersupportknowledgebasechunk',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='knowledgebaseingestionjob',
+            name='reused_chunks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -2,6 +2,8 @@ from customer_support.models import knowledge_base, conversation
 
 CustomerSupportKnowledgeBaseModel = knowledge_base.CustomerSupportKnowledgeBase
 CustomerSupportKnowledgeBaseChunkModel = knowledge_base.CustomerSupportKnowledgeBaseChunk
+KnowledgeBaseIngestionJobModel = knowledge_base.KnowledgeBaseIngestionJob
 ZohoDeskTicketModel = knowledge_base.ZohoDeskTicket
+ZohoDeskSyncStateModel = knowledge_base.ZohoDeskSyncState
 
 CustomerSupportConversationModel = conversation.CustomerSupportPhoneCall
@@ -1,8 +1,13 @@
 from django.db import models
 from django.conf import settings
-from pgvector.django import VectorField
+from pgvector.django import VectorField, HnswIndex
+import hashlib
+import json
+import re
+import numpy as np
 
-from core.models.base_model import TimeStampedModel
+from core.models.base_model import TimeStampedModel, TimeStampedUUIDModel
+from customer_support.constants import KB_ANN_EMBEDDING_DIMENSIONS
 
 
 class CustomerSupportKnowledgeBase(TimeStampedModel):
@@ -20,22 +25,110 @@ class CustomerSupportKnowledgeBaseChunk(TimeStampedModel):
     kb = models.ForeignKey(CustomerSupportKnowledgeBase, on_delete=models.CASCADE, related_name="chunks")
     chunk_text = models.TextField()
     embedding = VectorField(dimensions=3072)
+    embedding_ann = VectorField(dimensions=KB_ANN_EMBEDDING_DIMENSIONS, blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
 
     def __str__(self):
         return f"{self.kb.id}"
 
+    @staticmethod
+    def hash_content(url, text):
+        """
+        Returns the sha256 of a chunk's URL and whitespace-normalized text, so a recrawled page can tell which of
+        its chunks are already stored.
+        """
+        normalized = re.sub(r"\s+", " ", text or "").strip()
+        return hashlib.sha256(f"{url}\n{normalized}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def reduce_embedding(vector, dimensions=KB_ANN_EMBEDDING_DIMENSIONS):
+        """
+        Shortens a text-embedding-3 vector to `dimensions` by truncating and re-normalizing it,
+        which is equivalent to requesting the embedding with the `dimensions` parameter.
+        """
+        if vector is None or len(vector) < dimensions:
+            return None
+        reduced = np.asarray(vector[:dimensions], dtype=np.float32)
+        norm = np.linalg.norm(reduced)
+        return (reduced / norm).tolist() if norm else None
+
+    def save(self, *args, **kwargs):
+        if self.embedding_ann is None:
+            self.embedding_ann = self.reduce_embedding(self.embedding)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Customer Support Knowledge Base Chunks"
         ordering = ('-updated_at',)
+        indexes = [
+            HnswIndex(
+                name="kb_chunk_embedding_ann_hnsw",
+                fields=["embedding_ann"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
+        ]
+
+class KnowledgeBaseIngestionJob(TimeStampedUUIDModel):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    url = models.TextField(max_length=2048)
+    description = models.TextField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    total_chunks = models.PositiveIntegerField(default=0)
+    processed_chunks = models.PositiveIntegerField(default=0)
+    failed_chunks = models.PositiveIntegerField(default=0)
+    reused_chunks = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    kb = models.ForeignKey(CustomerSupportKnowledgeBase, on_delete=models.SET_NULL, blank=True, null=True, related_name="ingestion_jobs")
+
+    def __str__(self):
+        return f"{self.uuid}"
+
+    class Meta:
+        verbose_name_plural = "Knowledge Base Ingestion Jobs"
+        ordering = ('-created_at',)
 
 class ZohoDeskTicket(TimeStampedModel):
     ticket_id = models.CharField(max_length=255, unique=True)
+    modified_time = models.DateTimeField(blank=True, null=True, db_index=True)
     details = models.JSONField(blank=True, null=True)
+    details_hash = models.CharField(max_length=64, blank=True, null=True)
+    summarized_hash = models.CharField(max_length=64, blank=True, null=True)
     
 
     def __str__(self):
         return f"{self.ticket_id}"
 
+    @staticmethod
+    def hash_details(details):
+        """
+        Returns a stable sha256 of the ticket threads, so unchanged tickets can be recognized without comparing them.
+        """
+        payload = json.dumps(details, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     class Meta:
         verbose_name_plural = "Zoho Desk Tickets"
-        ordering = ('-updated_at',)
\ No newline at end of file
+        ordering = ('-updated_at',)
+
+
+class ZohoDeskSyncState(TimeStampedModel):
+    name = models.CharField(max_length=255, unique=True)
+    cursor = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name}"
+
+    class Meta:
+        verbose_name_plural = "Zoho Desk Sync States"
@@ -1,3 +1,4 @@
 from customer_support.serializers import knowledge_base
 
-KnowledgeBaseSerializer = knowledge_base.KnowledgeBaseSerializer
\ No newline at end of file
+KnowledgeBaseSerializer = knowledge_base.KnowledgeBaseSerializer
+KnowledgeBaseIngestionJobSerializer = knowledge_base.KnowledgeBaseIngestionJobSerializer
\ No newline at end of file
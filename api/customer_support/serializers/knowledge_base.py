@@ -1,10 +1,18 @@
 from rest_framework import serializers
 
-from customer_support.models import CustomerSupportKnowledgeBaseModel
+from customer_support.models import CustomerSupportKnowledgeBaseModel, KnowledgeBaseIngestionJobModel
 
 class KnowledgeBaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomerSupportKnowledgeBaseModel
         fields = ['id', 'url', 'description',
-                  'created_at', 'updated_at']        
\ No newline at end of file
+                  'created_at', 'updated_at']
+
+class KnowledgeBaseIngestionJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source='uuid', read_only=True)
+
+    class Meta:
+        model = KnowledgeBaseIngestionJobModel
+        fields = ['job_id', 'url', 'status', 'total_chunks', 'processed_chunks',
+                  'failed_chunks', 'reused_chunks', 'error', 'kb', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1 @@
+from customer_support.signals.knowledge_base import invalidate_semantic_answer_cache
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from customer_support.models import CustomerSupportKnowledgeBaseModel, CustomerSupportKnowledgeBaseChunkModel
+from customer_support.utils.answer_cache import SemanticAnswerCache
+
+@receiver([post_save, post_delete], sender=CustomerSupportKnowledgeBaseModel)
+@receiver([post_save, post_delete], sender=CustomerSupportKnowledgeBaseChunkModel)
+def invalidate_semantic_answer_cache(sender, instance, **kwargs):
+    SemanticAnswerCache.invalidate()
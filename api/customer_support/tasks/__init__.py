@@ -1,12 +1,30 @@
 from celery import shared_task
 
 from customer_support.tasks.twilio_manager import process_ai_response
-from customer_support.tasks.twilio_manager import process_ai_response, save_chat_summary_to_db
+from customer_support.tasks.twilio_manager import process_ai_response, stream_ai_response, save_chat_summary_to_db
+from customer_support.tasks.knowledge_base import ingest_knowledge_base_document
+from customer_support.tasks.zoho import refresh_zoho_access_token, sync_zoho_desk_tickets
 
 @shared_task
 def process_ai_response_task(call_sid, user_message):
     process_ai_response(call_sid, user_message)
 
+@shared_task
+def stream_ai_response_task(call_sid, user_message):
+    stream_ai_response(call_sid, user_message)
+
 @shared_task
 def save_chat_summary_to_db_task(call_sid):
-    save_chat_summary_to_db(call_sid)
\ No newline at end of file
+    save_chat_summary_to_db(call_sid)
+
+@shared_task
+def refresh_zoho_access_token_task():
+    refresh_zoho_access_token()
+
+@shared_task
+def sync_zoho_desk_tickets_task(full=False, summarize=True):
+    sync_zoho_desk_tickets(full=full, summarize=summarize)
+
+@shared_task
+def ingest_knowledge_base_document_task(job_id):
+    ingest_knowledge_base_document(job_id)
\ No newline at end of file
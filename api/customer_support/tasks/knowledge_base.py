@@ -0,0 +1,41 @@
+from customer_support.models import KnowledgeBaseIngestionJobModel
+from customer_support.utils.agent_runtime import AgentRuntime
+from customer_support.utils.kb_ingestion import KnowledgeBaseIngestor, IngestionJobProgress
+
+
+def ingest_knowledge_base_document(job_id):
+    """
+    Chunks the document of a knowledge base ingestion job and syncs it into the knowledge base, embedding only new
+    chunks and publishing progress as it goes.
+
+    Args:
+        job_id (int): The id of the KnowledgeBaseIngestionJob.
+
+    Returns:
+        KnowledgeBaseIngestionJob or None: The finished job, or None if it does not exist.
+    """
+    job = KnowledgeBaseIngestionJobModel.objects.filter(id=job_id).first()
+    if not job:
+        print(f"❌ Knowledge base ingestion job {job_id} not found")
+        return None
+    progress = IngestionJobProgress(job)
+    job.status = KnowledgeBaseIngestionJobModel.STATUS_RUNNING
+    progress.publish()
+    try:
+        open_ai_manager = AgentRuntime.get().open_ai_manager(model="gpt-4o")
+        result = KnowledgeBaseIngestor().sync_document(
+            url=job.url,
+            description=job.description,
+            open_ai_manager=open_ai_manager,
+            progress_callback=progress,
+        )
+        job.kb = result["kb"]
+        job.total_chunks = result["total"]
+        job.reused_chunks = result["reused"]
+        job.status = KnowledgeBaseIngestionJobModel.STATUS_SUCCEEDED
+    except Exception as e:
+        print(f"❌ Knowledge base ingestion job {job_id} failed: {e}")
+        job.status = KnowledgeBaseIngestionJobModel.STATUS_FAILED
+        job.error = str(e)
+    progress.publish()
+    return job
@@ -1,17 +1,19 @@
 from django.core.cache import cache
 from django.conf import settings
 import json
-import requests
+from concurrent.futures import ThreadPoolExecutor
 
-from core.models import UserModel
-from ai.utils.open_ai_manager import OpenAIManager
 from customer_support.models import CustomerSupportConversationModel
+from customer_support.utils.agent_runtime import AgentRuntime
+from customer_support.utils.chat_history import ChatHistoryStore
 from customer_support.utils.teetime_agent_manager import TeeTimeSupportAgent
+from customer_support.utils.agent_transport import get_agent_transport
+from customer_support.utils.voice_stream_manager import VoiceStreamManager
 
 
 def process_ai_response(call_sid, user_message):
     """
-    Sends the user message to the backend AI, generates a bot response, and stores the result in cache.
+    Sends the user message to the AI agent through the configured transport, generates the bot audio, and stores the result in cache.
 
     Args:
         call_sid (str): The unique call/session ID.
@@ -20,24 +22,8 @@ def process_ai_response(call_sid, user_message):
     Returns:
         None
     """
-    API_URL = f"{settings.CLIENT_URL}/api/customer-support/"
-    payload = {
-        "session_id": call_sid or "unknown",
-        "user_message": user_message,
-    }
     try:
-        backend_response = requests.post(API_URL, json=payload, timeout=120).json() or {}
-        bot_message = backend_response.get("bot_message") or ""
-        if isinstance(bot_message, str):
-            while True:
-                try:
-                    parsed = json.loads(bot_message)
-                    if isinstance(parsed, dict) and "message_to_user" in parsed:
-                        bot_message = parsed["message_to_user"]
-                        continue  # keep unwrapping
-                    break
-                except Exception:
-                    break
+        bot_message = get_agent_transport().send(call_sid, user_message)
         agent = TeeTimeSupportAgent(call_sid)
         audio_url = agent.generate_bot_message(bot_message) if bot_message else None
         cache.set(f"{call_sid}_ai_response", {"text": bot_message, "audio_url": audio_url}, timeout=3600)
@@ -45,6 +31,45 @@ def process_ai_response(call_sid, user_message):
         print(f"Error in processing AI response: {e}")
         cache.set(f"{call_sid}_ai_response", {"text": "Sorry, there was a problem processing your request.", "audio_url": None}, timeout=3600)
 
+def stream_ai_response(call_sid, user_message):
+    """
+    Runs the agent in-process and publishes the reply sentence by sentence, so the Twilio webhook can start
+    playing the first sentence while the rest is still being generated.
+
+    Args:
+        call_sid (str): The unique call/session ID.
+        user_message (str): The user's message to process.
+
+    Returns:
+        None
+    """
+    stream = VoiceStreamManager(call_sid)
+    agent = TeeTimeSupportAgent(call_sid)
+    tts_executor = ThreadPoolExecutor(max_workers=1)
+
+    def synthesize_and_push(sentence):
+        try:
+            audio_url = agent.generate_bot_message(sentence)
+        except Exception as e:
+            print(f"Error synthesizing streamed sentence: {e}")
+            audio_url = None
+        stream.push_segment(sentence, audio_url)
+
+    def on_sentence(sentence):
+        tts_executor.submit(synthesize_and_push, sentence)
+
+    try:
+        bot_message = agent.respond(user_message, on_sentence=on_sentence)
+        tts_executor.shutdown(wait=True)
+        if not agent._last_result.get("streamed"):
+            synthesize_and_push(bot_message)
+    except Exception as e:
+        print(f"Error in streaming AI response: {e}")
+        tts_executor.shutdown(wait=True)
+        stream.push_segment("Sorry, there was a problem processing your request.")
+    finally:
+        stream.finish()
+
 def chat_history_to_text(chat_history):
     """
     Converts a chat history list into a readable text transcript.
@@ -76,7 +101,7 @@ def generate_summary_of_conversation(call_sid):
     Returns:
         dict: A dictionary with 'title' and 'summary' keys.
     """
-    chat_history = cache.get(f"chat_history_{call_sid}", [])
+    chat_history = ChatHistoryStore(call_sid).get()
     text_to_summarize = chat_history_to_text(chat_history)
     system_prompt = (
         "You are a customer support AI. Given the full conversation between a user and an assistant, "
@@ -85,8 +110,7 @@ def generate_summary_of_conversation(call_sid):
         "Make sure your summary includes all key points, such as any email address, phone number, or other personal information mentioned in the conversation. "
         "Return ONLY a JSON object in your response, in the format: {\"title\": <short_title>, \"summary\": <detailed_summary>}. Do not include any extra text."
     )
-    cur_user = UserModel.objects.filter(email="mohammad@teetimegolfpass.com").first()
-    openai_manager = OpenAIManager(model="gpt-4o", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=[cur_user])
+    openai_manager = AgentRuntime.get().open_ai_manager(model="gpt-4o")
     openai_manager.clear_messages()
     openai_manager.add_message("system", system_prompt)
     openai_manager.add_message("user", text_to_summarize)
@@ -125,7 +149,7 @@ def save_chat_summary_to_db(call_sid):
     result = generate_summary_of_conversation(call_sid)
     title = result.get("title", "Summary")
     summary = result.get("summary", "")
-    chat_history = cache.get(f"chat_history_{call_sid}", [])
+    chat_history = ChatHistoryStore(call_sid).get()
     try:
         obj, _ = CustomerSupportConversationModel.objects.update_or_create(
             call_sid=call_sid,
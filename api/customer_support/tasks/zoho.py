@@ -0,0 +1,36 @@
+from django.conf import settings
+
+from customer_support.utils.connection_config import ConnectionConfigManager
+from customer_support.utils.knowledge_base import add_zoho_desk_tickets_to_db, add_zoho_desk_tickets_to_kb
+
+
+def refresh_zoho_access_token():
+    """
+    Refreshes the shared Zoho OAuth token ahead of its expiry, so request paths never have to wait for a refresh.
+
+    Returns:
+        dict: The result of ConnectionConfigManager.get_zoho_access_token.
+    """
+    result = ConnectionConfigManager().get_zoho_access_token(min_validity=settings.ZOHO_TOKEN_REFRESH_AHEAD_SECONDS)
+    if not result["success"]:
+        print(f"❌ Zoho token refresh failed: {result['message']}")
+    return result
+
+
+def sync_zoho_desk_tickets(full=False, summarize=True):
+    """
+    Syncs Zoho Desk tickets changed since the last sync (or every ticket when full) into the database, then
+    summarizes the tickets whose content changed into the knowledge base.
+
+    Args:
+        full (bool): Walk every ticket instead of only the changed ones. Default is False.
+        summarize (bool): Refresh the knowledge base summaries after the sync. Default is True.
+
+    Returns:
+        dict: The result of ZohoDeskManager.sync_tickets.
+    """
+    result = add_zoho_desk_tickets_to_db(full=full)
+    print(f"Zoho Desk sync: {result}")
+    if summarize:
+        print(f"Zoho Desk summaries: {add_zoho_desk_tickets_to_kb()}")
+    return result
\ No newline at end of file
@@ -5,6 +5,7 @@ from customer_support import views
 
 urlpatterns = [
     path('knowledge-base/', views.KnowledgeBaseViewSet),
+    path('knowledge-base/jobs/<uuid:job_id>/', views.KnowledgeBaseIngestionJobViewSet),
     path('customer-support/', views.CustomerSupportViewSet),
     path('twilio-voice/', views.TwilioVoiceWebhookViewSet),
 ]
@@ -0,0 +1,99 @@
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from core.models import UserModel
+from ai.utils.client_registry import ClientRegistry
+from ai.utils.open_ai_manager import OpenAIManager
+from ai.utils.google_ai_manager import GoogleAIManager
+from customer_support.utils.connection_config import ConnectionConfigManager
+
+
+class AgentRuntime:
+    """
+    Process-wide runtime shared by every TeeTimeSupportAgent.
+
+    Holds the billing-user lookup, the connection manager, the warm OpenAI/Google clients and a small thread pool
+    for speculative work, so building an agent for a webhook hit or an API call only creates lightweight
+    per-session managers.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, billing_user_ttl=600):
+        """
+        Args:
+            billing_user_ttl (int): Seconds to keep the billing user before looking it up again. Default is 600.
+        """
+        self.billing_user_ttl = billing_user_ttl
+        self.connection_manager = ConnectionConfigManager()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.CUSTOMER_SUPPORT_AGENT_WORKERS,
+            thread_name_prefix="support-agent",
+        )
+        self._billing_user = None
+        self._billing_user_expires_at = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the runtime of the current process, creating it on first use.
+
+        Example:
+            runtime = AgentRuntime.get()
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get_billing_users(self):
+        """
+        Returns the users AI costs of the support agent are billed to.
+
+        Returns:
+            list: [billing_user], or an empty list if the billing user does not exist.
+        """
+        now = time.monotonic()
+        if now >= self._billing_user_expires_at:
+            with self._lock:
+                if now >= self._billing_user_expires_at:
+                    self._billing_user = UserModel.objects.filter(email=settings.CUSTOMER_SUPPORT_BILLING_USER_EMAIL).first()
+                    self._billing_user_expires_at = now + self.billing_user_ttl
+        return [self._billing_user] if self._billing_user else []
+
+    def open_ai_manager(self, model="gpt-4o"):
+        """
+        Builds a per-session OpenAIManager on top of the shared OpenAI client.
+
+        Args:
+            model (str): The OpenAI model name. Default is 'gpt-4o'.
+
+        Returns:
+            OpenAIManager: A new manager with its own message history.
+        """
+        return OpenAIManager(model=model, api_key=settings.OPEN_AI_SECRET_KEY, cur_users=self.get_billing_users())
+
+    def google_manager(self):
+        """
+        Builds a per-session GoogleAIManager on top of the shared Google clients.
+
+        Returns:
+            GoogleAIManager: A new manager.
+        """
+        return GoogleAIManager(api_key=settings.GOOGLE_API_KEY, cur_users=self.get_billing_users())
+
+    def warm_up(self):
+        """
+        Creates the shared clients and loads the billing user ahead of the first call.
+        """
+        try:
+            self.get_billing_users()
+            ClientRegistry.openai_client(settings.OPEN_AI_SECRET_KEY)
+            ClientRegistry.google_tts_client()
+        except Exception as e:
+            print(f"Error warming up agent runtime: {e}")
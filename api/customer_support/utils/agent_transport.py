@@ -0,0 +1,100 @@
+from django.conf import settings
+import requests
+
+from customer_support.constants import AGENT_ERROR_MESSAGE
+from customer_support.utils.teetime_agent_manager import TeeTimeSupportAgent
+
+
+class BaseAgentTransport:
+    """
+    Base class for the ways a user message can be delivered to the support agent.
+    """
+
+    def send(self, session_id, user_message):
+        """
+        Delivers a user message to the agent and returns its reply.
+        Must be implemented in subclasses.
+
+        Args:
+            session_id (str): The unique call/session ID.
+            user_message (str): The user's message.
+
+        Returns:
+            str: The bot message to say to the user.
+        """
+        raise NotImplementedError("Subclasses must implement send.")
+
+
+class InProcessAgentTransport(BaseAgentTransport):
+    """
+    Runs the agent directly in the current process (web or Celery worker).
+    """
+
+    def send(self, session_id, user_message):
+        """
+        Runs one agent turn in-process.
+
+        Example:
+            bot_message = InProcessAgentTransport().send("CA123", "How much is the Super Pass?")
+        """
+        try:
+            agent = TeeTimeSupportAgent(session_id=session_id)
+            return agent.respond(user_message)
+        except Exception as e:
+            print(f"Error running agent in-process: {e}")
+            return AGENT_ERROR_MESSAGE
+
+
+class HttpAgentTransport(BaseAgentTransport):
+    """
+    Sends the message to the customer-support API endpoint, for when the agent must run on another host.
+    """
+
+    def __init__(self, api_url=None, timeout=120):
+        """
+        Args:
+            api_url (str, optional): Customer-support endpoint. Defaults to {CLIENT_URL}/api/customer-support/.
+            timeout (int): Request timeout in seconds. Default is 120.
+        """
+        self.api_url = api_url or f"{settings.CLIENT_URL}/api/customer-support/"
+        self.timeout = timeout
+
+    def send(self, session_id, user_message):
+        """
+        Posts one agent turn to the customer-support endpoint.
+
+        Example:
+            bot_message = HttpAgentTransport().send("CA123", "How much is the Super Pass?")
+        """
+        payload = {
+            "session_id": session_id or "unknown",
+            "user_message": user_message,
+        }
+        backend_response = requests.post(self.api_url, json=payload, timeout=self.timeout).json() or {}
+        return backend_response.get("bot_message") or ""
+
+
+AGENT_TRANSPORTS = {
+    "in_process": InProcessAgentTransport,
+    "http": HttpAgentTransport,
+}
+
+
+def get_agent_transport(name=None):
+    """
+    Returns the configured agent transport.
+
+    Args:
+        name (str, optional): Transport name. Defaults to settings.CUSTOMER_SUPPORT_AGENT_TRANSPORT.
+
+    Returns:
+        BaseAgentTransport: The transport instance.
+
+    Example:
+        bot_message = get_agent_transport().send(call_sid, user_message)
+    """
+    name = name or settings.CUSTOMER_SUPPORT_AGENT_TRANSPORT
+    transport_class = AGENT_TRANSPORTS.get(name)
+    if not transport_class:
+        raise ValueError(f"Unknown agent transport {name}")
+    return transport_class()
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.cache import cache
+import base64
+import json
+import numpy as np
+
+from customer_support.models import CustomerSupportKnowledgeBaseChunkModel
+
+
+class SemanticAnswerCache:
+    """
+    Semantic cache of knowledge-base answers.
+
+    Recently answered questions are kept in a capped Redis list together with their (reduced, normalized)
+    embeddings. A new question whose embedding lies within KB_SEMANTIC_CACHE_MAX_DISTANCE (cosine distance)
+    of a cached one reuses its answer instead of searching pgvector again.
+
+    Each process mirrors the list as a numpy matrix and only reloads it when the generation counter changes,
+    so a lookup costs two small GETs plus a matrix product. Changing the knowledge base bumps the version,
+    which invalidates every entry at once.
+    """
+
+    VERSION_KEY = "kb_semantic_answer_cache_version"
+
+    _local_state = {"version": None, "generation": None, "matrix": None, "answers": []}
+
+    def __init__(self, max_distance=None, max_entries=None, ttl=None):
+        """
+        Args:
+            max_distance (float, optional): Max cosine distance for a hit. Defaults to settings.KB_SEMANTIC_CACHE_MAX_DISTANCE.
+            max_entries (int, optional): Number of answers kept. Defaults to settings.KB_SEMANTIC_CACHE_MAX_ENTRIES.
+            ttl (int, optional): Seconds to keep the cached answers. Defaults to settings.KB_SEMANTIC_CACHE_TTL.
+        """
+        self.max_distance = max_distance if max_distance is not None else settings.KB_SEMANTIC_CACHE_MAX_DISTANCE
+        self.max_entries = max_entries or settings.KB_SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.KB_SEMANTIC_CACHE_TTL
+        self.client = cache.client.get_client(write=True)
+
+    def _entries_key(self, version):
+        return f"kb_semantic_answer_cache:{version}:entries"
+
+    def _generation_key(self, version):
+        return f"kb_semantic_answer_cache:{version}:generation"
+
+    def _current_version(self):
+        version = self.client.get(self.VERSION_KEY)
+        return int(version) if version else 0
+
+    def _load(self, version, generation):
+        """
+        Rebuilds the local matrix of cached embeddings when the shared list has changed.
+        """
+        state = self._local_state
+        if state["version"] == version and state["generation"] == generation:
+            return state
+        vectors, answers = [], []
+        for raw in self.client.lrange(self._entries_key(version), 0, -1):
+            try:
+                entry = json.loads(raw)
+                vectors.append(np.frombuffer(base64.b64decode(entry["embedding"]), dtype=np.float32))
+                answers.append(entry["answer"])
+            except Exception:
+                continue
+        state = {
+            "version": version,
+            "generation": generation,
+            "matrix": np.vstack(vectors) if vectors else None,
+            "answers": answers,
+        }
+        SemanticAnswerCache._local_state = state
+        return state
+
+    def lookup(self, embedding):
+        """
+        Returns the cached answer of the closest previously answered question, if it is close enough.
+
+        Args:
+            embedding (list): Full-size embedding of the new question.
+
+        Returns:
+            str or None: The cached answer, or None on a miss.
+
+        Example:
+            answer = SemanticAnswerCache().lookup(embedding)
+        """
+        reduced = CustomerSupportKnowledgeBaseChunkModel.reduce_embedding(embedding)
+        if reduced is None:
+            return None
+        version = self._current_version()
+        generation = self.client.get(self._generation_key(version))
+        state = self._load(version, generation)
+        if state["matrix"] is None:
+            return None
+        distances = 1 - state["matrix"] @ np.asarray(reduced, dtype=np.float32)
+        best = int(np.argmin(distances))
+        if distances[best] <= self.max_distance:
+            return state["answers"][best]
+        return None
+
+    def store(self, question, embedding, answer):
+        """
+        Caches the answer of a question.
+
+        Args:
+            question (str): The answered question.
+            embedding (list): Full-size embedding of the question.
+            answer (str): The answer text to reuse for similar questions.
+        """
+        reduced = CustomerSupportKnowledgeBaseChunkModel.reduce_embedding(embedding)
+        if reduced is None or not answer:
+            return
+        version = self._current_version()
+        entry = json.dumps({
+            "question": question,
+            "embedding": base64.b64encode(np.asarray(reduced, dtype=np.float32).tobytes()).decode("ascii"),
+            "answer": answer,
+        })
+        entries_key = self._entries_key(version)
+        generation_key = self._generation_key(version)
+        pipe = self.client.pipeline()
+        pipe.lpush(entries_key, entry)
+        pipe.ltrim(entries_key, 0, self.max_entries - 1)
+        pipe.expire(entries_key, self.ttl)
+        pipe.incr(generation_key)
+        pipe.expire(generation_key, self.ttl)
+        pipe.execute()
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drops every cached answer by moving to a new version. Old entries expire on their own.
+        """
+        try:
+            cache.client.get_client(write=True).incr(cls.VERSION_KEY)
+        except Exception as e:
+            print(f"Error invalidating semantic answer cache: {e}")
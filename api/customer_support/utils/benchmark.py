@@ -0,0 +1,103 @@
+from django.conf import settings
+import time
+import numpy as np
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from customer_support.models import CustomerSupportKnowledgeBaseChunkModel
+from customer_support.utils.connection_config import ConnectionConfigManager
+from customer_support.utils.kb_retrieval import KnowledgeBaseRetriever
+
+
+def _percentile(values, pct):
+    """
+    Returns the pct-th percentile of values in milliseconds, or 0 if values is empty.
+    """
+    return float(np.percentile(values, pct)) * 1000 if values else 0.0
+
+def _print_latencies(label, values):
+    print(f"{label}: p50={_percentile(values, 50):.1f}ms p99={_percentile(values, 99):.1f}ms (n={len(values)})")
+
+def benchmark_kb_retrieval(sample_size=50, top_k=3, noise=0.01, similarity_threshold=2.0):
+    """
+    Compares exact and ANN knowledge-base retrieval on queries built from stored chunk embeddings plus a little
+    noise, and prints latency percentiles and recall@k of ANN against the exact results.
+
+    Args:
+        sample_size (int): Number of sample queries. Default is 50.
+        top_k (int): Number of results per query. Default is 3.
+        noise (float): Standard deviation of the noise added to each sampled embedding. Default is 0.01.
+        similarity_threshold (float): Maximum cosine distance; 2.0 compares pure rankings. Default is 2.0.
+    """
+    sample = list(
+        CustomerSupportKnowledgeBaseChunkModel.objects.order_by("?").values_list("embedding", flat=True)[:sample_size]
+    )
+    if not sample:
+        print("No knowledge base chunks to benchmark.")
+        return
+    exact = KnowledgeBaseRetriever(mode="exact")
+    ann = KnowledgeBaseRetriever(mode="ann")
+    exact_times, ann_times, recalls = [], [], []
+    for embedding in sample:
+        query = np.asarray(embedding, dtype=np.float32)
+        query = (query + np.random.normal(0, noise, query.shape)).tolist()
+
+        start = time.perf_counter()
+        exact_ids = [c.id for c in exact.search(query, top_k=top_k, similarity_threshold=similarity_threshold)]
+        exact_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ann_ids = [c.id for c in ann.search(query, top_k=top_k, similarity_threshold=similarity_threshold)]
+        ann_times.append(time.perf_counter() - start)
+
+        if exact_ids:
+            recalls.append(len(set(exact_ids) & set(ann_ids)) / len(exact_ids))
+    total = CustomerSupportKnowledgeBaseChunkModel.objects.count()
+    print(f"Knowledge base chunks: {total}")
+    _print_latencies("Exact retrieval", exact_times)
+    _print_latencies("ANN retrieval", ann_times)
+    print(f"ANN recall@{top_k}: {np.mean(recalls) if recalls else 0:.3f}")
+
+def _unpooled_prod_db_query(query):
+    """
+    Runs a query the way ConnectionConfigManager did before pooling: a new connection per query.
+    """
+    conn = psycopg2.connect(
+        host=settings.PROD_APP_DB_HOST,
+        dbname=settings.PROD_APP_DB_DATABASE,
+        user=settings.PROD_APP_DB_USER,
+        password=settings.PROD_APP_DB_PASSWORD,
+    )
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+def benchmark_prod_db_lookup(iterations=50, query='SELECT id FROM public."user" LIMIT 1'):
+    """
+    Compares per-lookup latency on the production app database with a new connection per query (before) and
+    with the ProdDatabasePool (after), and prints p50/p99 of both.
+
+    Args:
+        iterations (int): Number of lookups per variant. Default is 50.
+        query (str): Read-only query to run. Default fetches a single user id.
+    """
+    manager = ConnectionConfigManager()
+    manager.connect_to_prod_app_db(query)
+
+    unpooled_times, pooled_times = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        _unpooled_prod_db_query(query)
+        unpooled_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = manager.connect_to_prod_app_db(query)
+        pooled_times.append(time.perf_counter() - start)
+        if not result["success"]:
+            print(result["message"])
+            return
+    _print_latencies("New connection per lookup", unpooled_times)
+    _print_latencies("Pooled connection", pooled_times)
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.cache import cache
+import json
+
+
+class ChatHistoryStore:
+    """
+    Append-only chat history of a support session, stored as a Redis list of JSON messages.
+
+    Appends are a single RPUSH (trimmed to the newest max_messages and expired in the same transaction), so
+    concurrent writers such as the Twilio webhook and a Celery worker never overwrite each other's messages.
+    Reads fetch only the requested tail of the list.
+    """
+
+    def __init__(self, session_id, ttl=None, max_messages=None):
+        """
+        Args:
+            session_id (str): The unique call/session ID.
+            ttl (int, optional): Seconds to keep the history after the last append.
+                Defaults to settings.CUSTOMER_SUPPORT_CHAT_HISTORY_TTL.
+            max_messages (int, optional): Number of newest messages kept.
+                Defaults to settings.CUSTOMER_SUPPORT_CHAT_HISTORY_MAX_MESSAGES.
+        """
+        self.session_id = session_id
+        self.key = f"chat_history:{session_id}"
+        self.ttl = ttl or settings.CUSTOMER_SUPPORT_CHAT_HISTORY_TTL
+        self.max_messages = max_messages or settings.CUSTOMER_SUPPORT_CHAT_HISTORY_MAX_MESSAGES
+        self.client = cache.client.get_client(write=True)
+
+    def extend(self, messages):
+        """
+        Appends messages to the end of the history in one atomic round trip.
+
+        Args:
+            messages (list): Message dicts, e.g. [{"role": "user", "content": "Hi"}].
+
+        Example:
+            ChatHistoryStore("CA123").extend([{"role": "company", "content": payload}])
+        """
+        if not self.session_id or not messages:
+            return
+        pipe = self.client.pipeline()
+        pipe.rpush(self.key, *[json.dumps(message, ensure_ascii=False) for message in messages])
+        pipe.ltrim(self.key, -self.max_messages, -1)
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def append(self, message):
+        """
+        Appends a single message to the end of the history.
+
+        Args:
+            message (dict): The message to append, e.g. {"role": "user", "content": "Hi"}.
+        """
+        self.extend([message])
+
+    def get(self, limit=None):
+        """
+        Returns the history, oldest message first.
+
+        Args:
+            limit (int, optional): Only return the newest `limit` messages. Returns everything if None.
+
+        Returns:
+            list: Message dicts.
+
+        Example:
+            last_turns = ChatHistoryStore("CA123").get(limit=20)
+        """
+        if not self.session_id:
+            return []
+        start = -limit if limit else 0
+        messages = []
+        for raw in self.client.lrange(self.key, start, -1):
+            try:
+                messages.append(json.loads(raw))
+            except Exception:
+                continue
+        return messages
+
+    def is_empty(self):
+        """
+        Returns True if no message has been recorded for the session.
+        """
+        return not self.session_id or not self.client.exists(self.key)
+
+    def replace(self, messages):
+        """
+        Atomically replaces the whole history.
+
+        Args:
+            messages (list): The new list of message dicts.
+        """
+        if not self.session_id:
+            return
+        pipe = self.client.pipeline()
+        pipe.delete(self.key)
+        if messages:
+            pipe.rpush(self.key, *[json.dumps(message, ensure_ascii=False) for message in messages])
+            pipe.ltrim(self.key, -self.max_messages, -1)
+            pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def clear(self):
+        """
+        Deletes the history of the session.
+        """
+        if self.session_id:
+            self.client.delete(self.key)
@@ -1,15 +1,24 @@
 from django.conf import settings
 from django.core.cache import cache
-import psycopg2
 from psycopg2.extras import RealDictCursor
-import requests
+import re
+import time
+
+from config.utils.http_client import HttpClient
+from customer_support.utils.prod_db_pool import ProdDatabasePool
+
+ZOHO_ACCESS_TOKEN_CACHE_KEY = "ZOHO_ACCESS_TOKEN"
+ZOHO_ACCESS_TOKEN_LOCK_KEY = "ZOHO_ACCESS_TOKEN_REFRESH_LOCK"
 
 
 class ConnectionConfigManager:
 
+    _zoho_token = None
+
     def connect_to_prod_app_db(self, query):
         """
         Executes a SELECT query on the production app database and returns the results.
+        Uses a pooled connection from ProdDatabasePool.
 
         Args:
             query (str): SQL SELECT query to execute.
@@ -22,36 +31,19 @@ class ConnectionConfigManager:
             if result["success"]:
                 print(result["data"])
         """
-        db_config = {
-            'host': settings.PROD_APP_DB_HOST,
-            'user': settings.PROD_APP_DB_USER,
-            'password': settings.PROD_APP_DB_PASSWORD,
-            'database': settings.PROD_APP_DB_DATABASE,
-        }
-        conn = None
-        cur = None
         try:
-            conn = psycopg2.connect(
-                host=db_config['host'],
-                dbname=db_config['database'],
-                user=db_config['user'],
-                password=db_config['password']
-            )
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute(query)
-            return {"success": True, "data": cur.fetchall()}
+            with ProdDatabasePool.get().connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(query)
+                    return {"success": True, "data": cur.fetchall()}
         except Exception as e:
             print(f"❌ {e}")
             return {"success": False, "message": f"❌ {e}"}
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
 
     def connect_to_prod_app_db_update(self, query):
         """
         Executes an UPDATE/INSERT/DELETE query on the production app database.
+        Uses a pooled connection from ProdDatabasePool.
 
         Args:
             query (str): SQL query to execute (UPDATE, INSERT, or DELETE).
@@ -64,50 +56,74 @@ class ConnectionConfigManager:
             if result["success"]:
                 print("Update successful!")
         """
-        db_config = {
-            'host': settings.PROD_APP_DB_HOST,
-            'user': settings.PROD_APP_DB_USER,
-            'password': settings.PROD_APP_DB_PASSWORD,
-            'database': settings.PROD_APP_DB_DATABASE,
-        }
-        conn = None
-        cur = None
         try:
-            conn = psycopg2.connect(
-                host=db_config['host'],
-                dbname=db_config['database'],
-                user=db_config['user'],
-                password=db_config['password']
-            )
-            cur = conn.cursor()
-            cur.execute(query)
-            conn.commit()
+            with ProdDatabasePool.get().connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query)
             return {"success": True}
         except Exception as e:
             print(f"❌ {e}")
             return {"success": False, "message": f"❌ {e}"}
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
 
-    def get_zoho_access_token(self):
+    def run_prepared_query(self, name, statement, params=(), max_rows=None):
         """
-        Retrieves a Zoho OAuth access token, using cache if available, otherwise requests a new one.
+        Executes a read-only prepared statement on the production app database.
+
+        The statement is prepared once per pooled connection and then only executed with bound parameters, so
+        PostgreSQL does not parse and plan it again on every call. At most max_rows rows are fetched.
+
+        Args:
+            name (str): Statement name, a plain SQL identifier (e.g. 'user_lookup').
+            statement (str): SQL with $1, $2, ... placeholders.
+            params (tuple): Values bound to the placeholders, in order.
+            max_rows (int, optional): Maximum number of rows to fetch. Fetches everything if None.
 
         Returns:
-            dict: {"success": True, "data": {"access_token": str}} on success, or {"success": False, "message": str} on failure.
+            dict: {"success": bool, "data": list} on success, or {"success": False, "message": str} on failure.
 
         Example:
-            token_data = ConnectionConfigManager().get_zoho_access_token()
-            if token_data["success"]:
-                print(token_data["data"]["access_token"])
+            result = ConnectionConfigManager().run_prepared_query(
+                "user_by_email", 'SELECT id, email FROM public."user" WHERE email = $1', ("johndoe@gmail.com",), max_rows=1
+            )
         """
-        access_token = cache.get("ZOH_ACCESS_TOKEN")
-        if access_token:
-            return {"success": True, "data": {"access_token": access_token}}
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            return {"success": False, "message": f"❌ Invalid statement name {name}"}
+        try:
+            pool = ProdDatabasePool.get()
+            with pool.connection() as conn:
+                prepared = pool.prepared_statements(conn)
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    if name not in prepared:
+                        cur.execute(f"PREPARE {name} AS {statement}")
+                        prepared.add(name)
+                    if params:
+                        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", list(params))
+                    else:
+                        cur.execute(f"EXECUTE {name}")
+                    rows = cur.fetchmany(max_rows) if max_rows else cur.fetchall()
+            return {"success": True, "data": rows}
+        except Exception as e:
+            print(f"❌ {e}")
+            return {"success": False, "message": f"❌ {e}"}
 
+    def _cached_zoho_token(self, min_validity):
+        """
+        Returns the in-process copy of the Zoho token, or else the shared copy in Redis, if it is valid for at
+        least min_validity more seconds.
+        """
+        token = ConnectionConfigManager._zoho_token
+        if token and token["expires_at"] - time.time() > min_validity:
+            return token
+        token = cache.get(ZOHO_ACCESS_TOKEN_CACHE_KEY)
+        if token and token["expires_at"] - time.time() > min_validity:
+            ConnectionConfigManager._zoho_token = token
+            return token
+        return None
+
+    def _refresh_zoho_access_token(self):
+        """
+        Requests a new Zoho OAuth access token and shares it through Redis and the in-process copy.
+        """
         url = "https://accounts.zoho.com/oauth/v2/token"
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         data = {
@@ -117,30 +133,80 @@ class ConnectionConfigManager:
             "refresh_token": settings.ZOHO_REFRESH_TOKEN
         }
 
-        response = requests.post(url, headers=headers, data=data)
+        response = HttpClient.post(url, headers=headers, data=data)
         if not response:
-            return {"success": False, "message": "❌ No response!"}
-        if response.status_code != 200:
-            return {"success": False, "message": f"❌ {response.text}"}
+            return {"success": False, "message": f"❌ {response.text}" if response is not None else "❌ No response!"}
 
         data = response.json()
-        access_token = data["access_token"]
+        if "access_token" not in data:
+            return {"success": False, "message": f"❌ {data}"}
         expires_in = int(data.get("expires_in", 3600))
-        cache.set("ZOH_ACCESS_TOKEN", access_token, timeout=expires_in - 60)
-        return {"success": True, "data": {"access_token": access_token}}
+        token = {"access_token": data["access_token"], "expires_at": time.time() + expires_in}
+        cache.set(ZOHO_ACCESS_TOKEN_CACHE_KEY, token, timeout=max(1, expires_in - 60))
+        ConnectionConfigManager._zoho_token = token
+        return {"success": True, "data": {"access_token": token["access_token"]}}
+
+    def get_zoho_access_token(self, min_validity=60):
+        """
+        Retrieves a Zoho OAuth access token.
+
+        The token is served from an in-process copy, then from Redis. Only when both are missing or about to
+        expire is it refreshed, and the refresh is single-flight: a Redis lock lets one caller across all
+        processes talk to accounts.zoho.com while the others wait for its result.
+
+        Args:
+            min_validity (int): Refresh tokens that expire within this many seconds. Default is 60.
+
+        Returns:
+            dict: {"success": True, "data": {"access_token": str}} on success, or {"success": False, "message": str} on failure.
+
+        Example:
+            token_data = ConnectionConfigManager().get_zoho_access_token()
+            if token_data["success"]:
+                print(token_data["data"]["access_token"])
+        """
+        token = self._cached_zoho_token(min_validity)
+        if token:
+            return {"success": True, "data": {"access_token": token["access_token"]}}
+
+        lock = cache.lock(
+            ZOHO_ACCESS_TOKEN_LOCK_KEY,
+            timeout=settings.ZOHO_TOKEN_REFRESH_LOCK_TIMEOUT,
+            blocking_timeout=settings.ZOHO_TOKEN_REFRESH_LOCK_TIMEOUT,
+        )
+        if not lock.acquire():
+            token = self._cached_zoho_token(0)
+            if token:
+                return {"success": True, "data": {"access_token": token["access_token"]}}
+            return {"success": False, "message": "❌ Timed out waiting for the Zoho token refresh"}
+        try:
+            token = self._cached_zoho_token(min_validity)
+            if token:
+                return {"success": True, "data": {"access_token": token["access_token"]}}
+            result = self._refresh_zoho_access_token()
+            if not result["success"]:
+                token = self._cached_zoho_token(0)
+                if token:
+                    return {"success": True, "data": {"access_token": token["access_token"]}}
+            return result
+        finally:
+            try:
+                lock.release()
+            except Exception:
+                pass
 
     def _handle_response(self, response):
         """
         Centralized handler for all HTTP responses from Zoho/RevenueCat APIs.
 
         Args:
-            response (requests.Response): The HTTP response object.
+            response (requests.Response or None): The HTTP response object.
 
         Returns:
             dict: {"success": True, "data": ...} on success, or {"success": False, "message": str} on failure.
 
         Example:
-            response = requests.get(url)
+            response = HttpClient.get(url)
             result = ConnectionConfigManager()._handle_response(response)
         """
         if not response:
@@ -193,11 +259,11 @@ class ConnectionConfigManager:
         }
 
         if method == "GET":
-            response = requests.get(url, headers=ZOHO_HEADERS)
+            response = HttpClient.get(url, headers=ZOHO_HEADERS)
         elif method == "POST":
-            response = requests.post(url, json=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.post(url, json=payload, headers=ZOHO_HEADERS)
         elif method == "PUT":
-            response = requests.put(url, json=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.put(url, json=payload, headers=ZOHO_HEADERS)
         else:
             return {"success": False, "message": f"Unsupported method {method}"}
 
@@ -234,11 +300,11 @@ class ConnectionConfigManager:
         }
 
         if method == "GET":
-            response = requests.get(url, headers=ZOHO_HEADERS)
+            response = HttpClient.get(url, headers=ZOHO_HEADERS)
         elif method == "POST":
-            response = requests.post(url, json=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.post(url, json=payload, headers=ZOHO_HEADERS)
         elif method == "PUT":
-            response = requests.put(url, json=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.put(url, json=payload, headers=ZOHO_HEADERS)
         else:
             return {"success": False, "message": f"Unsupported method {method}"}
 
@@ -273,7 +339,7 @@ class ConnectionConfigManager:
             url = rc_endpoint
 
         if method == "GET":
-            response = requests.get(url, headers=REVENUE_CAT_HEADERS)
+            response = HttpClient.get(url, headers=REVENUE_CAT_HEADERS)
         else:
             return {"success": False, "message": f"Unsupported method {method}"}
 
@@ -307,15 +373,17 @@ class ConnectionConfigManager:
         ZOHO_HEADERS = {"Authorization": f"Zoho-oauthtoken {access_token}", **headers}
 
         if method == "GET":
-            response = requests.get(url, headers=ZOHO_HEADERS)
+            response = HttpClient.get(url, headers=ZOHO_HEADERS)
         elif method == "POST":
-            response = requests.post(url, data=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.post(url, data=payload, headers=ZOHO_HEADERS)
         elif method == "PUT":
-            response = requests.put(url, data=payload, headers=ZOHO_HEADERS)
+            response = HttpClient.put(url, data=payload, headers=ZOHO_HEADERS)
         else:
             return {"success": False, "message": f"Unsupported method {method}"}
 
         if not is_response_json_format:
+            if response is None:
+                return {"success": False, "message": "❌ No response object"}
             return {"success": True, "data": response.text if response.ok else response.text}
 
         return self._handle_response(response)
@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.core.cache import cache
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import time
+import numpy as np
+
+from customer_support.constants import KB_EMBEDDING_MODEL
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache of question embeddings for knowledge-base lookups.
+
+    - Local tier: per-process LRU with TTL, so repeated questions on the same worker skip Redis too.
+    - Redis tier: shared across web and Celery workers, stored as compact float32 bytes with a TTL.
+
+    Hits and misses are counted in a Redis hash so the hit rate can be checked with stats().
+    """
+
+    STATS_KEY = "kb_query_embedding_cache_stats"
+
+    _local = OrderedDict()
+    _local_lock = threading.Lock()
+
+    def __init__(self, open_ai_manager, embedding_model=KB_EMBEDDING_MODEL, ttl=None, local_max_size=None):
+        """
+        Args:
+            open_ai_manager (OpenAIManager): Manager used to compute embeddings on a miss.
+            embedding_model (str): OpenAI embedding model name. Default is KB_EMBEDDING_MODEL.
+            ttl (int, optional): Seconds to keep an embedding. Defaults to settings.KB_QUERY_EMBEDDING_CACHE_TTL.
+            local_max_size (int, optional): Max entries in the local tier. Defaults to settings.KB_QUERY_EMBEDDING_LOCAL_CACHE_SIZE.
+        """
+        self.open_ai_manager = open_ai_manager
+        self.embedding_model = embedding_model
+        self.ttl = ttl or settings.KB_QUERY_EMBEDDING_CACHE_TTL
+        self.local_max_size = local_max_size or settings.KB_QUERY_EMBEDDING_LOCAL_CACHE_SIZE
+
+    @staticmethod
+    def normalize(question):
+        """
+        Normalizes a question so trivial variations share one cache entry.
+
+        Example:
+            QueryEmbeddingCache.normalize("  What's the PRICE?? ")  # "what's the price"
+        """
+        text = re.sub(r"\s+", " ", (question or "").strip().lower())
+        return text.strip(" .!?")
+
+    def _key(self, normalized):
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"kb_query_embedding:{self.embedding_model}:{digest}"
+
+    def _record(self, field):
+        try:
+            cache.client.get_client(write=True).hincrby(self.STATS_KEY, field, 1)
+        except Exception:
+            pass
+
+    def _get_local(self, key):
+        with self._local_lock:
+            entry = self._local.get(key)
+            if not entry:
+                return None
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                self._local.pop(key, None)
+                return None
+            self._local.move_to_end(key)
+            return vector
+
+    def _set_local(self, key, vector):
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + self.ttl, vector)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+    def get_embedding(self, question):
+        """
+        Returns the embedding of a question, computing it only when neither tier has it.
+
+        Args:
+            question (str): The user's question.
+
+        Returns:
+            list: The embedding vector.
+
+        Example:
+            vector = QueryEmbeddingCache(open_ai_manager).get_embedding("How much is the Super Pass?")
+        """
+        normalized = self.normalize(question)
+        key = self._key(normalized)
+
+        vector = self._get_local(key)
+        if vector is not None:
+            self._record("local_hits")
+            return vector
+
+        raw = cache.get(key)
+        if raw:
+            vector = np.frombuffer(raw, dtype=np.float32).tolist()
+            self._set_local(key, vector)
+            self._record("redis_hits")
+            return vector
+
+        self._record("misses")
+        vector = self.open_ai_manager.build_embedding(normalized, embedding_model=self.embedding_model)
+        if vector:
+            cache.set(key, np.asarray(vector, dtype=np.float32).tobytes(), timeout=self.ttl)
+            self._set_local(key, vector)
+        return vector
+
+    @classmethod
+    def stats(cls):
+        """
+        Returns hit/miss counters and the overall hit rate.
+
+        Returns:
+            dict: {"local_hits": int, "redis_hits": int, "misses": int, "hit_rate": float}
+        """
+        raw = cache.client.get_client(write=True).hgetall(cls.STATS_KEY) or {}
+        counters = {k.decode() if isinstance(k, bytes) else k: int(v) for k, v in raw.items()}
+        local_hits = counters.get("local_hits", 0)
+        redis_hits = counters.get("redis_hits", 0)
+        misses = counters.get("misses", 0)
+        total = local_hits + redis_hits + misses
+        return {
+            "local_hits": local_hits,
+            "redis_hits": redis_hits,
+            "misses": misses,
+            "hit_rate": (local_hits + redis_hits) / total if total else 0.0,
+        }
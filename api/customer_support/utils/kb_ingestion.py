@@ -0,0 +1,291 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from pgvector import Vector
+import csv
+import hashlib
+import io
+import time
+
+from customer_support.models import (
+    CustomerSupportKnowledgeBaseModel,
+    CustomerSupportKnowledgeBaseChunkModel,
+    KnowledgeBaseIngestionJobModel,
+)
+from customer_support.serializers import KnowledgeBaseIngestionJobSerializer
+from customer_support.utils.answer_cache import SemanticAnswerCache
+
+
+class KnowledgeBaseIngestor:
+    """
+    Writes knowledge base entries and their embedded chunks in bulk.
+
+    - Every call runs in one transaction, so an entry, the entry it replaces and all of its chunks commit together.
+    - Chunks are inserted with bulk_create in batches of KB_INGESTION_BATCH_SIZE, or streamed with COPY once a
+      call writes KB_INGESTION_COPY_THRESHOLD chunks or more.
+    - Bulk writes skip model save() and signals, so embedding_ann is filled in here and the semantic answer cache
+      is invalidated once the transaction commits.
+    """
+
+    def __init__(self, batch_size=None, copy_threshold=None):
+        """
+        Args:
+            batch_size (int, optional): Chunks per INSERT. Defaults to settings.KB_INGESTION_BATCH_SIZE.
+            copy_threshold (int, optional): Chunk count from which COPY is used instead of INSERTs.
+                Defaults to settings.KB_INGESTION_COPY_THRESHOLD.
+        """
+        self.batch_size = batch_size or settings.KB_INGESTION_BATCH_SIZE
+        self.copy_threshold = copy_threshold or settings.KB_INGESTION_COPY_THRESHOLD
+
+    def _delete_urls(self, urls):
+        # Raw deletes: the ORM would load every chunk (and its vectors) just to send post_delete signals,
+        # and the only receiver invalidates the answer cache, which happens on commit anyway.
+        chunks = CustomerSupportKnowledgeBaseChunkModel.objects.filter(kb__url__in=urls)
+        chunks._raw_delete(chunks.db)
+        kbs = CustomerSupportKnowledgeBaseModel.objects.filter(url__in=urls)
+        kbs._raw_delete(kbs.db)
+
+    def _copy_chunks(self, chunks):
+        """
+        Streams chunks into the chunk table with a single COPY ... FROM STDIN.
+        """
+        model = CustomerSupportKnowledgeBaseChunkModel
+        fields = ["kb", "chunk_text", "embedding", "embedding_ann", "content_hash", "created_at", "updated_at"]
+        columns = ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        text_column = connection.ops.quote_name(model._meta.get_field("chunk_text").column)
+        now = timezone.now().isoformat()
+
+        buffer = io.StringIO()
+        # Unquoted empty fields are NULL in CSV COPY; FORCE_NOT_NULL keeps an empty chunk_text a string.
+        writer = csv.writer(buffer)
+        for chunk in chunks:
+            writer.writerow([
+                chunk.kb_id,
+                chunk.chunk_text,
+                Vector(chunk.embedding).to_text(),
+                Vector(chunk.embedding_ann).to_text() if chunk.embedding_ann is not None else None,
+                chunk.content_hash,
+                now,
+                now,
+            ])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL ({text_column}))",
+                buffer,
+            )
+
+    def _build_chunks(self, kb, materials):
+        """
+        Builds unsaved chunk instances of an entry from build_materials_for_rag output, skipping chunks without
+        an embedding.
+        """
+        chunks = []
+        for material in materials:
+            if not material.get("vector"):
+                print(f"❌ Skipping chunk {material.get('chunk_number')} of {kb.url}: no embedding")
+                continue
+            chunks.append(CustomerSupportKnowledgeBaseChunkModel(
+                kb=kb,
+                chunk_text=material["text"],
+                embedding=material["vector"],
+                embedding_ann=CustomerSupportKnowledgeBaseChunkModel.reduce_embedding(material["vector"]),
+                content_hash=CustomerSupportKnowledgeBaseChunkModel.hash_content(kb.url, material["text"]),
+            ))
+        return chunks
+
+    def _insert_chunks(self, chunks):
+        if len(chunks) >= self.copy_threshold and connection.vendor == "postgresql":
+            self._copy_chunks(chunks)
+        else:
+            CustomerSupportKnowledgeBaseChunkModel.objects.bulk_create(chunks, batch_size=self.batch_size)
+
+    def save_documents(self, documents, replace=False):
+        """
+        Saves knowledge base entries and their chunks in one transaction.
+
+        Args:
+            documents (list): Dicts of {"url": str, "description": str, "chunks": [{"text": str, "vector": list}, ...]},
+                where chunks is the output of OpenAIManager.build_materials_for_rag. Chunks without an embedding
+                are skipped.
+            replace (bool): Delete existing entries (and their chunks) with the same URLs first. Default is False.
+
+        Returns:
+            list: The created CustomerSupportKnowledgeBase instances, in the order of documents.
+
+        Example:
+            chunks = open_ai_manager.build_materials_for_rag(text=description)
+            KnowledgeBaseIngestor().save_documents([{"url": url, "description": description, "chunks": chunks}])
+        """
+        if not documents:
+            return []
+        with transaction.atomic():
+            if replace:
+                self._delete_urls([document["url"] for document in documents])
+            kbs = CustomerSupportKnowledgeBaseModel.objects.bulk_create([
+                CustomerSupportKnowledgeBaseModel(url=document["url"], description=document["description"])
+                for document in documents
+            ])
+            chunks = []
+            for kb, document in zip(kbs, documents):
+                chunks.extend(self._build_chunks(kb, document["chunks"]))
+            self._insert_chunks(chunks)
+            transaction.on_commit(SemanticAnswerCache.invalidate)
+        return kbs
+
+    def sync_document(self, url, description, open_ai_manager, progress_callback=None, max_chunk_size=1000):
+        """
+        Creates or refreshes the knowledge base entry of a URL, embedding only chunks whose content is new.
+
+        Chunks are addressed by CustomerSupportKnowledgeBaseChunk.hash_content (URL + normalized text): stored
+        chunks that still appear are kept as they are, new ones are embedded and inserted, and chunks that
+        disappeared from the page are deleted. Duplicate entries left for the URL by earlier ingestions are
+        merged into one. Syncs of the same URL are serialized with a lock.
+
+        Args:
+            url (str): The document URL.
+            description (str): The document text (can be HTML).
+            open_ai_manager (OpenAIManager): Manager used to chunk and embed the text.
+            progress_callback (callable, optional): Called for every embedded chunk, see OpenAIManager.embed_chunks.
+            max_chunk_size (int): Max size of each chunk. Default 1000.
+
+        Returns:
+            dict: {"kb": CustomerSupportKnowledgeBase, "total": int, "embedded": int, "reused": int,
+                "deleted": int, "failed": int}
+
+        Example:
+            result = KnowledgeBaseIngestor().sync_document(url, description, open_ai_manager)
+        """
+        lock_key = f"kb_ingestion_lock:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+        with cache.lock(lock_key, timeout=settings.KB_INGESTION_LOCK_TIMEOUT, blocking_timeout=settings.KB_INGESTION_LOCK_TIMEOUT):
+            return self._sync_document(url, description, open_ai_manager, progress_callback, max_chunk_size)
+
+    def _sync_document(self, url, description, open_ai_manager, progress_callback, max_chunk_size):
+        chunk_model = CustomerSupportKnowledgeBaseChunkModel
+        chunks = {}
+        for chunk in open_ai_manager.build_chunks(description, max_chunk_size=max_chunk_size):
+            if chunk["text"].strip():
+                chunks.setdefault(chunk_model.hash_content(url, chunk["text"]), chunk)
+
+        kept, stale, rehashed = {}, [], []
+        stored = chunk_model.objects.filter(kb__url=url).order_by("id").values_list("id", "content_hash", "chunk_text")
+        for chunk_id, content_hash, chunk_text in stored:
+            current_hash = content_hash or chunk_model.hash_content(url, chunk_text)
+            if current_hash in chunks and current_hash not in kept:
+                kept[current_hash] = chunk_id
+                if content_hash != current_hash:
+                    rehashed.append(chunk_model(id=chunk_id, content_hash=current_hash))
+            else:
+                stale.append(chunk_id)
+
+        new_chunks = [chunk for content_hash, chunk in chunks.items() if content_hash not in kept]
+        materials = open_ai_manager.embed_chunks(new_chunks, progress_callback=progress_callback) if new_chunks else []
+
+        with transaction.atomic():
+            kb = CustomerSupportKnowledgeBaseModel.objects.filter(url=url).order_by("-updated_at", "-id").first()
+            if kb is None:
+                kb = CustomerSupportKnowledgeBaseModel(url=url, description=description)
+                CustomerSupportKnowledgeBaseModel.objects.bulk_create([kb])
+            elif kb.description != description:
+                kb.description = description
+                kb.updated_at = timezone.now()
+                CustomerSupportKnowledgeBaseModel.objects.filter(pk=kb.pk).update(
+                    description=description, updated_at=kb.updated_at
+                )
+            chunk_model.objects.filter(id__in=kept.values()).exclude(kb=kb).update(kb=kb)
+            if rehashed:
+                chunk_model.objects.bulk_update(rehashed, ["content_hash"], batch_size=self.batch_size)
+            if stale:
+                stale_chunks = chunk_model.objects.filter(id__in=stale)
+                stale_chunks._raw_delete(stale_chunks.db)
+            duplicates = CustomerSupportKnowledgeBaseModel.objects.filter(url=url).exclude(pk=kb.pk)
+            duplicates._raw_delete(duplicates.db)
+            new_rows = self._build_chunks(kb, materials)
+            self._insert_chunks(new_rows)
+            if stale or new_rows:
+                transaction.on_commit(SemanticAnswerCache.invalidate)
+
+        return {
+            "kb": kb,
+            "total": len(chunks),
+            "embedded": len(new_rows),
+            "reused": len(kept),
+            "deleted": len(stale),
+            "failed": len(materials) - len(new_rows),
+        }
+
+    def save_document(self, url, description, chunks, replace=False):
+        """
+        Saves a single knowledge base entry and its chunks. See save_documents.
+
+        Returns:
+            CustomerSupportKnowledgeBase: The created entry.
+
+        Example:
+            kb = KnowledgeBaseIngestor().save_document(url, description, chunks)
+        """
+        return self.save_documents([{"url": url, "description": description, "chunks": chunks}], replace=replace)[0]
+
+
+def ingestion_job_group(job_uuid):
+    """
+    Returns the channel layer group that receives the progress of an ingestion job.
+    """
+    return f"kb_ingestion_{job_uuid}"
+
+
+class IngestionJobProgress:
+    """
+    RAG progress hook of an ingestion job, passed to build_materials_for_rag as its progress_callback.
+
+    Counts processed and failed chunks on the job and publishes them (saved on the job row and broadcast to the
+    job's websocket group) at most once per KB_INGESTION_PROGRESS_INTERVAL seconds, plus on the last chunk.
+    """
+
+    def __init__(self, job, interval=None):
+        """
+        Args:
+            job (KnowledgeBaseIngestionJob): The job being ingested.
+            interval (float, optional): Min seconds between two publications.
+                Defaults to settings.KB_INGESTION_PROGRESS_INTERVAL.
+        """
+        self.job = job
+        self.interval = interval if interval is not None else settings.KB_INGESTION_PROGRESS_INTERVAL
+        self._published_at = 0.0
+
+    def __call__(self, chunk=None, index=None, total=None, err_msg=None, **kwargs):
+        if err_msg:
+            print(f"Error on chunk {index}/{total}: {err_msg}")
+            self.job.failed_chunks += 1
+        self.job.total_chunks = total or self.job.total_chunks
+        self.job.processed_chunks += 1
+        if self.job.processed_chunks >= self.job.total_chunks or time.monotonic() - self._published_at >= self.interval:
+            self.publish()
+
+    def publish(self):
+        """
+        Saves the job's status and counters and broadcasts them to the job's websocket group.
+        """
+        self._published_at = time.monotonic()
+        self.job.updated_at = timezone.now()
+        KnowledgeBaseIngestionJobModel.objects.filter(pk=self.job.pk).update(
+            status=self.job.status,
+            total_chunks=self.job.total_chunks,
+            processed_chunks=self.job.processed_chunks,
+            failed_chunks=self.job.failed_chunks,
+            reused_chunks=self.job.reused_chunks,
+            error=self.job.error,
+            kb=self.job.kb,
+            updated_at=self.job.updated_at,
+        )
+        try:
+            async_to_sync(get_channel_layer().group_send)(
+                ingestion_job_group(self.job.uuid),
+                {"type": "ingestion_progress", **KnowledgeBaseIngestionJobSerializer(self.job).data},
+            )
+        except Exception as e:
+            print(f"❌ Error broadcasting ingestion progress: {e}")
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import connection, transaction
+from pgvector.django import CosineDistance
+
+from customer_support.models import CustomerSupportKnowledgeBaseChunkModel
+
+
+class KnowledgeBaseRetriever:
+    """
+    Vector search over CustomerSupportKnowledgeBaseChunk.
+
+    Modes:
+    - "ann": HNSW search on the reduced embedding_ann column, then exact re-ranking of the candidates on the
+      full 3072-dim embedding. Latency stays flat as the table grows.
+    - "exact": sequential cosine scan of the full embedding column (the original behaviour).
+    """
+
+    def __init__(self, mode=None, ef_search=None, candidate_multiplier=None):
+        """
+        Args:
+            mode (str, optional): "ann" or "exact". Defaults to settings.KB_RETRIEVAL_MODE.
+            ef_search (int, optional): HNSW ef_search for ANN queries. Defaults to settings.KB_HNSW_EF_SEARCH.
+            candidate_multiplier (int, optional): ANN candidates fetched per requested result before re-ranking.
+                Defaults to settings.KB_ANN_CANDIDATE_MULTIPLIER.
+        """
+        self.mode = mode or settings.KB_RETRIEVAL_MODE
+        self.ef_search = ef_search or settings.KB_HNSW_EF_SEARCH
+        self.candidate_multiplier = candidate_multiplier or settings.KB_ANN_CANDIDATE_MULTIPLIER
+
+    def _exact_search(self, query_embedding, top_k, similarity_threshold):
+        return list(
+            CustomerSupportKnowledgeBaseChunkModel.objects
+            .select_related("kb")
+            .annotate(similarity=CosineDistance("embedding", query_embedding))
+            .filter(similarity__lte=similarity_threshold)
+            .order_by("similarity")[:top_k]
+        )
+
+    def _ann_candidate_ids(self, query_embedding, limit):
+        reduced = CustomerSupportKnowledgeBaseChunkModel.reduce_embedding(query_embedding)
+        if reduced is None:
+            return []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL hnsw.ef_search = %s", [int(self.ef_search)])
+            return list(
+                CustomerSupportKnowledgeBaseChunkModel.objects
+                .annotate(ann_distance=CosineDistance("embedding_ann", reduced))
+                .order_by("ann_distance")
+                .values_list("id", flat=True)[:limit]
+            )
+
+    def _ann_search(self, query_embedding, top_k, similarity_threshold):
+        candidate_ids = self._ann_candidate_ids(query_embedding, limit=top_k * self.candidate_multiplier)
+        if not candidate_ids:
+            return []
+        return list(
+            CustomerSupportKnowledgeBaseChunkModel.objects
+            .select_related("kb")
+            .filter(id__in=candidate_ids)
+            .annotate(similarity=CosineDistance("embedding", query_embedding))
+            .filter(similarity__lte=similarity_threshold)
+            .order_by("similarity")[:top_k]
+        )
+
+    def search(self, query_embedding, top_k=3, similarity_threshold=0.3):
+        """
+        Finds the chunks closest to a query embedding.
+
+        Args:
+            query_embedding (list): Full-size (3072-dim) query embedding.
+            top_k (int): Number of chunks to return. Default is 3.
+            similarity_threshold (float): Maximum cosine distance on the full embedding. Default is 0.3.
+
+        Returns:
+            list: CustomerSupportKnowledgeBaseChunk instances with a `similarity` attribute, closest first.
+
+        Example:
+            chunks = KnowledgeBaseRetriever().search(embedding, top_k=3)
+        """
+        if query_embedding is None or len(query_embedding) == 0:
+            return []
+        if self.mode == "exact":
+            return self._exact_search(query_embedding, top_k, similarity_threshold)
+        return self._ann_search(query_embedding, top_k, similarity_threshold)
@@ -1,12 +1,38 @@
-from core.models import UserModel
+from customer_support.models import CustomerSupportKnowledgeBaseChunkModel
+from customer_support.utils.agent_runtime import AgentRuntime
 from customer_support.utils.zoho_desk import ZohoDeskManager
 
-def add_zoho_desk_tickets_to_db():
-    cur_user = UserModel.objects.filter(email="mohammad@teetimegolfpass.com").first()
-    zoho_desk_manager = ZohoDeskManager(cur_users=[cur_user])
-    zoho_desk_manager.get_all_tickets()
+def add_zoho_desk_tickets_to_db(full=False):
+    zoho_desk_manager = ZohoDeskManager(cur_users=AgentRuntime.get().get_billing_users())
+    return zoho_desk_manager.sync_tickets(full=full)
 
-def add_zoho_desk_tickets_to_kb():
-    cur_user = UserModel.objects.filter(email="mohammad@teetimegolfpass.com").first()
-    zoho_desk_manager = ZohoDeskManager(cur_users=[cur_user])
-    zoho_desk_manager.add_zoho_tickets_info_to_kb()
\ No newline at end of file
+def add_zoho_desk_tickets_to_kb(force=False):
+    zoho_desk_manager = ZohoDeskManager(cur_users=AgentRuntime.get().get_billing_users())
+    return zoho_desk_manager.add_zoho_tickets_info_to_kb(force=force)
+
+def backfill_kb_ann_embeddings(batch_size=500):
+    """
+    Fills embedding_ann for chunks stored before the ANN index existed, reducing the stored full-size embedding
+    instead of calling the embedding API again.
+    """
+    last_id = 0
+    updated = 0
+    while True:
+        batch = list(
+            CustomerSupportKnowledgeBaseChunkModel.objects
+            .filter(embedding_ann__isnull=True, id__gt=last_id)
+            .order_by("id")
+            .only("id", "embedding")[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        to_update = []
+        for chunk in batch:
+            chunk.embedding_ann = chunk.reduce_embedding(chunk.embedding)
+            if chunk.embedding_ann is not None:
+                to_update.append(chunk)
+        CustomerSupportKnowledgeBaseChunkModel.objects.bulk_update(to_update, ["embedding_ann"])
+        updated += len(to_update)
+        print(f"Backfilled {updated} chunk embeddings ...")
+    return updated
\ No newline at end of file
@@ -0,0 +1,168 @@
+from django.conf import settings
+from contextlib import contextmanager
+import os
+import threading
+import time
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+
+class ProdDatabasePoolTimeout(Exception):
+    """
+    Raised when no production database connection frees up within PROD_APP_DB_POOL_TIMEOUT.
+    """
+
+
+class ProdDatabasePool:
+    """
+    Process-wide pool of connections to the production app database.
+
+    - At most PROD_APP_DB_POOL_MAX_SIZE connections are open; extra callers wait up to PROD_APP_DB_POOL_TIMEOUT
+      seconds for one to free up and then fail fast instead of piling onto the database.
+    - Every connection runs with a server-side statement_timeout of PROD_APP_DB_STATEMENT_TIMEOUT_MS.
+    - Connections idle for more than PROD_APP_DB_HEALTH_CHECK_INTERVAL seconds are pinged before reuse, and
+      broken connections are discarded instead of being returned to the pool.
+
+    The pool is thread-safe (and greenlet-safe under gevent's monkey patching) and is rebuilt after a fork so
+    Celery children never share their parent's sockets.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, min_size=None, max_size=None, timeout=None, statement_timeout_ms=None, health_check_interval=None):
+        """
+        Args:
+            min_size (int, optional): Connections opened up front. Defaults to settings.PROD_APP_DB_POOL_MIN_SIZE.
+            max_size (int, optional): Max open connections. Defaults to settings.PROD_APP_DB_POOL_MAX_SIZE.
+            timeout (float, optional): Seconds to wait for a free connection. Defaults to settings.PROD_APP_DB_POOL_TIMEOUT.
+            statement_timeout_ms (int, optional): Server-side statement timeout.
+                Defaults to settings.PROD_APP_DB_STATEMENT_TIMEOUT_MS.
+            health_check_interval (float, optional): Idle seconds after which a connection is pinged before reuse.
+                Defaults to settings.PROD_APP_DB_HEALTH_CHECK_INTERVAL.
+        """
+        self.min_size = min_size if min_size is not None else settings.PROD_APP_DB_POOL_MIN_SIZE
+        self.max_size = max_size or settings.PROD_APP_DB_POOL_MAX_SIZE
+        self.timeout = timeout or settings.PROD_APP_DB_POOL_TIMEOUT
+        self.statement_timeout_ms = statement_timeout_ms or settings.PROD_APP_DB_STATEMENT_TIMEOUT_MS
+        self.health_check_interval = (
+            health_check_interval if health_check_interval is not None else settings.PROD_APP_DB_HEALTH_CHECK_INTERVAL
+        )
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._last_used = {}
+        self._prepared = {}
+        self._pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            host=settings.PROD_APP_DB_HOST,
+            dbname=settings.PROD_APP_DB_DATABASE,
+            user=settings.PROD_APP_DB_USER,
+            password=settings.PROD_APP_DB_PASSWORD,
+            connect_timeout=settings.PROD_APP_DB_CONNECT_TIMEOUT,
+            options=f"-c statement_timeout={int(self.statement_timeout_ms)}",
+        )
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the pool of the current process, creating it on first use.
+
+        Example:
+            with ProdDatabasePool.get().connection() as conn:
+                ...
+        """
+        pid = os.getpid()
+        if cls._instance is None or cls._instance.pid != pid:
+            with cls._instance_lock:
+                if cls._instance is None or cls._instance.pid != pid:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, conn):
+        self._last_used.pop(id(conn), None)
+        self._prepared.pop(id(conn), None)
+
+    def prepared_statements(self, conn):
+        """
+        Returns the names of the statements already prepared on a pooled connection.
+
+        Args:
+            conn (connection): A connection lent by connection().
+
+        Returns:
+            set: Statement names; add a name after preparing it.
+        """
+        return self._prepared.setdefault(id(conn), set())
+
+    def _checkout(self):
+        for _ in range(self.max_size + 1):
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            self._forget(conn)
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not get a healthy production database connection")
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a pooled connection for the duration of the block.
+
+        The transaction is committed when the block succeeds and rolled back when it raises; connections that
+        broke during the block are closed instead of being reused.
+
+        Raises:
+            ProdDatabasePoolTimeout: If no connection frees up within the pool timeout.
+
+        Example:
+            with ProdDatabasePool.get().connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ProdDatabasePoolTimeout(f"No production database connection free after {self.timeout}s")
+        conn = None
+        discard = False
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+                raise
+        finally:
+            if conn is not None:
+                discard = discard or bool(conn.closed)
+                if discard:
+                    self._forget(conn)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn, close=discard)
+            self._slots.release()
+
+    def close(self):
+        """
+        Closes every connection of the pool.
+        """
+        self._pool.closeall()
+        self._last_used = {}
+        self._prepared = {}
@@ -1,24 +1,204 @@
-from django.db.models import F
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connections
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import os
 import re
+import hashlib
+import time
 import json
 import uuid
 from google.cloud import texttospeech
-from pgvector.django import CosineDistance
 
-from core.models import UserModel
 from core.tasks import remove_generated_voice_by_ai_task
-from ai.utils.open_ai_manager import OpenAIManager
-from ai.utils.google_ai_manager import GoogleAIManager
 from customer_support.constants import (
+    AGENT_MAX_HISTORY_MESSAGES,
+    AGENT_SPECULATIVE_MIN_WORDS,
     ALL_TEA_TIME_SUB_PLANS,
     LIST_OF_GREETING_MESSAGES,
     LIST_OF_HOLDOING_MESSAGES,
+    USER_LOOKUP_MAX_ROWS,
+    USER_LOOKUP_QUERY,
 )
-from customer_support.models import CustomerSupportKnowledgeBaseChunkModel
-from customer_support.utils.connection_config import ConnectionConfigManager
+from customer_support.utils.agent_runtime import AgentRuntime
+from customer_support.utils.answer_cache import SemanticAnswerCache
+from customer_support.utils.chat_history import ChatHistoryStore
+from customer_support.utils.embedding_cache import QueryEmbeddingCache
+from customer_support.utils.kb_retrieval import KnowledgeBaseRetriever
+from customer_support.utils.voice_stream_manager import SSMLSentenceBuffer
+
+
+def _compile_system_prompt(native_tools=False):
+    """
+    Builds the static system prompt of the support agent.
+
+    The prompt only depends on module constants, so it is built once at import and sent as the unchanged first
+    message of every turn. Keeping it byte-identical makes it a cacheable prefix for OpenAI prompt caching.
+
+    Args:
+        native_tools (bool): Describe app tasks as the native tools in AGENT_TOOLS instead of JSON app task objects.
+
+    Returns:
+        str: Complete system prompt including knowledge base, rules, and examples.
+    """
+    plans_json = json.dumps(ALL_TEA_TIME_SUB_PLANS, ensure_ascii=False, separators=(",", ":"))
+
+    if native_tools:
+        query_user_example = "Assistant: (calls the query_user tool with user_email \"johndoe@gmail.com\")\n"
+        contract_and_tasks = (
+            "Output contract (strict):\n"
+            "- To answer the user, your response must be a single valid JSON object: "
+            "{\"message_to_user\":\"<speak>...</speak>\"} - ALL message_to_user content MUST be wrapped in SSML <speak> tags\n"
+            "- To look something up, call exactly one of the provided tools instead of answering.\n"
+            "- Never describe a tool call in message_to_user. Never embed JSON inside strings. Never return an empty response.\n"
+            "- MANDATORY: Every message_to_user MUST be valid SSML wrapped in <speak>...</speak> tags.\n\n"
+            "Tools (app tasks):\n"
+            "- query_user(user_email)\n"
+            "  Rules:\n"
+            "  - Ask for the user's email first.\n"
+            "  - Confirm the email by repeating it and spelling it with the NATO alphabet (including domain and TLD). "
+            "Ask `Is this correct?` before calling the tool.\n\n"
+            "- query_general_data(question)\n"
+            "  Rules:\n"
+            "  - The question must be clear and specific based on the user's last request/context.\n"
+            "  - Do not call it when a KNOWLEDGE_BASE_CONTEXT message already answers the question.\n\n"
+        )
+        context_marker = (
+            "- KNOWLEDGE_BASE_CONTEXT\n"
+            "  - Knowledge base results fetched ahead of time for the user's last message. If they answer the question, "
+            "reply directly with message_to_user; otherwise ignore them.\n"
+        )
+    else:
+        query_user_example = "Assistant: {\"app_task\":\"query_user\",\"user_email\":\"johndoe@gmail.com\"}\n"
+        contract_and_tasks = (
+            "Output contract (strict):\n"
+            "- Your response must be a single valid JSON object.\n"
+            "- Return exactly one of:\n"
+            "  1) {\"message_to_user\":\"<speak>...</speak>\"} - ALL message_to_user content MUST be wrapped in SSML <speak> tags\n"
+            "  2) An app task object.\n"
+            "- Never include both keys. Never embed JSON inside strings. Never return an empty response.\n"
+            "- MANDATORY: Every message_to_user MUST be valid SSML wrapped in <speak>...</speak> tags.\n\n"
+            "App tasks:\n"
+            "- query_user\n"
+            "  Format: {\"app_task\":\"query_user\",\"user_email\":\"<email>\"}\n"
+            "  Rules:\n"
+            "  - Ask for the user's email first.\n"
+            "  - Confirm the email by repeating it and spelling it with the NATO alphabet (including domain and TLD). "
+            "Ask `Is this correct?` before sending the task.\n\n"
+            "- query_general_data\n"
+            "  Format: {\"app_task\":\"query_general_data\",\"question\":\"<concise question derived from the conversation>\"}\n"
+            "  Rules:\n"
+            "  - The question must be clear and specific based on the user's last request/context.\n"
+            "  - When you trigger this task, return only the app task JSON.\n\n"
+        )
+        context_marker = ""
+
+    return (
+        "You are a phone call AI agent for TeeTime GolfPass. Respond based on the chat history.\n\n"
+        "Here is the official knowledge base of all TeeTime subscription plans:\n"
+        f"{plans_json}\n\n"
+        "You must always prefer this knowledge base when answering questions about plans, pricing, coverage areas, renewal, or features.\n\n"
+
+        "IMPORTANT: Never attempt to look up an account (query_user) until the user has provided an email address.\n"
+        "When the user provides an email, always confirm it by repeating the email and spelling it out using the NATO alphabet, then ask 'Is this correct?' before sending the app_task.\n"
+        "When confirming an email, only spell out the username part using the NATO alphabet. For well-known domains (like gmail.com, yahoo.com, outlook.com), say the domain and TLD normally (e.g., 'gmail dot com'), without spelling them out.\n\n"
+
+        "---\n"
+        "IMPORTANT: Always keep your answers as short and precise as possible. Share only the most essential information first.\n"
+        "After giving a brief answer, make the call engaging by asking if the user would like to hear more or get extra details.\n"
+        "For example: 'Would you like to hear more about this?' or 'Can I share additional details?'\n"
+        "If the user is interested, you may then provide more information.\n"
+        "---\n\n"
+
+        "Example conversation:\n"
+        "User: I need help with my account.\n"
+        "Assistant: {\"message_to_user\":\"<speak>Sure, I can help with that. Could you please provide your email address so I can look up your account?</speak>\"}\n"
+        "User: Yes, it's johndoe at gmail dot com.\n"
+        "Assistant: {\"message_to_user\":\"<speak>Your email is johndoe@gmail.com. Spelled: j as juliet, o as oscar, h as hotel, n as november, d as delta, o as oscar, e as echo at g as golf, m as mike, a as alpha, i as india, l as lima dot c as charlie, o as oscar, m as mike. Is this correct?</speak>\"}\n"
+        "User: Yes, that's correct.\n"
+        f"{query_user_example}"
+        "Company: [COMPANY_DATA]\\nUSER_LOOKUP_RESULT\\nNO_ACCOUNT\n"
+        "Assistant: {\"message_to_user\":\"<speak>Sorry, I couldn't find any account associated with that email address. If you have another email, please provide it. Otherwise, I can connect you with a human agent.</speak>\"}\n"
+
+        f"{contract_and_tasks}"
+        "Company/backend messages are prefixed as:\n"
+        "[COMPANY_DATA]\\n<content>\n\n"
+        "Preferred normalized markers inside <content>:\n"
+        "- GENERAL_DATA_RESULT\n"
+        "  - Success: includes a line starting with \"Answer:\" followed by text → summarize to the user via message_to_user (do NOT trigger another task).\n"
+        "  - No result: includes \"NO_RESULT\" → do NOT re-issue the same task. "
+        "Respond with a short apology and ask to rephrase or offer human support.\n"
+        "- USER_LOOKUP_RESULT\n"
+        "  - Found account details → summarize next steps with message_to_user.\n"
+        "  - No account (e.g., NO_ACCOUNT or wording like \"No account found\") → do NOT ask for the same app task again. "
+        "Apologize, ask for an alternate email; if none, offer human support.\n"
+        f"{context_marker}\n"
+        "Loop prevention:\n"
+        "- Never repeat the same app task with the same parameters if there is no new [COMPANY_DATA] message since your last task.\n"
+        "- After the backend answers an app task, respond with message_to_user, not another app_task, unless the user explicitly asks.\n\n"
+        "Style & summarization:\n"
+        "- Be concise, friendly, and helpful.\n"
+        "- Use the official plan data above whenever possible.\n"
+        "- When mentioning U.S. or Canadian states or regions, always expand abbreviations into their full names for clarity.\n"
+        "  For example:\n"
+        "    - NY → New York\n"
+        "    - NJ → New Jersey\n"
+        "    - PA → Pennsylvania\n"
+        "    - VT → Vermont\n"
+        "    - ME → Maine\n"
+        "    - OH → Ohio\n"
+        "    - MI → Michigan\n"
+        "    - etc.\n"
+        "- Never read state abbreviations letter by letter. Always prefer natural spoken names instead.\n"
+        "- CRITICAL: Always return your message_to_user as valid SSML, wrapped in <speak>...</speak> tags.\n"
+        "- Example SSML format: <speak>Hello! How can I help you today?</speak>\n\n"
+        "Human support handoff:\n"
+        "- If the user can't provide new info or asks for help, offer human support (Mon–Fri, 9am–5pm ET).\n"
+    )
+
+
+AGENT_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "query_user",
+            "description": "Looks up the user's account by a confirmed email address.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "user_email": {"type": "string", "description": "The email address confirmed by the user."},
+                },
+                "required": ["user_email"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "query_general_data",
+            "description": "Searches the TeeTime knowledge base for information that is not in the plan catalogue.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string", "description": "Concise question derived from the conversation."},
+                },
+                "required": ["question"],
+            },
+        },
+    },
+]
+
+AGENT_TOOL_NAMES = {tool["function"]["name"] for tool in AGENT_TOOLS}
+
+SYSTEM_PROMPT = _compile_system_prompt()
+SYSTEM_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+PROMPT_CACHE_KEY = f"teetime-support-agent-{SYSTEM_PROMPT_VERSION}"
+
+TOOL_SYSTEM_PROMPT = _compile_system_prompt(native_tools=True)
+TOOL_SYSTEM_PROMPT_VERSION = hashlib.sha256(
+    (TOOL_SYSTEM_PROMPT + json.dumps(AGENT_TOOLS, sort_keys=True)).encode("utf-8")
+).hexdigest()[:12]
+TOOL_PROMPT_CACHE_KEY = f"teetime-support-agent-tools-{TOOL_SYSTEM_PROMPT_VERSION}"
 
 
 class TeeTimeSupportAgent:
@@ -28,26 +208,49 @@ class TeeTimeSupportAgent:
     Uses:
     - OpenAIManager for text completions.
     - GoogleAIManager for TTS audio generation.
+
+    With CUSTOMER_SUPPORT_AGENT_NATIVE_TOOLS, app tasks are native tool calls and a knowledge base lookup for the
+    user's utterance is started speculatively alongside the turn, so most questions are answered in one completion.
     """
 
     _APP_TASK_RE = re.compile(r'\{[^{}]*"app_task"[^{}]*\}', re.DOTALL)
 
     def __init__(self, session_id):
         """
-        Initializes the TeeTimeSupportAgent with AI and Google managers and a connection manager.
+        Initializes the TeeTimeSupportAgent as a lightweight per-session handle on the process-wide AgentRuntime,
+        which owns the warm API clients, the billing user and the connection manager.
 
         Args:
-            cur_users (list, optional): List of current users for context. Defaults to [].
+            session_id (str): The unique call/session ID.
         """
-        cur_user = UserModel.objects.filter(email="mohammad@teetimegolfpass.com").first()
-        self.open_ai_manager = OpenAIManager(model="gpt-4", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=[cur_user])
-        self.google_manager = GoogleAIManager(api_key=settings.GOOGLE_API_KEY, cur_users=[cur_user])
-        self.connection_manager = ConnectionConfigManager()
+        runtime = AgentRuntime.get()
+        self.open_ai_manager = runtime.open_ai_manager(model=settings.CUSTOMER_SUPPORT_AGENT_MODEL)
+        self.google_manager = runtime.google_manager()
+        self.connection_manager = runtime.connection_manager
+        self.executor = runtime.executor
+        self.native_tools = settings.CUSTOMER_SUPPORT_AGENT_NATIVE_TOOLS
         self.session_id = session_id
+        self.chat_history = ChatHistoryStore(session_id)
+        self._history = None
+        self._speculation = None
+        self._streamed_sentences = 0
+        self._last_result = {}
     # ----------------------
     # Knowledge base search
     # ----------------------
-    def _find_similar_chunks(self, user_question, top_k=3, similarity_threshold=0.3):
+    def _embed_question(self, user_question):
+        """
+        Returns the (cached) embedding of a user question.
+
+        Args:
+            user_question (str): The user's question.
+
+        Returns:
+            list: The embedding vector.
+        """
+        return QueryEmbeddingCache(self.open_ai_manager).get_embedding(user_question[:2000])
+
+    def _find_similar_chunks(self, user_question, top_k=3, similarity_threshold=0.3, user_embedding=None):
         """
         Finds the most similar knowledge base chunks to the user's question using vector similarity.
 
@@ -55,19 +258,17 @@ class TeeTimeSupportAgent:
             user_question (str): The user's question to search for.
             top_k (int, optional): Number of top similar chunks to return. Defaults to 3.
             similarity_threshold (float, optional): Maximum similarity distance. Defaults to 0.3.
+            user_embedding (list, optional): Precomputed embedding of the question.
 
         Returns:
             str: Concatenated relevant content or a message if nothing is found.
         """
         try:
-            user_chunk = self.open_ai_manager.build_materials_for_rag(text=user_question[:2000], max_chunk_size=2000)
-            user_embedding = user_chunk.get("vector") or ""
+            if user_embedding is None:
+                user_embedding = self._embed_question(user_question)
             returned_str = ""
-            search_results = (
-                CustomerSupportKnowledgeBaseChunkModel.objects
-                .annotate(similarity=CosineDistance(F("embedding"), user_embedding))
-                .filter(similarity__lte=similarity_threshold)
-                .order_by("similarity")[:top_k]
+            search_results = KnowledgeBaseRetriever().search(
+                user_embedding, top_k=top_k, similarity_threshold=similarity_threshold
             )
             for chunk in search_results:
                 returned_str += f"{chunk.kb.url}\nContent: {chunk.chunk_text}\n\n"
@@ -82,7 +283,7 @@ class TeeTimeSupportAgent:
     # ----------------------
     def _safe_json(self, obj):
         """
-        Safely serializes an object to a pretty-printed JSON string.
+        Safely serializes an object to a compact JSON string, keeping the payload sent to the model small.
 
         Args:
             obj: Any serializable Python object.
@@ -92,44 +293,78 @@ class TeeTimeSupportAgent:
         """
         def default(o):
             return str(o)
-        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
 
     def _query_user(self, user_email):
         """
         Looks up user information in the production database and Zoho CRM by email.
 
+        Both backends are queried concurrently, each with its own deadline, so the lookup takes as long as the
+        slowest backend that answers in time. A backend that fails or misses its deadline is listed under
+        "unavailable" and the other one's result is still returned. Complete results are cached per email for
+        CUSTOMER_SUPPORT_USER_LOOKUP_CACHE_TTL seconds.
+
         Args:
             user_email (str): The user's email address.
 
         Returns:
             str: JSON string with user info from DB and Zoho, or 'NO_ACCOUNT' if not found.
         """
-        query = f"""
-            SELECT * 
-            FROM public."user" u
-            JOIN public."user_product" up ON up.user_id = u.id
-            JOIN product p ON up.product_id = p.id
-            WHERE u.email = '{user_email}'
-        """
-        user_info_from_db = self.connection_manager.connect_to_prod_app_db(query)
-        
-        criteria = f"(Email_1:equals:{user_email})"
-        user_info_from_zoho = self.connection_manager.send_zoho_crm_req(f"Sales_Orders/search?criteria={criteria}")
+        user_email = (user_email or "").strip()
+        cache_key = f"user_lookup:{hashlib.sha1(user_email.encode('utf-8')).hexdigest()}"
+        cached = cache.get(cache_key)
+        if cached:
+            return cached
 
-        info = {
-            "from_db": user_info_from_db["data"] if user_info_from_db.get("success") else None,
-            "from_zoho": user_info_from_zoho["data"] if user_info_from_zoho.get("success") else None,
+        criteria = f"(Email_1:equals:{user_email})"
+        lookups = {
+            "from_db": (
+                self.executor.submit(
+                    self.connection_manager.run_prepared_query,
+                    "user_lookup",
+                    USER_LOOKUP_QUERY,
+                    (user_email, USER_LOOKUP_MAX_ROWS),
+                    max_rows=USER_LOOKUP_MAX_ROWS,
+                ),
+                settings.CUSTOMER_SUPPORT_USER_LOOKUP_DB_TIMEOUT,
+            ),
+            "from_zoho": (
+                self.executor.submit(self.connection_manager.send_zoho_crm_req, f"Sales_Orders/search?criteria={criteria}"),
+                settings.CUSTOMER_SUPPORT_USER_LOOKUP_ZOHO_TIMEOUT,
+            ),
         }
 
-        if not info["from_db"] and not info["from_zoho"]:
+        started_at = time.monotonic()
+        info = {}
+        unavailable = []
+        for name, (future, timeout) in lookups.items():
+            try:
+                result = future.result(timeout=max(0, started_at + timeout - time.monotonic()))
+            except FutureTimeoutError:
+                print(f"❌ User lookup in {name} timed out after {timeout}s")
+                unavailable.append(name)
+                result = {"success": False}
+            except Exception as e:
+                print(f"❌ User lookup in {name} failed: {e}")
+                unavailable.append(name)
+                result = {"success": False}
+            info[name] = result["data"] if result.get("success") else None
+
+        if unavailable:
+            info["unavailable"] = unavailable
+        elif not info["from_db"] and not info["from_zoho"]:
+            cache.set(cache_key, "NO_ACCOUNT", timeout=settings.CUSTOMER_SUPPORT_USER_LOOKUP_CACHE_TTL)
             return "NO_ACCOUNT"
 
-        return self._safe_json(info)
-
+        lookup_text = self._safe_json(info)
+        if not unavailable:
+            cache.set(cache_key, lookup_text, timeout=settings.CUSTOMER_SUPPORT_USER_LOOKUP_CACHE_TTL)
+        return lookup_text
 
     def _query_general_data(self, question):
         """
         Finds and returns general knowledge base information relevant to the question.
+        Answers of semantically similar recent questions are served from the SemanticAnswerCache.
 
         Args:
             question (str): The user's question.
@@ -137,26 +372,170 @@ class TeeTimeSupportAgent:
         Returns:
             str or None: Relevant answer text, or None if not found.
         """
-        raw = self._find_similar_chunks(question)
+        try:
+            embedding = self._embed_question(question)
+        except Exception as e:
+            print(f"Error embedding question: {e}")
+            return None
+
+        answer_cache = SemanticAnswerCache()
+        try:
+            cached = answer_cache.lookup(embedding)
+        except Exception as e:
+            print(f"Error reading semantic answer cache: {e}")
+            cached = None
+        if cached:
+            return cached
+
+        raw = self._find_similar_chunks(question, user_embedding=embedding)
         text = raw if isinstance(raw, str) else self._safe_json(raw)
         if not text or not str(text).strip():
             return None
         low = text.lower()
         if "queryset []" in low or "no result" in low or "not found" in low:
             return None
+        try:
+            answer_cache.store(question, embedding, text)
+        except Exception as e:
+            print(f"Error writing semantic answer cache: {e}")
         return text
 
+    # ----------------------
+    # Speculative knowledge base lookup
+    # ----------------------
+    def _start_speculation(self):
+        """
+        Starts a knowledge base lookup for the user's latest utterance in the background, before the model has
+        decided whether it needs one.
+        """
+        self._speculation = None
+        if not (self.native_tools and settings.CUSTOMER_SUPPORT_SPECULATIVE_KB) or not self._history:
+            return
+        last = self._history[-1]
+        question = (last.get("content") or "").strip() if last.get("role") == "user" else ""
+        if len(question.split()) < AGENT_SPECULATIVE_MIN_WORDS:
+            return
+        self._speculation = {
+            "question": question,
+            "future": self.executor.submit(self._prefetch_general_data, question),
+            "offered": False,
+        }
+
+    def _prefetch_general_data(self, question):
+        """
+        Runs _query_general_data on a pool thread and releases the thread's database connection afterwards.
+        """
+        try:
+            return self._query_general_data(question)
+        finally:
+            connections.close_all()
+
+    def _speculative_context(self):
+        """
+        Returns the speculative lookup as a KNOWLEDGE_BASE_CONTEXT payload for the first model call of the turn,
+        waiting at most CUSTOMER_SUPPORT_SPECULATIVE_KB_WAIT_SECONDS for it.
+
+        Returns:
+            str or None: The payload, or None if there is no speculation, it found nothing or it is not ready.
+        """
+        speculation = self._speculation
+        if not speculation or speculation["offered"]:
+            return None
+        speculation["offered"] = True
+        try:
+            answer = speculation["future"].result(timeout=settings.CUSTOMER_SUPPORT_SPECULATIVE_KB_WAIT_SECONDS)
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            print(f"Error in speculative knowledge base lookup: {e}")
+            return None
+        if not answer:
+            return None
+        return f"KNOWLEDGE_BASE_CONTEXT\nQuestion: {speculation['question']}\nResults:\n{answer}"
+
+    def _general_data_for(self, question):
+        """
+        Answers a query_general_data task, reusing the speculative lookup when the model asked the same question.
+
+        Args:
+            question (str): The question of the app task.
+
+        Returns:
+            str or None: Relevant answer text, or None if not found.
+        """
+        speculation = self._speculation
+        if speculation and QueryEmbeddingCache.normalize(question) == QueryEmbeddingCache.normalize(speculation["question"]):
+            try:
+                return speculation["future"].result()
+            except Exception as e:
+                print(f"Error in speculative knowledge base lookup: {e}")
+        return self._query_general_data(question)
+
     # ----------------------
     # Run logic
     # ----------------------
-    def run_once(self):
+    def run_once(self, on_sentence=None):
         """
         Processes a single step of the conversation, handling tasks and generating responses.
 
+        Args:
+            on_sentence (callable, optional): If given, the model output is streamed and this is called with each
+                completed SSML sentence of the message_to_user as soon as it is available.
+
+        Returns:
+            dict: The agent's response, including either a message or an app task, and whether any sentence was streamed.
+        """
+        self._streamed_sentences = 0
+        self._history = self.chat_history.get(limit=AGENT_MAX_HISTORY_MESSAGES)
+        self._start_speculation()
+        try:
+            result = self._run_once(on_sentence=on_sentence)
+        finally:
+            self._history = None
+            self._speculation = None
+        result["streamed"] = self._streamed_sentences > 0
+        return result
+
+    def respond(self, user_message, on_sentence=None):
+        """
+        Records the user's message, runs one turn and returns the text to say back.
+
+        Args:
+            user_message (str): The user's message. Empty messages are not recorded.
+            on_sentence (callable, optional): Forwarded to run_once for streamed replies.
+
+        Returns:
+            str: The unwrapped message_to_user.
+
+        Example:
+            bot_message = TeeTimeSupportAgent("CA123").respond("How much is the Super Pass?")
+        """
+        if user_message:
+            self._append_to_history({"role": "user", "content": user_message})
+        self._last_result = self.run_once(on_sentence=on_sentence)
+        final = self._last_result.get("response", {})
+        bot_message = final.get("message_to_user") or "Sorry—something went wrong."
+        while isinstance(bot_message, str):
+            try:
+                parsed = json.loads(bot_message)
+            except Exception:
+                break
+            if not isinstance(parsed, dict) or "message_to_user" not in parsed:
+                break
+            bot_message = parsed["message_to_user"]
+        return bot_message
+
+    def _run_once(self, on_sentence=None):
+        """
+        Runs the decide → app task → decide loop for a single turn.
+
+        Args:
+            on_sentence (callable, optional): Forwarded to _model_decide.
+
         Returns:
-            dict: The agent's response, including either a message or an app task.
+            dict: The agent's response.
         """
-        out = self._model_decide()
+        out = self._model_decide(on_sentence=on_sentence)
 
         if "message_to_user" in out and not out.get("app_task"):
             self._append_assistant_json(out)
@@ -171,7 +550,7 @@ class TeeTimeSupportAgent:
 
         if app_task == "query_general_data":
             question = (out.get("question") or "").strip()
-            answer = self._query_general_data(question)
+            answer = self._general_data_for(question)
 
             if answer and str(answer).strip():
                 payload = f"GENERAL_DATA_RESULT\nQuestion: {question}\nAnswer:\n{answer}"
@@ -179,7 +558,7 @@ class TeeTimeSupportAgent:
                 payload = f"GENERAL_DATA_RESULT\nQuestion: {question}\nNO_RESULT"
 
             self._append_to_history({"role": "company", "content": payload})
-            final_out = self._model_decide()
+            final_out = self._model_decide(on_sentence=on_sentence)
             self._append_assistant_json(final_out)
             return {"response": final_out}
 
@@ -193,56 +572,54 @@ class TeeTimeSupportAgent:
                 company_payload = "USER_LOOKUP_RESULT\nNO_ACCOUNT"
 
             self._append_to_history({"role": "company", "content": company_payload})
-            final_out = self._model_decide()
+            final_out = self._model_decide(on_sentence=on_sentence)
             self._append_assistant_json(final_out)
             return {"response": final_out}
 
         self._append_to_history({"role": "company", "content": f"UNKNOWN_TASK\n{self._safe_json(out)}"})
-        final_out = self._model_decide()
+        final_out = self._model_decide(on_sentence=on_sentence)
         self._append_assistant_json(final_out)
         return {"response": final_out}
 
     # ----------------------
     # Core model call
     # ----------------------
-    def _model_decide(self, max_tokens=1000):
+    def _model_decide(self, max_tokens=1000, on_sentence=None):
         """
         Builds the prompt, sends it to the AI model, parses and normalizes the response.
 
         Args:
             chat_history (list, optional): List of message dicts representing the conversation so far. If None, uses self._get_history().
             max_tokens (int, optional): Max tokens for the AI response. Defaults to 1000.
+            on_sentence (callable, optional): If given, the response is streamed and each completed SSML sentence is passed to it.
 
         Returns:
             dict: Parsed and normalized model output (app task or message).
         """
         chat_history = self._get_history()
-        self.open_ai_manager.clear_messages()
-        self.open_ai_manager.add_message("system", self._build_system_prompt())
-
-        for chat in chat_history:
-            role = self._map_role(chat.get("role", "user"))
-            content = chat.get("content", "")
-            if chat.get("role") == "company":
-                content = f"[COMPANY_DATA]\n{content}"
-                role = "assistant"
-            self.open_ai_manager.add_message(role, text=content)
-        raw = self.open_ai_manager.generate_response(max_token=max_tokens)
-        try:
-            obj = json.loads(raw)
-        except Exception:
-            embedded = self._extract_embedded_app_task(raw)
-            obj = embedded if embedded else {"message_to_user": raw}
+        if self.native_tools:
+            obj = self._decide_with_tools(chat_history, max_tokens, on_sentence)
+        else:
+            messages = self._build_messages(chat_history)
+            if on_sentence:
+                raw = self._generate_streamed_response(max_tokens, on_sentence, messages)
+            else:
+                raw = self.open_ai_manager.generate_response(
+                    max_token=max_tokens,
+                    messages=messages,
+                    prompt_cache_key=PROMPT_CACHE_KEY,
+                )
+            obj = self._parse_model_output(raw)
 
         obj = self._enforce_single_channel(obj)
-        prev = self._last_assistant_app_task()
+        prev = self._last_assistant_app_task(chat_history)
 
         if (
             obj.get("app_task")
             and prev
             and obj.get("app_task") == prev.get("app_task")
             and obj.get("question") == prev.get("question")
-            and not self._has_company_since_last_app_task()
+            and not self._has_company_since_last_app_task(chat_history)
         ):
             return {
                 "message_to_user": (
@@ -257,9 +634,176 @@ class TeeTimeSupportAgent:
 
         return obj
 
+    def _parse_model_output(self, raw):
+        """
+        Parses a raw model response into an output object, recovering app tasks embedded in plain text.
+
+        Args:
+            raw (str): The raw model response.
+
+        Returns:
+            dict: The parsed output object.
+        """
+        try:
+            return json.loads(raw)
+        except Exception:
+            embedded = self._extract_embedded_app_task(raw)
+            return embedded if embedded else {"message_to_user": raw}
+
+    def _decide_with_tools(self, chat_history, max_tokens, on_sentence=None):
+        """
+        Calls the model with native tools. On the first call of a turn the speculative knowledge base lookup is
+        injected when it is ready in time, so the model can answer without a query_general_data round trip.
+
+        Args:
+            chat_history (list): List of message dicts representing the conversation so far.
+            max_tokens (int): Max tokens for the AI response.
+            on_sentence (callable, optional): If given, the response is streamed sentence by sentence.
+
+        Returns:
+            dict: The output object; tool calls are returned as app task objects.
+        """
+        messages = self._build_messages(chat_history, native_tools=True)
+        context = self._speculative_context()
+        if context:
+            messages.append({"role": "system", "content": f"[COMPANY_DATA]\n{context}"})
+
+        if on_sentence:
+            content, tool_calls = self._generate_streamed_tool_response(max_tokens, on_sentence, messages)
+        else:
+            result = self.open_ai_manager.generate_tool_response(
+                AGENT_TOOLS,
+                max_token=max_tokens,
+                messages=messages,
+                prompt_cache_key=TOOL_PROMPT_CACHE_KEY,
+            )
+            content, tool_calls = result["content"], result["tool_calls"]
+
+        if tool_calls:
+            call = tool_calls[0]
+            return {"app_task": call["name"], **call["arguments"]}
+        return self._parse_model_output(content)
+
+    def _tool_call_from_history(self, chat):
+        """
+        Returns the app task of an assistant history message if it maps to one of AGENT_TOOLS.
+        """
+        if chat.get("role") != "assistant":
+            return None
+        try:
+            obj = json.loads(chat.get("content", ""))
+        except Exception:
+            return None
+        if isinstance(obj, dict) and obj.get("app_task") in AGENT_TOOL_NAMES:
+            return obj
+        return None
+
+    def _build_messages(self, chat_history, native_tools=False):
+        """
+        Lays out the model input as the precompiled system prompt followed by the conversation, append-only.
+
+        Turns are never summarized into the system message, so consecutive calls of the same session share the
+        system prompt and every earlier turn as an identical prefix that OpenAI can serve from its prompt cache.
+
+        Args:
+            chat_history (list): List of message dicts representing the conversation so far.
+            native_tools (bool): Replay app tasks answered by the backend as tool calls and tool results.
+
+        Returns:
+            list: Message dicts ready for the chat completions API.
+        """
+        messages = [{"role": "system", "content": TOOL_SYSTEM_PROMPT if native_tools else SYSTEM_PROMPT}]
+        history = chat_history[-AGENT_MAX_HISTORY_MESSAGES:]
+        pending_call_id = None
+        for index, chat in enumerate(history):
+            if pending_call_id and chat.get("role") == "company":
+                messages.append({"role": "tool", "tool_call_id": pending_call_id, "content": chat.get("content", "")})
+                pending_call_id = None
+                continue
+            pending_call_id = None
+            task = self._tool_call_from_history(chat) if native_tools else None
+            if task and index + 1 < len(history) and history[index + 1].get("role") == "company":
+                pending_call_id = f"call_{index}"
+                arguments = {k: v for k, v in task.items() if k != "app_task"}
+                messages.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": pending_call_id,
+                        "type": "function",
+                        "function": {"name": task["app_task"], "arguments": json.dumps(arguments, ensure_ascii=False)},
+                    }],
+                })
+                continue
+            role = self._map_role(chat.get("role", "user"))
+            content = chat.get("content", "")
+            if chat.get("role") == "company":
+                content = f"[COMPANY_DATA]\n{content}"
+                role = "assistant"
+            messages.append({"role": role, "content": content})
+        return messages
+
+    def _generate_streamed_response(self, max_tokens, on_sentence, messages=None):
+        """
+        Streams the model response, handing each completed SSML sentence of a message_to_user to on_sentence.
+
+        Args:
+            max_tokens (int): Max tokens for the AI response.
+            on_sentence (callable): Called with each SSML sentence as soon as it is complete.
+            messages (list, optional): Message dicts to send. If None, uses the manager's internal history.
+
+        Returns:
+            str: The full raw response, cleaned the same way as generate_response.
+        """
+        buffer = SSMLSentenceBuffer()
+        stream = self.open_ai_manager.generate_response_stream(
+            max_token=max_tokens,
+            messages=messages,
+            prompt_cache_key=PROMPT_CACHE_KEY,
+        )
+        for delta in stream:
+            for sentence in buffer.feed(delta):
+                on_sentence(sentence)
+        for sentence in buffer.flush():
+            on_sentence(sentence)
+        self._streamed_sentences += buffer.emitted
+        return self.open_ai_manager._clean_code_block(buffer.raw.strip())
+
+    def _generate_streamed_tool_response(self, max_tokens, on_sentence, messages):
+        """
+        Streams a tool-enabled model response, handing each completed SSML sentence of a message_to_user to
+        on_sentence.
+
+        Args:
+            max_tokens (int): Max tokens for the AI response.
+            on_sentence (callable): Called with each SSML sentence as soon as it is complete.
+            messages (list): Message dicts to send.
+
+        Returns:
+            tuple: (cleaned response text, list of tool calls)
+        """
+        buffer = SSMLSentenceBuffer()
+        tool_calls = []
+        stream = self.open_ai_manager.generate_tool_response_stream(
+            AGENT_TOOLS,
+            max_token=max_tokens,
+            messages=messages,
+            prompt_cache_key=TOOL_PROMPT_CACHE_KEY,
+        )
+        for event in stream:
+            if event["type"] == "tool_calls":
+                tool_calls = event["tool_calls"]
+                continue
+            for sentence in buffer.feed(event["delta"]):
+                on_sentence(sentence)
+        for sentence in buffer.flush():
+            on_sentence(sentence)
+        self._streamed_sentences += buffer.emitted
+        return self.open_ai_manager._clean_code_block(buffer.raw.strip()), tool_calls
+
     def _build_system_prompt(self) -> str:
         """
-        Builds the comprehensive system prompt for the AI agent with all instructions and knowledge.
+        Returns the precompiled system prompt for the AI agent.
 
         Returns:
             str: Complete system prompt including knowledge base, rules, and examples
@@ -269,122 +813,43 @@ class TeeTimeSupportAgent:
             >>> prompt = agent._build_system_prompt()
             >>> print(len(prompt))  # Shows the length of the comprehensive prompt
         """
-        plans_json = json.dumps(ALL_TEA_TIME_SUB_PLANS, ensure_ascii=False, indent=2)
-
-        return (
-            "You are a phone call AI agent for TeeTime GolfPass. Respond based on the chat history.\n\n"
-            "Here is the official knowledge base of all TeeTime subscription plans:\n"
-            f"{plans_json}\n\n"
-            "You must always prefer this knowledge base when answering questions about plans, pricing, coverage areas, renewal, or features.\n\n"
-
-            "IMPORTANT: Never attempt to look up an account (query_user) until the user has provided an email address.\n"
-            "When the user provides an email, always confirm it by repeating the email and spelling it out using the NATO alphabet, then ask 'Is this correct?' before sending the app_task.\n"
-            "When confirming an email, only spell out the username part using the NATO alphabet. For well-known domains (like gmail.com, yahoo.com, outlook.com), say the domain and TLD normally (e.g., 'gmail dot com'), without spelling them out.\n\n"
-
-            "---\n"
-            "IMPORTANT: Always keep your answers as short and precise as possible. Share only the most essential information first.\n"
-            "After giving a brief answer, make the call engaging by asking if the user would like to hear more or get extra details.\n"
-            "For example: 'Would you like to hear more about this?' or 'Can I share additional details?'\n"
-            "If the user is interested, you may then provide more information.\n"
-            "---\n\n"
-
-            "Example conversation:\n"
-            "User: I need help with my account.\n"
-            "Assistant: {\"message_to_user\":\"<speak>Sure, I can help with that. Could you please provide your email address so I can look up your account?</speak>\"}\n"
-            "User: Yes, it's johndoe at gmail dot com.\n"
-            "Assistant: {\"message_to_user\":\"<speak>Your email is johndoe@gmail.com. Spelled: j as juliet, o as oscar, h as hotel, n as november, d as delta, o as oscar, e as echo at g as golf, m as mike, a as alpha, i as india, l as lima dot c as charlie, o as oscar, m as mike. Is this correct?</speak>\"}\n"
-            "User: Yes, that's correct.\n"
-            "Assistant: {\"app_task\":\"query_user\",\"user_email\":\"johndoe@gmail.com\"}\n"
-            "Company: [COMPANY_DATA]\\nUSER_LOOKUP_RESULT\\nNO_ACCOUNT\n"
-            "Assistant: {\"message_to_user\":\"<speak>Sorry, I couldn't find any account associated with that email address. If you have another email, please provide it. Otherwise, I can connect you with a human agent.</speak>\"}\n"
-
-            "Output contract (strict):\n"
-            "- Your response must be a single valid JSON object.\n"
-            "- Return exactly one of:\n"
-            "  1) {\"message_to_user\":\"<speak>...</speak>\"} - ALL message_to_user content MUST be wrapped in SSML <speak> tags\n"
-            "  2) An app task object.\n"
-            "- Never include both keys. Never embed JSON inside strings. Never return an empty response.\n"
-            "- MANDATORY: Every message_to_user MUST be valid SSML wrapped in <speak>...</speak> tags.\n\n"
-            "App tasks:\n"
-            "- query_user\n"
-            "  Format: {\"app_task\":\"query_user\",\"user_email\":\"<email>\"}\n"
-            "  Rules:\n"
-            "  - Ask for the user's email first.\n"
-            "  - Confirm the email by repeating it and spelling it with the NATO alphabet (including domain and TLD). "
-            "Ask `Is this correct?` before sending the task.\n\n"
-            "- query_general_data\n"
-            "  Format: {\"app_task\":\"query_general_data\",\"question\":\"<concise question derived from the conversation>\"}\n"
-            "  Rules:\n"
-            "  - The question must be clear and specific based on the user's last request/context.\n"
-            "  - When you trigger this task, return only the app task JSON.\n\n"
-            "Company/backend messages are prefixed as:\n"
-            "[COMPANY_DATA]\\n<content>\n\n"
-            "Preferred normalized markers inside <content>:\n"
-            "- GENERAL_DATA_RESULT\n"
-            "  - Success: includes a line starting with \"Answer:\" followed by text → summarize to the user via message_to_user (do NOT trigger another task).\n"
-            "  - No result: includes \"NO_RESULT\" → do NOT re-issue the same task. "
-            "Respond with a short apology and ask to rephrase or offer human support.\n"
-            "- USER_LOOKUP_RESULT\n"
-            "  - Found account details → summarize next steps with message_to_user.\n"
-            "  - No account (e.g., NO_ACCOUNT or wording like \"No account found\") → do NOT ask for the same app task again. "
-            "Apologize, ask for an alternate email; if none, offer human support.\n\n"
-            "Loop prevention:\n"
-            "- Never repeat the same app task with the same parameters if there is no new [COMPANY_DATA] message since your last task.\n"
-            "- After the backend answers an app task, respond with message_to_user, not another app_task, unless the user explicitly asks.\n\n"
-            "Style & summarization:\n"
-            "- Be concise, friendly, and helpful.\n"
-            "- Use the official plan data above whenever possible.\n"
-            "- When mentioning U.S. or Canadian states or regions, always expand abbreviations into their full names for clarity.\n"
-            "  For example:\n"
-            "    - NY → New York\n"
-            "    - NJ → New Jersey\n"
-            "    - PA → Pennsylvania\n"
-            "    - VT → Vermont\n"
-            "    - ME → Maine\n"
-            "    - OH → Ohio\n"
-            "    - MI → Michigan\n"
-            "    - etc.\n"
-            "- Never read state abbreviations letter by letter. Always prefer natural spoken names instead.\n"
-            "- CRITICAL: Always return your message_to_user as valid SSML, wrapped in <speak>...</speak> tags.\n"
-            "- Example SSML format: <speak>Hello! How can I help you today?</speak>\n\n"
-            "Human support handoff:\n"
-            "- If the user can't provide new info or asks for help, offer human support (Mon–Fri, 9am–5pm ET).\n"
-        )
+        return SYSTEM_PROMPT
 
-    
     def _append_to_history(self, new_message):
         """
-        Appends a new message to the chat history in the cache for the current session.
+        Appends a new message to the chat history of the current session.
+
+        During a turn the message is also added to the history loaded by run_once, so the rest of the turn
+        sees it without fetching the history again.
 
         Args:
             new_message (dict): The message to append, e.g., {"role": ..., "content": ...}.
-
-        Returns:
-            list: The updated chat history after appending the new message.
         """
-        key = f"chat_history_{self.session_id}"
-        history = cache.get(key, [])
-        history.append(new_message)
-        cache.set(key, history, timeout=60*60)
-        return history
-    
+        self.chat_history.append(new_message)
+        if self._history is not None:
+            self._history.append(new_message)
+
     def _get_history(self):
         """
-        Retrieves the chat history for the current session from the cache.
+        Retrieves the chat history for the current session.
 
         Returns:
-            list: The chat history as a list of message dicts, or an empty list if none exists.
+            list: The newest AGENT_MAX_HISTORY_MESSAGES message dicts, or an empty list if none exists.
         """
-        return cache.get(f"chat_history_{self.session_id}", []) if self.session_id else []
+        if self._history is not None:
+            return self._history
+        return self.chat_history.get(limit=AGENT_MAX_HISTORY_MESSAGES)
 
     def _set_history(self, history):
         """
-        Sets the chat history for the current session in the cache.
+        Replaces the chat history for the current session.
 
         Args:
             history (list): The chat history to store.
         """
-        cache.set(f"chat_history_{self.session_id}", history, timeout=60 * 60 * 24)
+        self.chat_history.replace(history)
+        if self._history is not None:
+            self._history = list(history)
 
     # ----------------------
     # Utilities
@@ -437,7 +902,7 @@ class TeeTimeSupportAgent:
             return obj
         return {"message_to_user": json.dumps(obj, ensure_ascii=False)}
 
-    def _last_assistant_app_task(self):
+    def _last_assistant_app_task(self, chat_history=None):
         """
         Finds the last assistant message in the chat history that included an app task.
 
@@ -447,7 +912,8 @@ class TeeTimeSupportAgent:
         Returns:
             dict or None: The last app task dict, or None if not found.
         """
-        chat_history = self._get_history()
+        if chat_history is None:
+            chat_history = self._get_history()
         for m in reversed(chat_history):
             if m.get("role") == "assistant":
                 try:
@@ -458,7 +924,7 @@ class TeeTimeSupportAgent:
                     pass
         return None
 
-    def _has_company_since_last_app_task(self):
+    def _has_company_since_last_app_task(self, chat_history=None):
         """
         Checks if there has been a company message since the last assistant app task.
 
@@ -468,8 +934,8 @@ class TeeTimeSupportAgent:
         Returns:
             bool: True if a company message was found after the last app task, else False.
         """
-        
-        chat_history = self._get_history()
+        if chat_history is None:
+            chat_history = self._get_history()
         last_ai_idx = None
         for i in range(len(chat_history) - 1, -1, -1):
             m = chat_history[i]
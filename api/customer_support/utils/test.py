@@ -8,7 +8,7 @@ def test_conn_manager():
 
 def test_zoho_desk_manager():
     zoho_desk_manager = ZohoDeskManager()
-    # tickets = zoho_desk_manager.get_all_tickets()
+    # tickets = zoho_desk_manager.sync_tickets()
     # print("Zoho Desk Manager All Tickets:", tickets)
     # cur_ticket = zoho_desk_manager.get_ticket_details(ticket_id="852042000031219787")
     # print("Zoho Desk Manager Ticket Details:", cur_ticket)
@@ -0,0 +1,225 @@
+import re
+
+from core.utils.redis_queue import RedisQueue
+
+
+class SSMLSentenceBuffer:
+    """
+    Incrementally turns the streamed model output into speakable SSML sentences.
+
+    The agent answers with {"message_to_user": "<speak>...</speak>"}, so the buffer decodes the
+    JSON string value as it arrives and emits every completed sentence wrapped in its own <speak> tags.
+    Outputs that turn out to be app tasks are never emitted.
+    """
+
+    _MESSAGE_KEY_RE = re.compile(r'"message_to_user"\s*:\s*"')
+    _SPEAK_TAG_RE = re.compile(r"</?speak\s*>", re.IGNORECASE)
+    _SENTENCE_END_RE = re.compile(r'(?:\.{3}|[.!?…])["\'”’)\]]*\s')
+    _JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, min_sentence_chars=12):
+        """
+        Args:
+            min_sentence_chars (int): Sentences shorter than this are merged with the next one. Default is 12.
+        """
+        self.min_sentence_chars = min_sentence_chars
+        self.raw = ""
+        self.mode = None
+        self._pos = 0
+        self._closed = False
+        self._pending = ""
+        self.emitted = 0
+
+    def _detect_mode(self):
+        """
+        Decides from the first characters whether the output is a spoken message, plain text or an app task.
+        """
+        stripped = self.raw.lstrip()
+        if not stripped:
+            return
+        if stripped[0] not in "{`":
+            self.mode = "text"
+            self._pos = len(self.raw) - len(stripped)
+            return
+        if '"app_task"' in self.raw:
+            self.mode = "skip"
+            return
+        m = self._MESSAGE_KEY_RE.search(self.raw)
+        if m:
+            self.mode = "json"
+            self._pos = m.end()
+
+    def _decode_json_string(self):
+        """
+        Decodes as much of the streamed JSON string value as is currently available.
+        """
+        out = []
+        i = self._pos
+        raw = self.raw
+        while i < len(raw):
+            ch = raw[i]
+            if ch == "\\":
+                if i + 1 >= len(raw):
+                    break
+                esc = raw[i + 1]
+                if esc == "u":
+                    if i + 6 > len(raw):
+                        break
+                    try:
+                        out.append(chr(int(raw[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                out.append(self._JSON_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if ch == '"':
+                self._closed = True
+                i += 1
+                break
+            out.append(ch)
+            i += 1
+        self._pos = i
+        return "".join(out)
+
+    def _split_sentences(self, final=False):
+        """
+        Pops complete sentences from the pending text, never splitting inside an open SSML element.
+        """
+        sentences = []
+        start = 0
+        depth = 0
+        i = 0
+        text = self._pending
+        while i < len(text):
+            ch = text[i]
+            if ch == "<":
+                closing = text.startswith("</", i)
+                tag_end = text.find(">", i)
+                if tag_end == -1:
+                    break
+                self_closing = text[tag_end - 1] == "/"
+                if closing:
+                    depth = max(0, depth - 1)
+                elif not self_closing:
+                    depth += 1
+                i = tag_end + 1
+                continue
+            if depth == 0:
+                m = self._SENTENCE_END_RE.match(text, i)
+                if m:
+                    candidate = text[start:m.end()].strip()
+                    if len(candidate) >= self.min_sentence_chars:
+                        sentences.append(candidate)
+                        start = m.end()
+                    i = m.end()
+                    continue
+            i += 1
+        self._pending = text[start:]
+        if final and self._pending.strip():
+            sentences.append(self._pending.strip())
+            self._pending = ""
+        return [f"<speak>{s}</speak>" for s in sentences]
+
+    def feed(self, delta):
+        """
+        Adds a streamed piece of the model output.
+
+        Args:
+            delta (str): The next piece of raw model output.
+
+        Returns:
+            list: Newly completed SSML sentences (may be empty).
+        """
+        self.raw += delta or ""
+        if self.mode is None:
+            self._detect_mode()
+        if self.mode == "json" and not self._closed:
+            self._pending += self._decode_json_string()
+        elif self.mode == "text":
+            self._pending += self.raw[self._pos:]
+            self._pos = len(self.raw)
+        else:
+            return []
+        self._pending = self._SPEAK_TAG_RE.sub("", self._pending)
+        sentences = self._split_sentences()
+        self.emitted += len(sentences)
+        return sentences
+
+    def flush(self):
+        """
+        Returns whatever is left once the stream has finished.
+
+        Returns:
+            list: Remaining SSML sentences (may be empty).
+        """
+        if self.mode not in ("json", "text"):
+            return []
+        if self.mode == "text":
+            self._pending = self._pending.replace("```", "")
+        self._pending = self._SPEAK_TAG_RE.sub("", self._pending)
+        sentences = self._split_sentences(final=True)
+        self.emitted += len(sentences)
+        return sentences
+
+
+class VoiceStreamManager:
+    """
+    Redis-backed queue of synthesized reply segments for a single call.
+
+    The Celery worker pushes one segment per sentence as soon as its audio is ready, and the
+    Twilio webhook blocks on the queue instead of polling the cache on every redirect.
+    """
+
+    def __init__(self, call_sid, timeout=60 * 60):
+        """
+        Args:
+            call_sid (str): The unique call/session ID.
+            timeout (int): TTL in seconds for the segment queue. Default is 3600.
+        """
+        self.call_sid = call_sid
+        self.queue = RedisQueue(name=f"{call_sid}_ai_audio", timeout=timeout)
+
+    def reset(self):
+        """
+        Drops any segments left over from a previous turn.
+        """
+        self.queue.clear_queue()
+
+    def push_segment(self, text, audio_url=None):
+        """
+        Publishes a playable segment of the reply.
+
+        Args:
+            text (str): The SSML text of the segment.
+            audio_url (str, optional): URL of the synthesized audio for the segment.
+        """
+        self.queue.add_task({"text": text, "audio_url": audio_url})
+
+    def finish(self):
+        """
+        Marks the end of the current reply.
+        """
+        self.queue.add_task({"done": True})
+
+    def wait_for_segments(self, timeout=4):
+        """
+        Waits for the next segment, then drains every other segment that is already available.
+
+        Args:
+            timeout (float): Seconds to wait for the first segment. Default is 4.
+
+        Returns:
+            list: Segment dicts in order; empty if nothing arrived in time. A {"done": True} entry marks the end of the reply.
+        """
+        first = self.queue.wait_for_task(timeout=timeout)
+        if not first:
+            return []
+        segments = [first]
+        while not segments[-1].get("done"):
+            nxt = self.queue.get_task()
+            if not nxt:
+                break
+            segments.append(nxt)
+        return segments
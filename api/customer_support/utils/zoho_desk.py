@@ -1,8 +1,34 @@
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.html import strip_tags
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone as dt_timezone
+import json
 
 from ai.utils.open_ai_manager import OpenAIManager
-from customer_support.models import ZohoDeskTicketModel, CustomerSupportKnowledgeBaseModel, CustomerSupportKnowledgeBaseChunkModel
+from config.utils.rate_limiter import RateLimiter
+from customer_support.constants import (
+    ZOHO_DESK_SYNC_PAGE_SIZE,
+    ZOHO_DESK_SYNC_CURSOR_OVERLAP_SECONDS,
+    ZOHO_TICKET_SUMMARY_BATCH_SIZE,
+    ZOHO_TICKET_SUMMARY_MAX_INPUT_CHARS,
+)
+from customer_support.models import ZohoDeskTicketModel, ZohoDeskSyncStateModel
 from customer_support.utils.connection_config import ConnectionConfigManager
+from customer_support.utils.kb_ingestion import KnowledgeBaseIngestor
+
+ZOHO_DESK_TICKETS_SYNC = "tickets"
+
+ZOHO_TICKET_SUMMARY_PROMPT = (
+    "You are an expert customer support analyst. You will receive a Zoho Desk ticket's full details. "
+    "Please generate a complete, clear, and concise explanation/summary of what the customer's issue was and how the issue was handled or resolved. "
+    "This summary will be stored for future use, so that if a customer comes with a similar issue, we can search for the most relevant past tickets and use the most similar one to help reply. "
+    "Focus on clarity, completeness, and relevance for future retrieval."
+)
+ZOHO_TICKET_SUMMARY_CACHE_KEY = "zoho-desk-ticket-summary"
 
 
 class ZohoDeskManager:
@@ -13,29 +39,11 @@ class ZohoDeskManager:
         Example:
             manager = ZohoDeskManager()
         """
+        self.cur_users = cur_users
         self.conn_manager = ConnectionConfigManager()
-        self.open_ai_manager = OpenAIManager(model="gpt-4o", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=cur_users)
-
-    def _get_paginated_tickets(self, limit=10, from_record=0):
-        """
-        Fetches a paginated list of ticket metadata from Zoho Desk.
-
-        Args:
-            limit (int): Number of tickets to fetch per page.
-            from_record (int): Offset for pagination.
-
-        Returns:
-            list: List of ticket metadata dictionaries.
-
-        Example:
-            tickets = self._get_paginated_tickets(limit=50, from_record=0)
-        """
-        endpoint = f"tickets?limit={limit}&from={from_record}"
-        res = self.conn_manager.send_zoho_desk_req(zoho_endpoint=endpoint, method="GET")
-        if not res["success"]:
-            print(f"❌ {res['message']}")
-            return []
-        return res["data"]
+        self.rate_limiter = RateLimiter(settings.ZOHO_DESK_REQUESTS_PER_MINUTE)
+        self.summary_rate_limiter = RateLimiter(settings.ZOHO_DESK_SUMMARY_TICKETS_PER_MINUTE)
+        self.kb_ingestor = KnowledgeBaseIngestor()
 
     def _get_threads_list(self, ticket_id):
         """
@@ -78,113 +86,349 @@ class ZohoDeskManager:
             return None
         return res["data"]
 
-    def _get_ticket_details(self, ticket_id):
+    def _send_desk_req(self, endpoint):
         """
-        Fetches all threads for a ticket, including full content and attachments for each thread.
+        Sends a rate-limited GET to Zoho Desk. Safe to call from the sync worker threads.
 
         Args:
-            ticket_id (str): The ID of the ticket.
+            endpoint (str): Desk API endpoint.
 
         Returns:
-            list: List of thread detail dictionaries for the ticket.
+            dict: {"success": True, "data": ...} on success, or {"success": False, "message": str} on failure.
+                An empty listing (204) is returned as {"success": True, "data": []}.
+        """
+        self.rate_limiter.acquire()
+        res = self.conn_manager.send_zoho_desk_req(zoho_endpoint=endpoint, method="GET")
+        if not res["success"] and res["message"] == "No content found":
+            return {"success": True, "data": []}
+        return res
 
-        Example:
-            details = self._get_ticket_details(ticket_id="123456789")
+    @staticmethod
+    def _zoho_time(value):
+        return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def _list_tickets(self, from_record, limit, since=None, until=None):
+        """
+        Fetches one page of ticket metadata, either every ticket or only those modified within [since, until].
+
+        Args:
+            from_record (int): Offset for pagination.
+            limit (int): Number of tickets per page.
+            since (datetime, optional): Only list tickets modified at or after this time.
+            until (datetime, optional): Upper bound of the modified time range. Required with since.
+
+        Returns:
+            dict: {"success": True, "data": [ticket, ...]} or {"success": False, "message": str}.
+        """
+        if since is None:
+            return self._send_desk_req(f"tickets?limit={limit}&from={from_record}")
+        return self._send_desk_req(
+            f"tickets/search?modifiedTimeRange={self._zoho_time(since)},{self._zoho_time(until)}"
+            f"&sortBy=modifiedTime&limit={limit}&from={from_record}"
+        )
+
+    def _fetch_threads(self, executor, ticket_ids):
+        """
+        Fetches the full threads of several tickets concurrently: first every thread list, then every thread.
+
+        Args:
+            executor (ThreadPoolExecutor): Pool the requests run on.
+            ticket_ids (list): Ticket IDs to fetch.
+
+        Returns:
+            dict: {ticket_id: [thread, ...]} for tickets fetched completely. Tickets with a failed request are
+                left out, so they are retried on the next sync.
+        """
+        thread_lists = dict(zip(
+            ticket_ids,
+            executor.map(lambda ticket_id: self._send_desk_req(f"tickets/{ticket_id}/threads"), ticket_ids),
+        ))
+        pairs = []
+        for ticket_id, res in thread_lists.items():
+            if not res["success"]:
+                print(f"❌ Failed to list threads of ticket {ticket_id}: {res['message']}")
+                continue
+            pairs.extend((ticket_id, t["id"]) for t in res["data"] if t.get("id"))
+
+        details = executor.map(
+            lambda pair: self._send_desk_req(f"tickets/{pair[0]}/threads/{pair[1]}"),
+            pairs,
+        )
+        threads = {ticket_id: [] for ticket_id, res in thread_lists.items() if res["success"]}
+        for (ticket_id, thread_id), res in zip(pairs, details):
+            if ticket_id not in threads:
+                continue
+            if not res["success"] or not res["data"]:
+                print(f"❌ Failed to fetch thread {thread_id}: {res.get('message')}")
+                threads.pop(ticket_id)
+                continue
+            threads[ticket_id].append(res["data"])
+        return threads
+
+    def _sync_page(self, executor, tickets, seen):
+        """
+        Fetches the changed tickets of a listing page and upserts them in one statement.
+
+        Returns:
+            dict: {"updated": int, "skipped": int, "failed": int}
         """
-        threads = self._get_threads_list(ticket_id)
-        full_threads = []
-        for t in threads:
-            thread_id = t.get("id")
-            if not thread_id:
+        modified = {}
+        for ticket in tickets:
+            ticket_id = str(ticket.get("id") or "")
+            if not ticket_id or ticket_id in seen:
                 continue
-            full_thread = self._get_thread_details(ticket_id, thread_id)
-            if full_thread:
-                full_threads.append(full_thread)
-        return full_threads
+            seen.add(ticket_id)
+            modified[ticket_id] = parse_datetime(ticket["modifiedTime"]) if ticket.get("modifiedTime") else None
+
+        stored = dict(
+            ZohoDeskTicketModel.objects.filter(ticket_id__in=list(modified)).values_list("ticket_id", "modified_time")
+        )
+        changed = [
+            ticket_id for ticket_id, modified_time in modified.items()
+            if not (modified_time and stored.get(ticket_id) and stored[ticket_id] >= modified_time)
+        ]
+        threads = self._fetch_threads(executor, changed)
 
-    def get_all_tickets(self, limit=100, from_record=0):
+        objs = [
+            ZohoDeskTicketModel(
+                ticket_id=ticket_id,
+                modified_time=modified[ticket_id],
+                details=details,
+                details_hash=ZohoDeskTicketModel.hash_details(details),
+            )
+            for ticket_id, details in threads.items() if details
+        ]
+        if objs:
+            ZohoDeskTicketModel.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=["ticket_id"],
+                update_fields=["modified_time", "details", "details_hash", "updated_at"],
+            )
+        return {
+            "updated": len(objs),
+            "skipped": len(modified) - len(changed),
+            "failed": len(changed) - len(threads),
+        }
+
+    def sync_tickets(self, full=False, limit=ZOHO_DESK_SYNC_PAGE_SIZE):
         """
-        Fetches all tickets (paginated) and saves their full thread details to the database.
+        Syncs Zoho Desk tickets and their full threads into ZohoDeskTicket.
+
+        Incremental syncs only list tickets modified since the cursor stored by the last complete sync, and
+        tickets whose modifiedTime matches the stored copy are never re-fetched. Threads are fetched on
+        ZOHO_DESK_SYNC_CONCURRENCY workers capped at ZOHO_DESK_REQUESTS_PER_MINUTE, and each page is written
+        with a single upsert. The cursor only advances when every ticket was fetched, so failures are retried
+        on the next run.
 
         Args:
-            limit (int): Number of tickets to fetch per page. Default is 2.
-            from_record (int): Offset for pagination. Default is 0.
+            full (bool): Walk every ticket instead of only the ones modified since the cursor. Default is False.
+            limit (int): Number of tickets to fetch per page. Default is ZOHO_DESK_SYNC_PAGE_SIZE.
 
         Returns:
-            set: Set of processed ticket IDs.
+            dict: {"updated": int, "skipped": int, "failed": int, "cursor": datetime or None}
 
         Example:
-            ticket_ids = self.get_all_tickets(limit=10)
-        """
-        ticket_ids = set()
-        round = 0
-        while True:
-            round += 1
-            print(f"Fetching tickets, round {round} ...")
-            tickets = self._get_paginated_tickets(limit=limit, from_record=from_record)
-            if not tickets:
-                break
-            for idx, ticket in enumerate(tickets, start=1):
-                print(f"Processing ticket {idx}/{len(tickets)} in this round ...")
-                ticket_id = str(ticket.get("id"))
-                if not ticket_id or ticket_id in ticket_ids:
-                    continue
-                ticket_ids.add(ticket_id)
-                ticket_details = self._get_ticket_details(ticket_id=ticket_id)
-                if ticket_details:
-                    cur_ticket = ZohoDeskTicketModel.objects.filter(ticket_id=ticket_id).first()
-                    if not cur_ticket:
-                        cur_ticket = ZohoDeskTicketModel(ticket_id=ticket_id)
-                    cur_ticket.details = ticket_details
-                    cur_ticket.save()
-            from_record += limit
-            if len(tickets) < limit:
-                break
-        return ticket_ids
+            result = self.sync_tickets()
+            result = self.sync_tickets(full=True)
+        """
+        state, _ = ZohoDeskSyncStateModel.objects.get_or_create(name=ZOHO_DESK_TICKETS_SYNC)
+        started_at = timezone.now()
+        since = None
+        if not full and state.cursor:
+            since = state.cursor - timedelta(seconds=ZOHO_DESK_SYNC_CURSOR_OVERLAP_SECONDS)
+
+        totals = {"updated": 0, "skipped": 0, "failed": 0}
+        complete = True
+        seen = set()
+        from_record = 0
+        with ThreadPoolExecutor(
+            max_workers=settings.ZOHO_DESK_SYNC_CONCURRENCY,
+            thread_name_prefix="zoho-desk-sync",
+        ) as executor:
+            while True:
+                res = self._list_tickets(from_record, limit, since=since, until=started_at)
+                if not res["success"]:
+                    print(f"❌ {res['message']}")
+                    complete = False
+                    break
+                tickets = res["data"]
+                if not tickets:
+                    break
+                page = self._sync_page(executor, tickets, seen)
+                for key, value in page.items():
+                    totals[key] += value
+                print(
+                    f"Synced tickets {from_record + 1}-{from_record + len(tickets)}: "
+                    f"{page['updated']} updated, {page['skipped']} unchanged, {page['failed']} failed"
+                )
+                from_record += limit
+                if len(tickets) < limit:
+                    break
+
+        if complete and not totals["failed"]:
+            state.cursor = started_at
+            state.save()
+        totals["cursor"] = state.cursor
+        return totals
     
+    def _ticket_transcript(self, details):
+        """
+        Condenses stored thread details into the compact transcript sent to the model: who wrote what and when,
+        with the HTML stripped and attachment/metadata fields dropped.
+        """
+        threads = [
+            {
+                "direction": thread.get("direction"),
+                "author": (thread.get("author") or {}).get("name"),
+                "created_time": thread.get("createdTime"),
+                "content": strip_tags(thread.get("content") or thread.get("summary") or "").strip(),
+            }
+            for thread in sorted(details or [], key=lambda t: t.get("createdTime") or "")
+        ]
+        transcript = json.dumps(threads, separators=(",", ":"), ensure_ascii=False)
+        return transcript[:ZOHO_TICKET_SUMMARY_MAX_INPUT_CHARS]
+
+    def _summarize_ticket(self, ticket_id, details):
+        """
+        Uses OpenAI to generate a complete explanation/summary of a Zoho Desk ticket's issue and how it was handled,
+        and embeds it for retrieval. Runs on the summary worker threads, so it only calls the APIs and leaves every
+        database write to the caller.
+
+        Args:
+            ticket_id (str): The ID of the Zoho Desk ticket.
+            details (list): The stored thread details of the ticket.
+
+        Returns:
+            dict or None: {"summary": str, "chunks": [{"text": str, "vector": list}, ...]}, or None if the
+                completion or any embedding failed.
+        """
+        open_ai_manager = OpenAIManager(model="gpt-4o", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=self.cur_users)
+        messages = [
+            {"role": "system", "content": ZOHO_TICKET_SUMMARY_PROMPT},
+            {"role": "user", "content": self._ticket_transcript(details)},
+        ]
+        self.summary_rate_limiter.acquire()
+        try:
+            summary = open_ai_manager.generate_response(messages=messages, prompt_cache_key=ZOHO_TICKET_SUMMARY_CACHE_KEY)
+            chunks = open_ai_manager.build_materials_for_rag(text=summary, max_chunk_size=2000) if summary else []
+        except Exception as e:
+            print(f"❌ Failed to summarize ticket {ticket_id}: {e}")
+            return None
+        if not chunks or not all(chunk["vector"] for chunk in chunks):
+            print(f"❌ Failed to summarize ticket {ticket_id}: missing summary or embeddings")
+            return None
+        return {"summary": summary, "chunks": chunks}
+
+    def _save_ticket_summaries(self, results):
+        """
+        Replaces the knowledge base entries of summarized tickets with bulk writes in one transaction, and records
+        the summarized content hash of each ticket.
+
+        Args:
+            results (list): (ticket, content_hash, {"summary", "chunks"}) tuples.
+        """
+        if not results:
+            return
+        with transaction.atomic():
+            self.kb_ingestor.save_documents(
+                [
+                    {"url": f"zoho_ticket_{ticket.ticket_id}", "description": result["summary"], "chunks": result["chunks"]}
+                    for ticket, _, result in results
+                ],
+                replace=True,
+            )
+            for ticket, content_hash, _ in results:
+                ticket.details_hash = content_hash
+                ticket.summarized_hash = content_hash
+            ZohoDeskTicketModel.objects.bulk_update(
+                [ticket for ticket, _, _ in results], ["details_hash", "summarized_hash"]
+            )
+
+    def _summarize_tickets(self, executor, tickets):
+        """
+        Summarizes a batch of tickets on the worker pool and saves the successful ones.
+
+        Returns:
+            int: Number of tickets saved.
+        """
+        hashes = [ticket.details_hash or ZohoDeskTicketModel.hash_details(ticket.details) for ticket in tickets]
+        summaries = executor.map(lambda ticket: self._summarize_ticket(ticket.ticket_id, ticket.details), tickets)
+        results = [
+            (ticket, content_hash, result)
+            for ticket, content_hash, result in zip(tickets, hashes, summaries) if result
+        ]
+        self._save_ticket_summaries(results)
+        return len(results)
+
     def _add_zoho_ticket_info_to_kb(self, ticket_id):
         """
-        Uses OpenAI to generate a complete explanation/summary of a Zoho Desk ticket's issue and how it was handled.
-        The summary is intended for future retrieval and similarity search, so similar issues can be quickly found and referenced for new customer requests.
+        Summarizes a single stored Zoho Desk ticket into the knowledge base, whether or not it changed.
 
         Args:
             ticket_id (str): The ID of the Zoho Desk ticket.
 
+        Returns:
+            str or None: The summary, or None if the ticket is unknown or summarizing failed.
+
         Example:
-            self._add_zoho_tickets_to_db(ticket_id="123456789")
+            self._add_zoho_ticket_info_to_kb(ticket_id="123456789")
         """
-        system_prompt = (
-            "You are an expert customer support analyst. You will receive a Zoho Desk ticket's full details. "
-            "Please generate a complete, clear, and concise explanation/summary of what the customer's issue was and how the issue was handled or resolved. "
-            "This summary will be stored for future use, so that if a customer comes with a similar issue, we can search for the most relevant past tickets and use the most similar one to help reply. "
-            "Focus on clarity, completeness, and relevance for future retrieval."
-        )
-        self.open_ai_manager.add_message(role="system", text=system_prompt)
-        response = self.open_ai_manager.generate_response()
-        if response:
-            CustomerSupportKnowledgeBaseModel.objects.filter(url=f"zoho_ticket_{ticket_id}").delete()
-            cur_kb = CustomerSupportKnowledgeBaseModel()
-            cur_kb.url = f"zoho_ticket_{ticket_id}"
-            cur_kb.description = response
-            cur_kb.save()
-            chunks = self.open_ai_manager.build_materials_for_rag(text=response, max_chunk_size=2000)
-            for index, chunk in enumerate(chunks):
-                print(f"Saving chunk {index+1}/{len(chunks)} to database...")
-                cur_text = chunk['text']
-                cur_embedding = chunk['vector']
-                cur_kb_chunk = CustomerSupportKnowledgeBaseChunkModel()
-                cur_kb_chunk.kb = cur_kb
-                cur_kb_chunk.chunk_text = cur_text
-                cur_kb_chunk.embedding = cur_embedding
-                cur_kb_chunk.save()
-        return response
+        ticket = ZohoDeskTicketModel.objects.filter(ticket_id=ticket_id).first()
+        if not ticket or not ticket.details:
+            return None
+        result = self._summarize_ticket(ticket.ticket_id, ticket.details)
+        if not result:
+            return None
+        self._save_ticket_summaries([(ticket, ZohoDeskTicketModel.hash_details(ticket.details), result)])
+        return result["summary"]
     
-    def add_zoho_tickets_info_to_kb(self):
-        """ Fetches all Zoho Desk tickets from the database and processes each to generate and store summaries in the knowledge base.
+    def add_zoho_tickets_info_to_kb(self, force=False, batch_size=ZOHO_TICKET_SUMMARY_BATCH_SIZE):
+        """
+        Summarizes stored Zoho Desk tickets into the knowledge base.
+
+        Only tickets whose content hash differs from the one last summarized are processed, unless force is set.
+        Summaries run on ZOHO_DESK_SUMMARY_CONCURRENCY workers capped at ZOHO_DESK_SUMMARY_TICKETS_PER_MINUTE,
+        and each batch of results is written with bulk inserts.
+
+        Args:
+            force (bool): Re-summarize every ticket, changed or not. Default is False.
+            batch_size (int): Tickets loaded and written per batch. Default is ZOHO_TICKET_SUMMARY_BATCH_SIZE.
+
+        Returns:
+            dict: {"summarized": int, "unchanged": int, "failed": int}
+
         Example:
             self.add_zoho_tickets_info_to_kb()
         """
-        ticket_ids = ZohoDeskTicketModel.objects.all().order_by('created_at').values_list('ticket_id', flat=True)
-        for idx, ticket_id in enumerate(ticket_ids):
-            print(f"Processing ticket {idx+1}/{len(ticket_ids)} with ID {ticket_id} ...")
-            self._add_zoho_ticket_info_to_kb(ticket_id=ticket_id)
+        tickets = ZohoDeskTicketModel.objects.filter(details__isnull=False)
+        total = tickets.count()
+        if not force:
+            tickets = tickets.filter(
+                Q(summarized_hash__isnull=True) | Q(details_hash__isnull=True) | ~Q(summarized_hash=F("details_hash"))
+            )
+        ids = list(tickets.order_by("created_at").values_list("id", flat=True))
+
+        summarized = unchanged = 0
+        with ThreadPoolExecutor(
+            max_workers=settings.ZOHO_DESK_SUMMARY_CONCURRENCY,
+            thread_name_prefix="zoho-desk-summary",
+        ) as executor:
+            for start in range(0, len(ids), batch_size):
+                batch = list(
+                    ZohoDeskTicketModel.objects.filter(id__in=ids[start:start + batch_size])
+                    .only("id", "ticket_id", "details", "details_hash", "summarized_hash")
+                    .order_by("created_at")
+                )
+                changed = []
+                for ticket in batch:
+                    content_hash = ticket.details_hash or ZohoDeskTicketModel.hash_details(ticket.details)
+                    if not force and content_hash == ticket.summarized_hash:
+                        unchanged += 1
+                        continue
+                    changed.append(ticket)
+                summarized += self._summarize_tickets(executor, changed)
+                print(f"Summarized {summarized}/{len(ids)} changed tickets ...")
+
+        unchanged += total - len(ids)
+        return {"summarized": summarized, "unchanged": unchanged, "failed": total - unchanged - summarized}
@@ -2,6 +2,8 @@ from customer_support.views import knowledge_base, phone_agent, twilio
 
 KnowledgeBaseViewSet = knowledge_base.KnowledgeBaseViewSet.as_view()
 
+KnowledgeBaseIngestionJobViewSet = knowledge_base.KnowledgeBaseIngestionJobViewSet.as_view()
+
 CustomerSupportViewSet = phone_agent.CustomerSupportViewSet.as_view()
 
 TwilioVoiceWebhookViewSet = twilio.TwilioVoiceWebhookViewSet.as_view()
\ No newline at end of file
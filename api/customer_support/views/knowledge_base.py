@@ -1,48 +1,73 @@
 from django.conf import settings
 from rest_framework import views, permissions, response, status
 
-from core.models import UserModel
-from customer_support.models import CustomerSupportKnowledgeBaseModel, CustomerSupportKnowledgeBaseChunkModel
-from customer_support.serializers import KnowledgeBaseSerializer
-from ai.utils.open_ai_manager import OpenAIManager
+from customer_support.models import KnowledgeBaseIngestionJobModel
+from customer_support.serializers import KnowledgeBaseSerializer, KnowledgeBaseIngestionJobSerializer
+from customer_support.tasks import ingest_knowledge_base_document_task, ingest_knowledge_base_document
 
 class KnowledgeBaseViewSet(views.APIView):
     permission_classes = [permissions.AllowAny]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        cur_user = UserModel.objects.filter(email="mohammad@teetimegolfpass.com").first()
-        self.open_ai_manager = OpenAIManager(model="gpt-4o", api_key=settings.OPEN_AI_SECRET_KEY, cur_users=[cur_user])
-
-    def _rag_progress_callback(self, chunk=None, index=None, total=None, err_msg=None, **kwargs):
-        if err_msg:
-            print(f"Error on chunk {index}/{total}: {err_msg}")
+    def _post_documents(self, documents):
+        """
+        Queues an ingestion job per document of a batch ({"documents": [{"url", "description"}, ...]}).
+        """
+        jobs, errors = [], []
+        for index, document in enumerate(documents):
+            url = (document or {}).get("url")
+            description = (document or {}).get("description")
+            if not url or not description or description.strip() in ("", "null"):
+                errors.append({"index": index, "url": url, "message": "URL and description are required."})
+                continue
+            jobs.append(KnowledgeBaseIngestionJobModel(url=url, description=description))
+        jobs = KnowledgeBaseIngestionJobModel.objects.bulk_create(jobs)
+        if settings.KB_INGESTION_ASYNC:
+            for job in jobs:
+                ingest_knowledge_base_document_task.delay(job.id)
         else:
-            print(f"Processing chunk {index}/{total}...")
-    
+            jobs = [ingest_knowledge_base_document(job.id) for job in jobs]
+        return response.Response(
+            status=(status.HTTP_202_ACCEPTED if settings.KB_INGESTION_ASYNC else status.HTTP_200_OK) if jobs else status.HTTP_400_BAD_REQUEST,
+            data={
+                "success": bool(jobs),
+                "jobs": KnowledgeBaseIngestionJobSerializer(jobs, many=True).data,
+                "errors": errors,
+            },
+        )
+
     def post(self, request, format=None):
         try:
+            documents = request.data.get("documents")
+            if isinstance(documents, list):
+                return self._post_documents(documents)
             description = request.data.get("description")
             url = request.data.get("url")
             if url:
                 if not description or description.strip() == "" or description.strip() == "null":
                     return response.Response(status=status.HTTP_400_BAD_REQUEST, data={"message": "Description is required."})
-                cur_knoledge_base = CustomerSupportKnowledgeBaseModel()
-                cur_knoledge_base.url = url
-                cur_knoledge_base.description = description
-                cur_knoledge_base.save()
-                chunks = self.open_ai_manager.build_materials_for_rag(text=description, progress_callback=self._rag_progress_callback)
-                for index, chunk in enumerate(chunks):
-                    print(f"Saving chunk {index+1}/{len(chunks)} to database...")
-                    cur_text = chunk['text']
-                    cur_embedding = chunk['vector']
-                    cur_knoledge_base_chunk = CustomerSupportKnowledgeBaseChunkModel()
-                    cur_knoledge_base_chunk.kb = cur_knoledge_base
-                    cur_knoledge_base_chunk.chunk_text = cur_text
-                    cur_knoledge_base_chunk.embedding = cur_embedding
-                    cur_knoledge_base_chunk.save()
-                return response.Response(status=status.HTTP_200_OK, data={"success": True})
+                job = KnowledgeBaseIngestionJobModel.objects.create(url=url, description=description)
+                if settings.KB_INGESTION_ASYNC:
+                    ingest_knowledge_base_document_task.delay(job.id)
+                    return response.Response(
+                        status=status.HTTP_202_ACCEPTED,
+                        data={"success": True, **KnowledgeBaseIngestionJobSerializer(job).data},
+                    )
+                job = ingest_knowledge_base_document(job.id)
+                succeeded = job.status == KnowledgeBaseIngestionJobModel.STATUS_SUCCEEDED
+                return response.Response(
+                    status=status.HTTP_200_OK if succeeded else status.HTTP_400_BAD_REQUEST,
+                    data={"success": succeeded, **KnowledgeBaseIngestionJobSerializer(job).data},
+                )
             return response.Response(status=status.HTTP_400_BAD_REQUEST, data={"message": "URL is required."})
         except Exception as e:
             print(f"❌ Error occurred: {str(e)}")
-            return response.Response(status=status.HTTP_400_BAD_REQUEST, data={"message": f"{str(e)}"})
\ No newline at end of file
+            return response.Response(status=status.HTTP_400_BAD_REQUEST, data={"message": f"{str(e)}"})
+
+class KnowledgeBaseIngestionJobViewSet(views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, job_id, format=None):
+        job = KnowledgeBaseIngestionJobModel.objects.filter(uuid=job_id).first()
+        if not job:
+            return response.Response(status=status.HTTP_404_NOT_FOUND, data={"message": "Job not found."})
+        return response.Response(status=status.HTTP_200_OK, data=KnowledgeBaseIngestionJobSerializer(job).data)
@@ -1,6 +1,7 @@
 from rest_framework import views, permissions, response, status
 from rest_framework.parsers import JSONParser, FormParser
 
+from customer_support.constants import AGENT_ERROR_MESSAGE
 from customer_support.utils.teetime_agent_manager import TeeTimeSupportAgent
 
 class CustomerSupportViewSet(views.APIView):
@@ -17,20 +18,11 @@ class CustomerSupportViewSet(views.APIView):
                     data={"bot_message": "Missing session_id."},
                 )
             teetime_agent = TeeTimeSupportAgent(session_id=session_id)
-            if user_message:
-                teetime_agent._append_to_history({"role": "user", "content": user_message})
-            result = teetime_agent.run_once()
-            final = result.get("response", {})
-            bot_message = final.get("message_to_user") or "Sorry—something went wrong."
+            bot_message = teetime_agent.respond(user_message)
             return response.Response(status=status.HTTP_200_OK, data={"bot_message": bot_message})
         except Exception as e:
             print(e)
             return response.Response(
                 status=status.HTTP_200_OK,
-                data={
-                    "bot_message": (
-                        "I’m sorry, I couldn’t process that just now. "
-                        "Would you like me to try a different phrasing, or connect you with a human agent (Mon–Fri, 9am–5pm ET)?"
-                    )
-                },
+                data={"bot_message": AGENT_ERROR_MESSAGE},
             )
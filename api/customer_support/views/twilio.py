@@ -11,7 +11,8 @@ import os
 import random
 
 from customer_support.utils.teetime_agent_manager import TeeTimeSupportAgent
-from customer_support.tasks import process_ai_response_task, save_chat_summary_to_db_task
+from customer_support.utils.voice_stream_manager import VoiceStreamManager
+from customer_support.tasks import process_ai_response_task, stream_ai_response_task, save_chat_summary_to_db_task
 from customer_support.constants import LIST_OF_HOLDOING_MESSAGES, LIST_OF_GREETING_MESSAGES
 
 API_URL = f"{settings.CLIENT_URL}/api/customer-support/"
@@ -91,6 +92,66 @@ class TwilioVoiceWebhookViewSet(views.APIView):
         vr.redirect(VOICE_WEBHOOK_URL, method="POST")
         return self._twiml(vr)
 
+    def _play_ai_response(self, vr, ai_response):
+        """
+        Appends an AI reply to the VoiceResponse, preferring the synthesized audio when available.
+
+        Args:
+            vr: The Twilio VoiceResponse object.
+            ai_response (dict or str): {"text": ..., "audio_url": ...} or the plain reply text.
+        """
+        audio_url = ai_response.get("audio_url") if isinstance(ai_response, dict) else None
+        text = ai_response.get("text") if isinstance(ai_response, dict) else ai_response
+        if audio_url:
+            vr.play(audio_url)
+        else:
+            vr.say(text, voice="Polly.Joanna", language="en-US", ssml=True)
+
+    def _play_holding_message(self, vr):
+        """
+        Plays a holding message and redirects back to the webhook to check for the AI reply again.
+
+        Args:
+            vr: The Twilio VoiceResponse object.
+
+        Returns:
+            HttpResponse: XML response for Twilio.
+        """
+        holding_message = random.choice(LIST_OF_HOLDOING_MESSAGES)
+        random_idx = random.randint(1, len(LIST_OF_HOLDOING_MESSAGES))
+        google_holding_path = f"/websocket_tmp/audio_messages/holding_messages/holding_{random_idx}.mp3"
+        google_holding_url = f"{settings.CLIENT_URL}{google_holding_path}"
+        if os.path.exists(google_holding_path):
+            vr.play(google_holding_url)
+        else:
+            vr.say(holding_message, voice="Polly.Joanna", language="en-US")
+        vr.pause(length=0.4)
+        vr.redirect(VOICE_WEBHOOK_URL, method="POST")
+        return self._twiml(vr)
+
+    def _play_streamed_segments(self, vr, call_sid):
+        """
+        Waits for the next streamed reply segments and plays every one that is ready.
+        Redirects back to the webhook for the rest of the reply, or starts listening once the reply is complete.
+
+        Args:
+            vr: The Twilio VoiceResponse object.
+            call_sid (str): The unique call/session ID.
+
+        Returns:
+            HttpResponse: XML response for Twilio.
+        """
+        segments = VoiceStreamManager(call_sid).wait_for_segments(timeout=settings.TWILIO_SEGMENT_WAIT_SECONDS)
+        if not segments:
+            return self._play_holding_message(vr)
+        for segment in segments:
+            if segment.get("done"):
+                cache.delete(f"{call_sid}_ai_streaming")
+                return self._make_twilio_ready_for_listening(vr, call_sid)
+            self._play_ai_response(vr, segment)
+        vr.redirect(VOICE_WEBHOOK_URL, method="POST")
+        return self._twiml(vr)
+
     def post(self, request):
         """
         Handles incoming POST requests from Twilio, manages call flow, and responds with TwiML.
@@ -114,8 +175,7 @@ class TwilioVoiceWebhookViewSet(views.APIView):
             save_chat_summary_to_db_task.delay(call_sid)
             return HttpResponse("Call completed", status=200)
 
-        chat_history = cache.get(f"chat_history_{call_sid}", [])
-        is_first_interaction = not user_message and not chat_history
+        is_first_interaction = not user_message and teetime_agent.chat_history.is_empty()
 
         if is_first_interaction or (user_message and user_message.strip() == "__CALL_STARTED__"):
             greeting_message = random.choice(LIST_OF_GREETING_MESSAGES)
@@ -129,28 +189,22 @@ class TwilioVoiceWebhookViewSet(views.APIView):
                 vr.say(greeting_message, voice="Polly.Joanna", language="en-US")
             return self._make_twilio_ready_for_listening(vr, call_sid)
 
+        if user_message and settings.TWILIO_STREAMING_RESPONSES:
+            cache.set(f"{call_sid}_user_message", user_message, timeout=3600)
+            VoiceStreamManager(call_sid).reset()
+            cache.set(f"{call_sid}_ai_streaming", True, timeout=3600)
+            stream_ai_response_task.delay(call_sid, user_message)
+            return self._play_streamed_segments(vr, call_sid)
+        if not user_message and cache.get(f"{call_sid}_ai_streaming"):
+            return self._play_streamed_segments(vr, call_sid)
+
         if user_message:
             cache.set(f"{call_sid}_user_message", user_message, timeout=3600)
             process_ai_response_task.delay(call_sid, user_message)
         ai_response = cache.get(f"{call_sid}_ai_response", None)
         if ai_response:
-            audio_url = ai_response.get("audio_url") if isinstance(ai_response, dict) else None
-            text = ai_response.get("text") if isinstance(ai_response, dict) else ai_response
-            if audio_url:
-                vr.play(audio_url)
-            else:
-                vr.say(text, voice="Polly.Joanna", language="en-US", ssml=True)
+            self._play_ai_response(vr, ai_response)
             cache.delete(f"{call_sid}_ai_response")
             return self._make_twilio_ready_for_listening(vr, call_sid)
         else:
-            holding_message = random.choice(LIST_OF_HOLDOING_MESSAGES)
-            random_idx = random.randint(1, len(LIST_OF_HOLDOING_MESSAGES))
-            google_holding_path = f"/websocket_tmp/audio_messages/holding_messages/holding_{random_idx}.mp3"
-            google_holding_url = f"{settings.CLIENT_URL}{google_holding_path}"
-            if os.path.exists(google_holding_path):
-                vr.play(google_holding_url)
-            else:
-                vr.say(holding_message, voice="Polly.Joanna", language="en-US")
-            vr.pause(length=0.4)
-            vr.redirect(VOICE_WEBHOOK_URL, method="POST")
-            return self._twiml(vr)
\ No newline at end of file
+            return self._play_holding_message(vr)
\ No newline at end of file
@@ -1,10 +1,13 @@
 from fabric import task
 
 from config.utils.role_based import build_group_list
+from config.utils.http_client import HttpClient
 from core.utils.test import test_core_utils
 from ai.utils.test import test_ai_manager
 from customer_support.utils.test import test_customer_support_utils
-from customer_support.utils.knowledge_base import add_zoho_desk_tickets_to_db, add_zoho_desk_tickets_to_kb
+from customer_support.utils.knowledge_base import add_zoho_desk_tickets_to_db, add_zoho_desk_tickets_to_kb, backfill_kb_ann_embeddings
+from customer_support.utils.benchmark import benchmark_kb_retrieval, benchmark_prod_db_lookup
+from customer_support.utils.embedding_cache import QueryEmbeddingCache
 from customer_support.utils.teetime_agent_manager import TeeTimeSupportAgent
 
 @task
@@ -13,14 +16,30 @@ def buildgrouplist(ctx):
     build_group_list()
 
 @task
-def addzohodesktodb(ctx):
-    """Add Zoho Desk tickets to the database."""
-    add_zoho_desk_tickets_to_db()
+def addzohodesktodb(ctx, full=False):
+    """Sync Zoho Desk tickets to the database (only tickets changed since the last sync unless --full)."""
+    print(add_zoho_desk_tickets_to_db(full=full))
 
 @task
-def addzohodesktokb(ctx):
-    """Add Zoho Desk tickets to the knowledge base."""
-    add_zoho_desk_tickets_to_kb()
+def addzohodesktokb(ctx, force=False):
+    """Summarize changed Zoho Desk tickets into the knowledge base (every ticket with --force)."""
+    print(add_zoho_desk_tickets_to_kb(force=force))
+
+@task
+def backfillkbannembeddings(ctx):
+    """Fill the reduced ANN embeddings of existing knowledge base chunks."""
+    backfill_kb_ann_embeddings()
+
+@task
+def kbembeddingcachestats(ctx):
+    """Print hit/miss counters of the knowledge base query-embedding cache."""
+    print(QueryEmbeddingCache.stats())
+
+@task
+def httpupstreamstats(ctx):
+    """Print request/error/retry counters and average latency per third-party API host."""
+    for upstream, counters in HttpClient.stats().items():
+        print(f"{upstream}: {counters}")
 
 @task
 def buildpredfinedmessages(ctx):
@@ -42,6 +61,14 @@ def testcoreutils(ctx):
 @task
 def testcustomersupportutils(ctx):
     test_customer_support_utils()
+
+@task
+def benchmarkkbretrieval(ctx):
+    benchmark_kb_retrieval()
+
+@task
+def benchmarkproddblookup(ctx):
+    benchmark_prod_db_lookup()
 # --------------------------------------------
 # Testing Tasks Ending
 # --------------------------------------------
\ No newline at end of file
@@ -1,3 +1,5 @@
-from websocket.consumers import test_socket
+from websocket.consumers import test_socket, kb_ingestion
 
-TestSocketConsumer = test_socket.TestSocketConsumer.as_asgi()
\ No newline at end of file
+TestSocketConsumer = test_socket.TestSocketConsumer.as_asgi()
+
+KnowledgeBaseIngestionConsumer = kb_ingestion.KnowledgeBaseIngestionConsumer.as_asgi()
\ No newline at end of file
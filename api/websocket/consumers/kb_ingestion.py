@@ -0,0 +1,34 @@
+from asgiref.sync import sync_to_async
+
+from websocket.consumers.base import BaseConsumer
+from customer_support.models import KnowledgeBaseIngestionJobModel
+from customer_support.serializers import KnowledgeBaseIngestionJobSerializer
+from customer_support.utils.kb_ingestion import ingestion_job_group
+
+class KnowledgeBaseIngestionConsumer(BaseConsumer):
+    """
+    Streams the progress of a knowledge base ingestion job: the current state on connect, then every update
+    published by the ingestion worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.job_id = ""
+
+    async def connect(self):
+        self.job_id = self.scope["url_route"]["kwargs"].get("job_id")
+        await self.channel_layer.group_add(ingestion_job_group(self.job_id), self.channel_name)
+        await super().connect()
+        job = await sync_to_async(
+            lambda: KnowledgeBaseIngestionJobModel.objects.filter(uuid=self.job_id).first()
+        )()
+        if not job:
+            return await self._handle_error("Job not found.")
+        await self._send_json(KnowledgeBaseIngestionJobSerializer(job).data)
+
+    async def disconnect(self, close_code):
+        if self.job_id:
+            await self.channel_layer.group_discard(ingestion_job_group(self.job_id), self.channel_name)
+
+    async def ingestion_progress(self, event):
+        await self._send_json({k: v for k, v in event.items() if k != "type"})
@@ -4,4 +4,5 @@ from . import consumers
 
 URL_PATHS = [
     path("wss/test-socket/<room_id>/", consumers.TestSocketConsumer),
+    path("wss/knowledge-base-jobs/<uuid:job_id>/", consumers.KnowledgeBaseIngestionConsumer),
 ]
@@ -0,0 +1,96 @@
+"""
+Compares the tokens embedded per page with the former whole-body text extraction and with the main-content
+extraction of app.extraction.
+
+Usage (from the scraper directory):
+    python -m app.benchmark                     # the teetime seed URLs
+    python -m app.benchmark URL [URL ...]
+
+Pages are extracted twice with the same in-memory crawl state and the second pass is reported, which is what a
+recurring crawl sees once boilerplate blocks are known. Tokens are counted with tiktoken's cl100k_base (the
+encoding of the text-embedding-3 models) when it is installed, and estimated from the text length otherwise.
+"""
+import sys
+import requests
+from parsel import Selector
+
+from app.crawl_state import CrawlStateStore
+from app.extraction import BoilerplateFilter, MainContentExtractor
+
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def count_tokens(text):
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 3
+
+def body_text(page_html):
+    """
+    The extraction the spider used before: every text node of <body> outside scripts and styles.
+    """
+    return " ".join(Selector(text=page_html).css("body :not(script):not(style)::text").getall()).strip()
+
+def fetch_pages(urls, timeout=30):
+    pages = {}
+    with requests.Session() as session:
+        for url in urls:
+            try:
+                res = session.get(url, timeout=timeout)
+                res.raise_for_status()
+                pages[url] = res.text
+            except requests.RequestException as e:
+                print(f"❌ Could not fetch {url}: {e}")
+    return pages
+
+def benchmark_extraction(urls, min_pages=3):
+    """
+    Prints the tokens per page before and after main-content extraction and the totals.
+
+    Args:
+        urls (list): Pages to fetch.
+        min_pages (int): BOILERPLATE_MIN_PAGES of the run. Default 3.
+
+    Returns:
+        dict: {"pages": int, "before": int, "after": int} token totals.
+    """
+    pages = fetch_pages(urls)
+    extractor = MainContentExtractor()
+    boilerplate_filter = BoilerplateFilter(CrawlStateStore(None), min_pages=min_pages)
+    blocks = {url: extractor.extract(page_html) for url, page_html in pages.items()}
+    for url, page_blocks in blocks.items():
+        boilerplate_filter.filter(url, page_blocks)
+
+    total_before = total_after = 0
+    print(f"{'before':>8} {'after':>8} {'change':>8}  url")
+    for url, page_html in pages.items():
+        before = count_tokens(body_text(page_html))
+        kept = boilerplate_filter.filter(url, blocks[url])
+        after = count_tokens("\n".join(text for _, text in kept))
+        total_before += before
+        total_after += after
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{before:>8} {after:>8} {change:>7.1f}%  {url}")
+
+    if pages:
+        change = (total_after - total_before) / total_before * 100 if total_before else 0.0
+        print(
+            f"{len(pages)} pages: {total_before} -> {total_after} tokens ({change:.1f}%), "
+            f"{total_before / len(pages):.0f} -> {total_after / len(pages):.0f} tokens per page"
+            + ("" if _ENCODING is not None else " (estimated, tiktoken not installed)")
+        )
+    return {"pages": len(pages), "before": total_before, "after": total_after}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        urls = sys.argv[1:]
+    else:
+        from app.spiders.teetime import TeetimeSpider
+        urls = TeetimeSpider.start_urls
+    benchmark_extraction(urls)
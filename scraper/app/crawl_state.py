@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+
+class CrawlStateStore:
+    """
+    Per-URL crawl state kept in a JSON file between runs.
+
+    Every page ever discovered (from the seeds, the sitemaps or in-domain links) has an entry, which makes the
+    store both the seen-set and the persistent frontier of the incremental crawl. An entry remembers:
+
+    - etag / last_modified: validators of the version last submitted to the knowledge base, sent as
+      If-None-Match / If-Modified-Since so unchanged pages come back as an empty 304.
+    - fingerprint: hash of the text last submitted, so pages re-rendered without a content change are not
+      submitted again.
+    - sitemap_lastmod: the <lastmod> the sitemap last advertised; a new value makes the page due immediately.
+    - blocks: hashes of the page's content blocks, used to spot boilerplate repeated across pages.
+    - last_crawled / next_crawl / interval: the revisit schedule. The interval doubles every time a page is found
+      unchanged and drops back to the minimum when it changes, so the cost of a run follows how much content
+      changed rather than the size of the site.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): JSON file holding the state. Created on the first save.
+        """
+        self.path = path
+        self.pages = {}
+        self._block_pages = {}
+        self.load()
+
+    @staticmethod
+    def fingerprint(text):
+        """
+        Returns the sha256 of a page text with whitespace collapsed, so layout-only changes keep the fingerprint.
+        """
+        normalized = re.sub(r"\s+", " ", text or "").strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.pages = json.load(f).get("pages", {})
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read crawl state {self.path}: {e}")
+            self.pages = {}
+        self._block_pages = {}
+        for url, page in self.pages.items():
+            for digest in page.get("blocks", []):
+                self._block_pages.setdefault(digest, set()).add(url)
+
+    def get(self, url):
+        return self.pages.get(url, {})
+
+    def update(self, url, **fields):
+        """
+        Merges fields into the state of a page. Fields set to None are dropped.
+
+        Example:
+            state.update(url, etag='"abc"', last_modified="Wed, 21 Oct 2026 07:28:00 GMT")
+        """
+        page = self.pages.setdefault(url, {})
+        for key, value in fields.items():
+            if value is None:
+                page.pop(key, None)
+            else:
+                page[key] = value
+
+    def remove(self, url):
+        self.set_blocks(url, [])
+        self.pages.pop(url, None)
+
+    def set_blocks(self, url, hashes):
+        """
+        Replaces the content block hashes recorded for a page.
+        """
+        page = self.pages.get(url, {})
+        for digest in page.get("blocks", []):
+            urls = self._block_pages.get(digest)
+            if urls is not None:
+                urls.discard(url)
+                if not urls:
+                    del self._block_pages[digest]
+        if not hashes:
+            page.pop("blocks", None)
+            return
+        hashes = sorted(set(hashes))
+        self.pages.setdefault(url, page)["blocks"] = hashes
+        for digest in hashes:
+            self._block_pages.setdefault(digest, set()).add(url)
+
+    def block_pages(self, digest):
+        """
+        Returns the URLs of the pages holding a content block.
+        """
+        return self._block_pages.get(digest, set())
+
+    def discover(self, url, sitemap_lastmod=None):
+        """
+        Adds a page to the frontier, or marks a known page due when the sitemap advertises a new <lastmod>.
+
+        Args:
+            url (str): Page URL, without fragment.
+            sitemap_lastmod (str, optional): The page's <lastmod> from a sitemap.
+
+        Returns:
+            bool: True if the page was not known yet.
+        """
+        page = self.pages.get(url)
+        if page is None:
+            self.pages[url] = {"discovered": int(time.time())}
+            if sitemap_lastmod:
+                self.pages[url]["sitemap_lastmod"] = sitemap_lastmod
+            return True
+        if sitemap_lastmod and sitemap_lastmod != page.get("sitemap_lastmod"):
+            # A first <lastmod> for a page found through links says nothing about changes since its last crawl
+            if page.get("sitemap_lastmod"):
+                page["next_crawl"] = 0
+            page["sitemap_lastmod"] = sitemap_lastmod
+        return False
+
+    def is_due(self, url, now=None):
+        """
+        Returns True if the page was never fetched or its next_crawl has passed.
+        """
+        page = self.pages.get(url)
+        if page is None:
+            return True
+        return page.get("next_crawl", 0) <= (now or time.time())
+
+    def due_urls(self, now=None):
+        """
+        Returns the frontier of this run: every known page whose revisit is due, oldest first.
+        """
+        now = now or time.time()
+        due = [url for url in self.pages if self.is_due(url, now)]
+        return sorted(due, key=lambda url: self.pages[url].get("next_crawl", 0))
+
+    def record_fetch(self, url, changed, min_interval, max_interval, now=None):
+        """
+        Schedules the next revisit of a page after it was fetched.
+
+        Args:
+            url (str): Page URL the state is keyed by.
+            changed (bool): Whether the page content changed since the last crawl.
+            min_interval (int): Revisit interval, in seconds, of a page that just changed.
+            max_interval (int): Upper bound of the interval of pages that keep coming back unchanged.
+            now (float, optional): Current time, defaults to time.time().
+        """
+        now = int(now or time.time())
+        page = self.pages.setdefault(url, {"discovered": now})
+        if changed or not page.get("interval"):
+            interval = min_interval
+        else:
+            interval = min(page["interval"] * 2, max_interval)
+        page.update(last_crawled=now, next_crawl=now + interval, interval=interval)
+
+    def conditional_headers(self, url):
+        """
+        Returns the If-None-Match / If-Modified-Since headers for a page, or {} if it was never submitted.
+        """
+        page = self.get(url)
+        headers = {}
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def save(self):
+        """
+        Writes the state atomically, so an interrupted run never leaves a truncated file behind.
+        """
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"pages": self.pages}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
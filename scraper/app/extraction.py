@@ -0,0 +1,237 @@
+import hashlib
+import html
+import re
+import lxml.html
+
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+BLOCK_TAGS = HEADING_TAGS | {
+    "address", "article", "aside", "blockquote", "caption", "dd", "details", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "summary", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+NOISE_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed", "form", "nav",
+    "aside", "button", "input", "select", "textarea", "label", "dialog",
+}
+NOISE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search", "menu", "menubar"}
+# Matched against the dash/underscore separated words of class and id attributes
+NOISE_WORDS = {
+    "nav", "navbar", "navigation", "menu", "breadcrumb", "breadcrumbs", "sidebar", "footer", "cookie", "cookies",
+    "consent", "gdpr", "popup", "modal", "newsletter", "subscribe", "share", "sharing", "social", "comments",
+    "skip", "sr", "reader", "offcanvas", "promo",
+}
+# Words that mark a site header, which is kept only when it holds the page title (e.g. WordPress "entry-header")
+HEADER_WORDS = {"header", "masthead", "topbar"}
+MAIN_CONTENT_XPATH = "//main | //*[@role='main']"
+HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+WORD_SPLIT_RE = re.compile(r"[\s_-]+")
+HAS_WORD_RE = re.compile(r"\w")
+
+
+def normalize_text(text):
+    return " ".join((text or "").split())
+
+def block_hash(text):
+    """
+    Returns a short hash identifying a block of text across pages, ignoring case and whitespace.
+    """
+    return hashlib.sha1(normalize_text(text).lower().encode("utf-8")).hexdigest()[:16]
+
+def blocks_to_html(blocks):
+    """
+    Renders (tag, text) blocks as minimal HTML: headings, paragraphs and lists, which is the structure
+    ChunkPipeline splits chunks on.
+
+    Example:
+        blocks_to_html([("h2", "Pricing"), ("p", "$99 a year"), ("li", "Cancel anytime")])
+        # '<h2>Pricing</h2>\n<p>$99 a year</p>\n<ul>\n<li>Cancel anytime</li>\n</ul>'
+    """
+    parts = []
+    in_list = False
+    for tag, text in blocks:
+        if tag == "li" and not in_list:
+            parts.append("<ul>")
+        elif tag != "li" and in_list:
+            parts.append("</ul>")
+        in_list = tag == "li"
+        parts.append(f"<{tag}>{html.escape(text, quote=False)}</{tag}>")
+    if in_list:
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+class MainContentExtractor:
+    """
+    Extracts the main content of an HTML page as a list of (tag, text) blocks.
+
+    - Scripts, forms, navigation, sidebars, cookie banners, popups and hidden elements are dropped, based on the
+      tag, the ARIA role and the words in class / id attributes.
+    - Site headers and footers are dropped; a header is kept when it holds the page title.
+    - The content root is the page's <main> (or role="main") when it holds a fair share of the page text,
+      otherwise the cleaned <body>.
+    - Headings keep their level, list items stay list items, table rows become "cell | cell" paragraphs and
+      everything else becomes paragraphs.
+    """
+
+    def __init__(self, min_main_share=0.2):
+        """
+        Args:
+            min_main_share (float): Share of the body text <main> must hold to be used as the content root.
+                Guards against themes that put only a hero banner in <main>. Default 0.2.
+        """
+        self.min_main_share = min_main_share
+
+    @staticmethod
+    def _words(el):
+        attrs = f"{el.get('class', '')} {el.get('id', '')}".lower()
+        return set(WORD_SPLIT_RE.split(attrs)) - {""}
+
+    def _is_noise(self, el):
+        tag = el.tag
+        if tag in NOISE_TAGS:
+            return True
+        if el.get("hidden") is not None or el.get("aria-hidden") == "true":
+            return True
+        if HIDDEN_STYLE_RE.search(el.get("style", "")):
+            return True
+        if (el.get("role") or "").lower() in NOISE_ROLES:
+            return True
+        words = self._words(el)
+        if tag == "footer" or words & NOISE_WORDS:
+            # Class names are a weak signal, never drop a wrapper holding the page title or the main content
+            return not el.xpath(".//h1 | .//main | .//*[@role='main']")
+        if tag == "header" or words & HEADER_WORDS:
+            return not el.xpath(".//h1 | .//h2")
+        return False
+
+    def _strip_noise(self, root):
+        noise = [el for el in root.iter() if isinstance(el.tag, str) and el is not root and self._is_noise(el)]
+        for el in noise:
+            # Children of an already dropped element are detached with it
+            if el.getparent() is not None:
+                el.drop_tree()
+        for comment in root.xpath(".//comment()"):
+            comment.drop_tree()
+
+    def _content_root(self, doc):
+        body = doc.find("body")
+        if body is None:
+            body = doc
+        self._strip_noise(body)
+        body_len = len(normalize_text(body.text_content()))
+        for main in doc.xpath(MAIN_CONTENT_XPATH):
+            if body_len and len(normalize_text(main.text_content())) >= self.min_main_share * body_len:
+                return main
+        return body
+
+    @staticmethod
+    def _has_block(el):
+        return any(isinstance(d.tag, str) and d.tag in BLOCK_TAGS for d in el.iterdescendants())
+
+    @staticmethod
+    def _emit(blocks, tag, text):
+        text = normalize_text(text)
+        if text and HAS_WORD_RE.search(text):
+            blocks.append((tag, text))
+
+    def _collect(self, el, blocks):
+        if el.tag == "tr":
+            cells = [normalize_text(cell.text_content()) for cell in el if cell.tag in ("td", "th")]
+            self._emit(blocks, "p", " | ".join(cell for cell in cells if cell))
+            return
+        tag = el.tag if el.tag in HEADING_TAGS or el.tag == "li" else "p"
+        buf = [el.text or ""]
+        for child in el:
+            if isinstance(child.tag, str):
+                if child.tag in BLOCK_TAGS or self._has_block(child):
+                    self._emit(blocks, tag, "".join(buf))
+                    buf = []
+                    self._collect(child, blocks)
+                else:
+                    buf.append(" " if child.tag == "br" else "".join(child.itertext()))
+            buf.append(child.tail or "")
+        self._emit(blocks, tag, "".join(buf))
+
+    def extract(self, page_html):
+        """
+        Args:
+            page_html (str): The page source.
+
+        Returns:
+            list: (tag, text) blocks in document order, tag being h1-h6, p or li.
+
+        Example:
+            blocks = MainContentExtractor().extract(response.text)
+        """
+        try:
+            doc = lxml.html.document_fromstring(page_html)
+        except Exception:
+            return []
+        blocks = []
+        self._collect(self._content_root(doc), blocks)
+        return blocks
+
+
+class BoilerplateFilter:
+    """
+    Drops blocks repeated across pages (calls to action, contact blurbs, disclaimers) that survived the
+    main-content extraction.
+
+    The block hashes of every page are kept in the crawl state. A block seen on at least min_pages pages is kept
+    only on one owner page (the smallest URL holding it), so its text still reaches the knowledge base once.
+    Headings left without content are dropped with it.
+
+    Repetition is only known for pages crawled before, so the first crawl of a site dedupes less than the
+    following ones.
+    """
+
+    def __init__(self, crawl_state, min_pages=3):
+        """
+        Args:
+            crawl_state (CrawlStateStore): Holds the block hashes of every page.
+            min_pages (int): Pages a block must appear on to count as boilerplate. Default 3.
+        """
+        self.crawl_state = crawl_state
+        self.min_pages = min_pages
+
+    def filter(self, url, blocks):
+        """
+        Records the blocks of a page and returns them without boilerplate and in-page repeats.
+
+        Args:
+            url (str): Page URL the crawl state is keyed by.
+            blocks (list): (tag, text) blocks from MainContentExtractor.
+
+        Returns:
+            list: The remaining blocks.
+        """
+        hashes = [block_hash(text) for _, text in blocks]
+        self.crawl_state.set_blocks(url, hashes)
+        kept = []
+        seen = set()
+        for (tag, text), digest in zip(blocks, hashes):
+            if tag in HEADING_TAGS:
+                kept.append((tag, text))
+                continue
+            if digest in seen:
+                continue
+            seen.add(digest)
+            pages = self.crawl_state.block_pages(digest)
+            if len(pages) >= self.min_pages and url != min(pages):
+                continue
+            kept.append((tag, text))
+        return self._drop_empty_sections(kept)
+
+    @staticmethod
+    def _drop_empty_sections(blocks):
+        # Walks backwards so a heading is judged by what follows it once emptier subsections are gone
+        kept = []
+        for tag, text in reversed(blocks):
+            if tag in HEADING_TAGS:
+                following = kept[-1][0] if kept else None
+                # Followed by nothing, or by a heading of the same or a higher level: the section is empty
+                if following is None or (following in HEADING_TAGS and following <= tag):
+                    continue
+            kept.append((tag, text))
+        return kept[::-1]
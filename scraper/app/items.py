@@ -7,6 +7,13 @@ import scrapy
 
 
 class AppItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+    # A page to add to the knowledge base; description is its main content as minimal HTML (see app.extraction)
+    url = scrapy.Field()
+    description = scrapy.Field()
+    # URL the page was requested with (before redirects); the crawl state is keyed by it
+    source_url = scrapy.Field()
+    # Validators of the fetched version, stored once the page was accepted by the API
+    etag = scrapy.Field()
+    last_modified = scrapy.Field()
+    # Hash of the submitted text, compared on the next crawl to skip pages whose content did not change
+    fingerprint = scrapy.Field()
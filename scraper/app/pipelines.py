@@ -6,8 +6,120 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from twisted.internet import defer, threads
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class AppPipeline:
+    """
+    Submits scraped pages to the knowledge base API in batches without blocking the crawl.
+
+    Pages are buffered and posted KB_API_BATCH_SIZE at a time to the knowledge base endpoint from a worker
+    thread, with at most KB_API_CONCURRENCY batches in flight, so the reactor keeps downloading while the API
+    queues ingestion jobs. A page's ETag / Last-Modified and fingerprint are recorded in the spider's crawl state
+    only once its batch was accepted; pages that failed to submit are made due again for the next run.
+    """
+
+    def __init__(self, api_url, batch_size=20, concurrency=4, timeout=60):
+        self.api_url = api_url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = None
+        self.semaphore = None
+        self.buffer = []
+        self.pending = set()
+        self.submitted = 0
+        self.failed = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            api_url=settings.get("KB_API_URL"),
+            batch_size=settings.getint("KB_API_BATCH_SIZE", 20),
+            concurrency=settings.getint("KB_API_CONCURRENCY", 4),
+            timeout=settings.getfloat("KB_API_TIMEOUT", 60),
+        )
+
+    def open_spider(self, spider):
+        self.session = requests.Session()
+        # The API dedupes chunks per URL, so re-posting a batch after a gateway error is harmless
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(502, 503, 504), allowed_methods=None)
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.semaphore = defer.DeferredSemaphore(self.concurrency)
+
     def process_item(self, item, spider):
+        self.buffer.append(ItemAdapter(item).asdict())
+        if len(self.buffer) >= self.batch_size:
+            self._flush(spider)
         return item
+
+    def _flush(self, spider):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        d = self.semaphore.run(threads.deferToThread, self._post, batch)
+        d.addCallbacks(
+            self._submitted, self._failed,
+            callbackArgs=(batch, spider), errbackArgs=(batch, spider),
+        )
+        self.pending.add(d)
+        d.addBoth(self._done, d)
+
+    def _done(self, result, d):
+        self.pending.discard(d)
+        return result
+
+    def _post(self, batch):
+        # Runs in a worker thread, never on the reactor
+        payload = {"documents": [{"url": page["url"], "description": page["description"]} for page in batch]}
+        res = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        if res.status_code not in (200, 202):
+            raise RuntimeError(f"{res.status_code} - {res.text[:500]}")
+        return res.json()
+
+    def _submitted(self, data, batch, spider):
+        rejected = {error.get("url") for error in data.get("errors", [])}
+        crawl_state = getattr(spider, "crawl_state", None)
+        for page in batch:
+            if page["url"] in rejected:
+                self.failed += 1
+                self._retry_next_run(page, crawl_state)
+                continue
+            self.submitted += 1
+            if crawl_state is not None:
+                crawl_state.update(
+                    page.get("source_url") or page["url"],
+                    etag=page.get("etag"),
+                    last_modified=page.get("last_modified"),
+                    fingerprint=page.get("fingerprint"),
+                )
+        spider.logger.info(f"✅ Queued {len(batch) - len(rejected)} pages for ingestion ({len(rejected)} rejected)")
+
+    @staticmethod
+    def _retry_next_run(page, crawl_state):
+        if crawl_state is not None:
+            crawl_state.update(page.get("source_url") or page["url"], next_crawl=0)
+
+    def _failed(self, failure, batch, spider):
+        self.failed += len(batch)
+        crawl_state = getattr(spider, "crawl_state", None)
+        for page in batch:
+            self._retry_next_run(page, crawl_state)
+        spider.logger.error(f"❌ Failed to submit {len(batch)} pages: {failure.getErrorMessage()}")
+
+    def close_spider(self, spider):
+        self._flush(spider)
+        d = defer.DeferredList(list(self.pending), consumeErrors=True)
+        d.addBoth(self._close, spider)
+        return d
+
+    def _close(self, _, spider):
+        # The spider saves its crawl state once the pipeline is done, see TeetimeSpider.closed
+        self.session.close()
+        spider.logger.info(f"Knowledge base submissions: {self.submitted} queued, {self.failed} failed")
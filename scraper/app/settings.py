@@ -7,6 +7,11 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
 BOT_NAME = "app"
 
 SPIDER_MODULES = ["app.spiders"]
@@ -64,9 +69,28 @@ ROBOTSTXT_OBEY = True
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "app.pipelines.AppPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "app.pipelines.AppPipeline": 300,
+}
+
+# Knowledge base API the pipeline submits pages to, in batches of KB_API_BATCH_SIZE pages with at most
+# KB_API_CONCURRENCY requests in flight
+KB_API_URL = f"{os.getenv('API_BASE_URL')}/api/knowledge-base/"
+KB_API_BATCH_SIZE = int(os.getenv("KB_API_BATCH_SIZE", 20))
+KB_API_CONCURRENCY = int(os.getenv("KB_API_CONCURRENCY", 4))
+KB_API_TIMEOUT = float(os.getenv("KB_API_TIMEOUT", 60))
+
+# Frontier of the incremental crawl: every known page with the validators and fingerprint of the version
+# already submitted, and when it is due for a revisit
+CRAWL_STATE_FILE = os.getenv("CRAWL_STATE_FILE", ".crawl_state/teetime.json")
+# A page is revisited CRAWL_REVISIT_MIN_INTERVAL seconds after it changed; the interval doubles every time it is
+# found unchanged, up to CRAWL_REVISIT_MAX_INTERVAL
+CRAWL_REVISIT_MIN_INTERVAL = int(os.getenv("CRAWL_REVISIT_MIN_INTERVAL", 6 * 60 * 60))
+CRAWL_REVISIT_MAX_INTERVAL = int(os.getenv("CRAWL_REVISIT_MAX_INTERVAL", 7 * 24 * 60 * 60))
+# A content block found on at least BOILERPLATE_MIN_PAGES pages is boilerplate and submitted with one page only
+BOILERPLATE_MIN_PAGES = int(os.getenv("BOILERPLATE_MIN_PAGES", 3))
+# How many links deep the discover mode follows from the seeds, sitemaps and frontier
+DEPTH_LIMIT = int(os.getenv("CRAWL_DEPTH_LIMIT", 5))
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -1,14 +1,32 @@
+from urllib.parse import urldefrag
 import scrapy
-import requests
-import os
-from dotenv import load_dotenv
+from scrapy.http import HtmlResponse, XmlResponse
+from scrapy.linkextractors import LinkExtractor
+from scrapy.utils.gz import gunzip, gzip_magic_number
+from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
 
-load_dotenv()
-API_BASE_URL = os.getenv("API_BASE_URL")
+from app.crawl_state import CrawlStateStore
+from app.extraction import BoilerplateFilter, MainContentExtractor, blocks_to_html
+from app.items import AppItem
 
 class TeetimeSpider(scrapy.Spider):
+    """
+    Crawls the Teetime sites into the knowledge base.
+
+    Modes (scrapy crawl teetime -a mode=...):
+        discover (default): Incremental crawl. Pages are discovered from the sitemaps listed in robots.txt, the
+            seed URLs and in-domain links, and remembered in the crawl state. Each run only fetches the pages that
+            are new or due for a revisit, with conditional requests, and only submits pages whose text changed.
+        seed: Fetches the seed URLs only, with conditional requests, without following links.
+
+    Pass -a full=1 to ignore the revisit schedule and the stored validators and fetch every known page.
+    """
+
     name = "teetime"
     allowed_domains = ["teetimegolfpass.com"]
+    sitemap_urls = [
+        "https://teetimegolfpass.com/robots.txt",
+    ]
     start_urls = [
         "https://teetimegolfpass.com/",
         "https://teetimegolfpass.com/golf-pass/super-pass/",
@@ -32,23 +50,165 @@ class TeetimeSpider(scrapy.Spider):
         "https://teetimegolfpass.com/privacy-policy/",
         "https://teetimegolfpass.com/terms-conditions/"
     ]
+    # Account, checkout and feed pages carry nothing worth answering questions with
+    deny = [
+        r"/wp-admin/", r"/wp-json/", r"/wp-login", r"/cart/", r"/checkout/", r"/my-account/",
+        r"/feed/?$", r"/tag/", r"/author/", r"[?&](replytocom|add-to-cart|s)=",
+    ]
+    # 304: unchanged since the last crawl; 404/410: the page is gone and leaves the frontier
+    handle_httpstatus_list = [304, 404, 410]
+
+    def __init__(self, mode="discover", full=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if mode not in ("discover", "seed"):
+            raise ValueError(f"Unknown crawl mode {mode!r}, expected 'discover' or 'seed'")
+        self.mode = mode
+        self.full = str(full).lower() in ("1", "true", "yes")
+        self.link_extractor = LinkExtractor(allow_domains=self.allowed_domains, deny=self.deny)
+        self.content_extractor = MainContentExtractor()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.crawl_state = CrawlStateStore(crawler.settings.get("CRAWL_STATE_FILE"))
+        spider.revisit_min_interval = crawler.settings.getint("CRAWL_REVISIT_MIN_INTERVAL")
+        spider.revisit_max_interval = crawler.settings.getint("CRAWL_REVISIT_MAX_INTERVAL")
+        spider.boilerplate_filter = BoilerplateFilter(
+            spider.crawl_state, min_pages=crawler.settings.getint("BOILERPLATE_MIN_PAGES", 3),
+        )
+        return spider
+
+    def start_requests(self):
+        if self.mode == "seed":
+            for url in self.start_urls:
+                yield self._page_request(url, dont_filter=True)
+            return
+
+        for url in self.start_urls:
+            self.crawl_state.discover(url)
+        for url in self.sitemap_urls:
+            yield scrapy.Request(url, callback=self.parse_sitemap, dont_filter=True)
+        frontier = list(self.crawl_state.pages) if self.full else self.crawl_state.due_urls()
+        self.logger.info(f"{len(frontier)} of {len(self.crawl_state.pages)} known pages due for a revisit")
+        for url in frontier:
+            yield self._page_request(url)
+
+    def _page_request(self, url, dont_filter=False):
+        headers = {} if self.full else self.crawl_state.conditional_headers(url)
+        return scrapy.Request(
+            url,
+            callback=self.parse,
+            errback=self.page_failed,
+            headers=headers,
+            cb_kwargs={"source_url": url},
+            dont_filter=dont_filter,
+        )
+
+    @staticmethod
+    def _sitemap_body(response):
+        if response.status != 200:
+            return None
+        if isinstance(response, XmlResponse):
+            return response.body
+        if gzip_magic_number(response):
+            return gunzip(response.body)
+        if response.url.endswith(".xml"):
+            return response.body
+        return None
+
+    def parse_sitemap(self, response):
+        """
+        Follows the sitemaps of robots.txt and sitemap indexes, and queues the pages of url sets that are new,
+        due, or whose <lastmod> changed since the last crawl.
+        """
+        if response.url.endswith("/robots.txt"):
+            for url in sitemap_urls_from_robots(response.text, base_url=response.url):
+                yield scrapy.Request(url, callback=self.parse_sitemap, dont_filter=True)
+            return
+
+        body = self._sitemap_body(response)
+        if body is None:
+            self.logger.warning(f"❌ Not a sitemap: {response.url}")
+            return
+        sitemap = Sitemap(body)
+        for entry in sitemap:
+            loc = urldefrag(entry["loc"])[0]
+            if sitemap.type == "sitemapindex":
+                yield scrapy.Request(loc, callback=self.parse_sitemap, dont_filter=True)
+            elif sitemap.type == "urlset" and self.link_extractor.matches(loc):
+                self.crawl_state.discover(loc, sitemap_lastmod=entry.get("lastmod"))
+                if self.full or self.crawl_state.is_due(loc):
+                    yield self._page_request(loc)
+
+    def parse(self, response, source_url=None):
+        source_url = source_url or response.url
+        if response.status in (404, 410):
+            self.logger.info(f"Gone, dropped from the frontier: {source_url}")
+            self.crawl_state.remove(source_url)
+            return
+        if response.status == 304:
+            self.logger.info(f"Unchanged since last crawl: {source_url}")
+            self._schedule(source_url, changed=False)
+            return
+        if not isinstance(response, HtmlResponse):
+            self.crawl_state.remove(source_url)
+            return
+
+        if self.mode == "discover":
+            yield from self._follow_links(response)
+
+        description = self.extract_content(response.text, source_url)
+        if not description:
+            self.logger.warning(f"❌ No text found on {response.url}")
+            self._schedule(source_url, changed=False)
+            return
+
+        etag = (response.headers.get("ETag") or b"").decode("latin-1") or None
+        last_modified = (response.headers.get("Last-Modified") or b"").decode("latin-1") or None
+        fingerprint = CrawlStateStore.fingerprint(description)
+        if not self.full and fingerprint == self.crawl_state.get(source_url).get("fingerprint"):
+            # Same text as the version already in the knowledge base, only keep the fresher validators
+            self.logger.info(f"Content unchanged since last crawl: {source_url}")
+            self.crawl_state.update(source_url, etag=etag, last_modified=last_modified)
+            self._schedule(source_url, changed=False)
+            return
+
+        self._schedule(source_url, changed=True)
+        yield AppItem(
+            url=response.url,
+            description=description,
+            source_url=source_url,
+            etag=etag,
+            last_modified=last_modified,
+            fingerprint=fingerprint,
+        )
+
+    def extract_content(self, page_html, url):
+        """
+        Returns the main content of a page as minimal HTML (headings, paragraphs, lists), without navigation,
+        footers, banners and blocks repeated across pages, or "" if the page has no text.
+        """
+        blocks = self.content_extractor.extract(page_html)
+        return blocks_to_html(self.boilerplate_filter.filter(url, blocks))
+
+    def _follow_links(self, response):
+        for link in self.link_extractor.extract_links(response):
+            url = urldefrag(link.url)[0]
+            self.crawl_state.discover(url)
+            if self.full or self.crawl_state.is_due(url):
+                yield self._page_request(url)
 
-    def parse(self, response):
-        try:
-            body_text = " ".join(response.css("body :not(script):not(style)::text").getall()).strip()
-            url = response.url
-            if url:
-                API_ENDPOINT = f"{API_BASE_URL}/api/knowledge-base/"
-                headers = {"Content-Type": "application/json"}
-                payload = {"description": body_text, "url": url}
-                res = requests.post(API_ENDPOINT, json=payload, headers=headers)
-                if res.status_code == 200:
-                    print(f"✅ Successfully processed {url}")
-                else:
-                    print(f"❌ Failed to process {url}: {res.status_code} - {res.text}")
-            else:
-                print(f"❌ No URL found for response: {response}")
-        except Exception as e:
-            print(f"Request failed for {url}: {str(e)}")
+    def _schedule(self, url, changed):
+        self.crawl_state.record_fetch(url, changed, self.revisit_min_interval, self.revisit_max_interval)
 
+    def page_failed(self, failure):
+        # Back off pages that keep failing (DNS, timeouts, robots.txt) the same way as unchanged ones
+        url = failure.request.cb_kwargs.get("source_url", failure.request.url)
+        self.logger.warning(f"❌ Failed to fetch {url}: {failure.getErrorMessage()}")
+        if url in self.crawl_state.pages:
+            self._schedule(url, changed=False)
 
+    def closed(self, reason):
+        # Runs after the item pipeline finished, so it also persists the validators of submitted pages
+        self.crawl_state.save()
+        self.logger.info(f"Crawl state saved: {len(self.crawl_state.pages)} known pages")